@@ -0,0 +1,127 @@
+"""
+benchmarks/bench_gutter_scroll.py
+---------------------------------
+Line-number gutter cost while scrolling a large document.
+
+Loads a document with ``--lines`` lines, then scrolls through it and moves
+the cursor (which repaints the whole viewport because of the current-line
+highlight), reporting the frame time and the time spent in the gutter
+paint. ``--legacy`` swaps in the old per-line drawText() gutter painter
+for comparison.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_gutter_scroll
+"""
+
+import sys
+import time
+import argparse
+import statistics
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QPainter, QColor, QTextCursor
+from PyQt5.QtCore import Qt
+
+from utils.editor import EnhancedTextEditor
+
+
+def legacy_paint(editor, event):
+    """The gutter painter before glyph caching, kept for comparison."""
+    painter = QPainter(editor.lineNumberArea)
+    painter.fillRect(event.rect(), QColor("#222222"))
+
+    block = editor.firstVisibleBlock()
+    block_number = block.blockNumber()
+    top = int(editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top())
+    bottom = top + int(editor.blockBoundingRect(block).height())
+
+    while block.isValid() and top <= event.rect().bottom():
+        if block.isVisible() and bottom >= event.rect().top():
+            painter.setPen(QColor("#858585"))
+            painter.drawText(
+                0, top, editor.lineNumberArea.width() - 4, editor.fontMetrics().height(),
+                Qt.AlignRight, str(block_number + 1)
+            )
+        block = block.next()
+        top = bottom
+        bottom = top + int(editor.blockBoundingRect(block).height())
+        block_number += 1
+
+
+def _timed_gutter(editor, paint, samples):
+    def wrapper(event):
+        start = time.perf_counter()
+        paint(event)
+        samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _run(app, editor, action, steps):
+    frames = []
+    for step in range(steps):
+        start = time.perf_counter()
+        action(step)
+        app.processEvents()
+        frames.append(time.perf_counter() - start)
+    return frames
+
+
+def _report(name, frames, gutter):
+    print(f"{name:<14} frame median {statistics.median(frames) * 1000:7.3f} ms   "
+          f"p95 {sorted(frames)[int(len(frames) * 0.95)] * 1000:7.3f} ms   "
+          f"gutter total {sum(gutter) * 1000:8.2f} ms over {len(gutter)} paints")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--lines", type=int, default=1_000_000, help="lines in the document")
+    parser.add_argument("--steps", type=int, default=400, help="frames per scenario")
+    parser.add_argument("--legacy", action="store_true", help="use the old uncached gutter painter")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    editor = EnhancedTextEditor()
+    editor.resize(1000, 800)
+    text = "\n".join(f"line {i}: the quick brown fox jumps over the lazy dog" for i in range(args.lines))
+    editor.setPlainText(text)
+    editor.show()
+    app.processEvents()
+
+    gutter = []
+    paint = (lambda event: legacy_paint(editor, event)) if args.legacy else editor.lineNumberAreaPaintEvent
+    editor.lineNumberAreaPaintEvent = _timed_gutter(editor, paint, gutter)
+
+    bar = editor.verticalScrollBar()
+    stride = max(1, bar.maximum() // args.steps)
+    print(f"{args.lines} lines, {'legacy' if args.legacy else 'cached'} gutter")
+
+    # Smooth scrolling: a few lines per frame, so most of the gutter is reused.
+    bar.setValue(bar.maximum() // 2)
+    app.processEvents()
+    gutter.clear()
+    frames = _run(app, editor, lambda step: bar.setValue(bar.value() + 3), args.steps)
+    _report("scroll", frames, gutter)
+
+    # Page jumps across the whole file.
+    gutter.clear()
+    frames = _run(app, editor, lambda step: bar.setValue(step * stride), args.steps)
+    _report("jump", frames, gutter)
+
+    # Cursor movement inside the viewport: full-viewport repaints, no scrolling.
+    bar.setValue(bar.maximum() // 2)
+    app.processEvents()
+    cursor = editor.cursorForPosition(editor.viewport().rect().center())
+    editor.setTextCursor(cursor)
+    app.processEvents()
+    gutter.clear()
+
+    def move(step):
+        c = editor.textCursor()
+        c.movePosition(QTextCursor.Down if step % 20 < 10 else QTextCursor.Up)
+        editor.setTextCursor(c)
+
+    frames = _run(app, editor, move, args.steps)
+    _report("cursor", frames, gutter)
+
+
+if __name__ == "__main__":
+    main()
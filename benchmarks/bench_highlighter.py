@@ -0,0 +1,202 @@
+"""
+benchmarks/bench_highlighter.py
+-------------------------------
+Syntax highlighting throughput in lines per second.
+
+Builds a large Python (or HTML) document from the repository's own sources,
+then measures the bare tokenizer, a full synchronous QSyntaxHighlighter pass
+and the viewport-first LazyHighlighter (time until the viewport is
+highlighted, total background fill time and the longest idle tick).
+Then it edits every line in one edit block and runs a regex Replace All,
+with LazyHighlighter and with ThreadedHighlighter. After each edit it
+waits for the fill and counts the lines whose formats differ from a fresh
+tokenize, which must be none.
+``--legacy`` also times the previous multi-pass highlighter (one
+``re.finditer`` per rule per block) for comparison.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_highlighter
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QTextDocument, QSyntaxHighlighter, QTextCharFormat, QColor
+
+from utils.advanced_features import PythonHighlighter, HTMLHighlighter
+from utils.languages import get_grammar
+from utils.editor import EnhancedTextEditor
+from utils.lazy_highlighter import LazyHighlighter, ThreadedHighlighter
+
+HTML_SAMPLE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Sample &amp; test</title></head>
+<body class="main" data-id='7'>
+  <!-- navigation
+       spans lines -->
+  <nav><a href="/index.html">Home</a> | <a href="/about.html">About</a></nav>
+  <p>Some <b>bold</b> and <i>italic</i> text &#169; 2024.</p>
+</body>
+</html>
+"""
+
+
+class LegacyHighlighter(QSyntaxHighlighter):
+    """The previous PythonHighlighter: one uncompiled regex pass per rule."""
+
+    def __init__(self, document):
+        super().__init__(document)
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor("#6366f1"))
+        keywords = ["def", "class", "import", "from", "if", "else", "elif",
+                    "for", "while", "return", "True", "False", "None", "try", "except"]
+        self.highlighting_rules = [(f"\\b{word}\\b", fmt) for word in keywords]
+        self.highlighting_rules += [(r'\".*?\"', fmt), (r"'.*?'", fmt), (r"#.*", fmt)]
+
+    def highlightBlock(self, text):
+        for pattern, char_format in self.highlighting_rules:
+            for match in re.finditer(pattern, text):
+                start, end = match.span()
+                self.setFormat(start, end - start, char_format)
+
+
+def _sample_lines(language, count):
+    if language == "html":
+        base = HTML_SAMPLE.splitlines()
+    else:
+        root = Path(__file__).resolve().parent.parent
+        base = []
+        for path in sorted(root.glob("*/*.py")):
+            base.extend(path.read_text(encoding="utf-8", errors="replace").splitlines())
+    return (base * (count // len(base) + 1))[:count]
+
+
+def _rate(lines, seconds):
+    return f"{lines / seconds:12,.0f} lines/s  ({seconds * 1000:8.1f} ms)"
+
+
+def stale_lines(highlighter):
+    """Lines whose layout formats differ from tokenizing the document from the top."""
+    grammar, formats = highlighter.grammar, highlighter.formats
+    block, state, stale = highlighter.document.firstBlock(), 0, 0
+    while block.isValid():
+        spans, state = grammar.tokenize(block.text(), state)
+        expected = [(begin, length, formats[style]) for begin, length, style in spans]
+        actual = [(r.start, r.length, r.format) for r in block.layout().formats()]
+        stale += actual != expected
+        block = block.next()
+    return stale
+
+
+def check_edits(app, lines, grammar):
+    """Stale lines after big edits, per highlighter class; all counts should be 0."""
+    from PyQt5.QtGui import QTextCursor
+    failed = False
+    for highlighter_class in (LazyHighlighter, ThreadedHighlighter):
+        editor = EnhancedTextEditor()
+        editor.resize(1000, 800)
+        editor.setPlainText("\n".join(lines))
+        editor.show()
+        highlighter = highlighter_class(editor, grammar)
+
+        def settle():
+            while not highlighter.is_complete():
+                app.processEvents()
+            app.processEvents()
+
+        settle()
+        # Comment out every other line and open a string on the rest (multi-line states change).
+        cursor = QTextCursor(editor.document())
+        cursor.beginEditBlock()
+        block = editor.document().firstBlock()
+        while block.isValid():
+            cursor.setPosition(block.position())
+            cursor.insertText("# " if block.blockNumber() % 2 else 'x = """')
+            block = block.next()
+        cursor.endEditBlock()
+        settle()
+        every_line = stale_lines(highlighter)
+        engine = editor.search_engine()
+        engine.set_query(r'^(# |x = """)', regex=True)
+        engine.replace_all("")
+        settle()
+        replaced = stale_lines(highlighter)
+        failed |= bool(every_line or replaced)
+        print(f"{highlighter_class.__name__:19} stale lines after editing every line: {every_line}, "
+              f"after Replace All: {replaced}")
+        highlighter.detach()
+        editor.deleteLater()
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--lines", type=int, default=100_000, help="lines in the document")
+    parser.add_argument("--language", choices=("python", "html"), default="python")
+    parser.add_argument("--legacy", action="store_true", help="also time the old multi-pass highlighter")
+    parser.add_argument("--check-lines", type=int, default=15_000, help="lines in the edit checks")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    grammar, highlighter_class = (
+        (get_grammar("html"), HTMLHighlighter) if args.language == "html" else (get_grammar("python"), PythonHighlighter)
+    )
+    lines = _sample_lines(args.language, args.lines)
+    print(f"{args.language}: {len(lines)} lines")
+
+    grammar.compile()
+    start = time.perf_counter()
+    grammar.tokenize_lines(lines)
+    print(f"tokenize      {_rate(len(lines), time.perf_counter() - start)}")
+
+    document = QTextDocument()
+    document.setPlainText("\n".join(lines))
+    start = time.perf_counter()
+    highlighter = highlighter_class(document)
+    app.processEvents()
+    print(f"highlighter   {_rate(len(lines), time.perf_counter() - start)}")
+    highlighter.setDocument(None)
+
+    editor = EnhancedTextEditor()
+    editor.resize(1000, 800)
+    editor.setPlainText("\n".join(lines))
+    editor.show()
+    editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum() // 2)
+    app.processEvents()
+    start = time.perf_counter()
+    lazy = LazyHighlighter(editor, grammar)
+    print(f"lazy attach   {(time.perf_counter() - start) * 1000:8.1f} ms until the viewport is highlighted")
+    ticks = []
+    fill = lazy._fill
+
+    def timed_fill():
+        tick = time.perf_counter()
+        fill()
+        ticks.append(time.perf_counter() - tick)
+
+    lazy._timer.timeout.disconnect()
+    lazy._timer.timeout.connect(timed_fill)
+    start = time.perf_counter()
+    while not lazy.is_complete():
+        app.processEvents()
+    print(f"lazy fill     {_rate(len(lines), time.perf_counter() - start)}  "
+          f"{len(ticks)} ticks, longest {max(ticks, default=0) * 1000:.1f} ms")
+
+    if args.legacy:
+        document = QTextDocument()
+        document.setPlainText("\n".join(lines))
+        start = time.perf_counter()
+        highlighter = LegacyHighlighter(document)
+        app.processEvents()
+        print(f"legacy        {_rate(len(lines), time.perf_counter() - start)}")
+
+    failed = check_edits(app, lines[:args.check_lines], grammar)
+    print("FAILED: stale highlighting after edits" if failed else "ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+benchmarks/bench_leaks.py
+-------------------------
+Leak check: widgets, Python objects and RSS while opening and closing tabs and dialogs.
+
+Opens and closes ``--tabs`` tabs and then ``--dialogs`` dialogs (the
+Help-menu dialogs and the save-mode dialog, in turn) in an offscreen main
+window. It counts live widgets, QObjects under the window, gc-tracked
+Python objects and the process RSS before, halfway through and after each
+phase. The process exits with status 1 when a count grows by more than
+``--slack`` over the phase, or RSS grows by more than ``--rss-mb`` over its
+second half (the first half raises the heap to its working size), so the
+check can run unattended.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_leaks
+"""
+
+import os
+import gc
+import sys
+import time
+import argparse
+import resource
+import tempfile
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QTimer, QEvent, QCoreApplication
+
+TAB_TEXT = "".join(f"line {i}: the quick brown fox jumps over the lazy dog\n" for i in range(2000))
+
+
+def rss_mb():
+    """Current resident set size (peak size where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def settle(app):
+    """Run deleteLater() deletions and collect garbage."""
+    for _ in range(3):
+        app.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+def snapshot(app, window):
+    settle(app)
+    return {
+        "widgets": len(app.allWidgets()),
+        "window objects": len(window.findChildren(QObject)),
+        "python objects": len(gc.get_objects()),
+        "rss MB": rss_mb(),
+    }
+
+
+def open_close_tabs(app, window, count):
+    for i in range(count):
+        window.new_tab(None, TAB_TEXT)
+        window.close_tab(window.tabs.currentIndex())
+        if i % 50 == 0:
+            settle(app)
+
+
+def open_close_dialogs(app, window, count):
+    """Open each dialog modally and close it from a timer, as a user would."""
+    from dialogs.save_dialog import SaveModeDialog
+    from utils.encryption import CRYPTO_AVAILABLE
+
+    def close_modal():
+        dialog = app.activeModalWidget()
+        if dialog is not None:
+            dialog.reject()
+
+    helpers = [window.show_about_dialog, window.show_help_dialog, window.show_license_dialog,
+               window.show_terms_conditions_dialog, window.show_donate_dialog,
+               lambda: window.exec_dialog(SaveModeDialog(window, crypto_available=CRYPTO_AVAILABLE))]
+    for i in range(count):
+        QTimer.singleShot(0, close_modal)
+        helpers[i % len(helpers)]()
+        if i % 20 == 0:
+            settle(app)
+
+
+def report(name, before, middle, after, args):
+    failed = False
+    print(f"{name}:")
+    for key in before:
+        if key == "rss MB":
+            growth, limit = after[key] - middle[key], args.rss_mb
+        else:
+            growth, limit = after[key] - before[key], args.slack
+        if key == "python objects":
+            limit = args.slack * 100  # also holds caches warmed by the run itself
+        bad = growth > limit
+        failed |= bad
+        print(f"  {key:15} {before[key]:12,.0f} -> {middle[key]:12,.0f} -> {after[key]:12,.0f}"
+              f"  ({growth:+,.0f}){'  LEAK' if bad else ''}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--tabs", type=int, default=1000, help="tabs to open and close")
+    parser.add_argument("--dialogs", type=int, default=1000, help="dialogs to open and close")
+    parser.add_argument("--slack", type=int, default=20, help="allowed growth of the widget and QObject counts")
+    parser.add_argument("--rss-mb", type=float, default=10, help="allowed RSS growth over the second half of a phase, in MB")
+    args = parser.parse_args(argv)
+
+    # Keep the run's recent files, state and backups out of the real profile.
+    os.environ["HOME"] = tempfile.mkdtemp(prefix="bench_leaks_")
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.secure_notepad import EnhancedNotepad
+    window = EnhancedNotepad()
+    window.resize(1000, 700)
+    window.show()
+
+    # Warm up: first-use caches (fonts, grammars, styles) are not leaks.
+    open_close_tabs(app, window, 20)
+    open_close_dialogs(app, window, 12)
+
+    failed = False
+    for name, run, count in (("tabs", open_close_tabs, args.tabs), ("dialogs", open_close_dialogs, args.dialogs)):
+        before = snapshot(app, window)
+        start = time.perf_counter()
+        run(app, window, count // 2)
+        middle = snapshot(app, window)
+        run(app, window, count - count // 2)
+        after = snapshot(app, window)
+        failed |= report(f"{count} {name} in {time.perf_counter() - start:.1f} s", before, middle, after, args)
+    print("FAILED: something leaked" if failed else "ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
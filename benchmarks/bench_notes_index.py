@@ -0,0 +1,159 @@
+"""
+benchmarks/bench_notes_index.py
+-------------------------------
+Notes index build time, size and query latency.
+
+Generates ``--notes`` small notes in a temporary folder and times building
+the index, its size on disk, a new instance's first update (which must load
+the saved index and re-index nothing), a cancelled update (which must keep
+every note), loading it, an update with nothing
+changed, an update after editing ``--edit`` notes, and candidates() for a few queries
+against the full scan the index saves (search_file() on every note).
+Then it encrypts ``--encrypted`` notes, builds their EncryptedNotesIndex
+and checks that a new instance loads it from disk instead of decrypting
+the unchanged notes again (each one costs a key derivation).
+
+Run:  python -m benchmarks.bench_notes_index
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+from utils.notes_index import NotesIndex, EncryptedNotesIndex
+from utils.encryption import encrypt_data, CRYPTO_AVAILABLE
+from utils.file_search import iter_files, search_file
+from utils.search_engine import compile_pattern
+
+SYLLABLES = "ka lo mi nu pe ra si to vu we xa yo zu be do fi ga he ju".split()
+QUERIES = [("meeting", False), ("invoice-0042", False), ("kalomi", False), (r"ticket-\d+7\b", True), ("zz", False)]
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.2f} ms"
+
+
+def write_notes(root, count, rng):
+    """Notes of 40 lines drawn from a 5,000-word vocabulary with a Zipf-like skew."""
+    vocabulary = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 5))) for _ in range(6000)})[:5000]
+    rng.shuffle(vocabulary)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for i in range(count):
+        folder = os.path.join(root, f"folder{i % 50:02d}")
+        os.makedirs(folder, exist_ok=True)
+        words = rng.choices(vocabulary, weights, k=480)
+        lines = [" ".join(words[j:j + 12]) for j in range(0, len(words), 12)]
+        if i % 100 == 0:
+            lines.append("agenda for the meeting")
+        if i % 1000 == 42:
+            lines.append(f"invoice-{i:04d} ticket-{i}")
+        with open(os.path.join(folder, f"note{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--notes", type=int, default=20_000, help="number of notes")
+    parser.add_argument("--edit", type=int, default=20, help="notes changed before the incremental update")
+    parser.add_argument("--encrypted", type=int, default=5, help="encrypted notes for the vault index check")
+    args = parser.parse_args(argv)
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as root:
+        write_notes(root, args.notes, rng)
+        index_file = os.path.join(root, ".index", "notes.idx")
+        index = NotesIndex(root, index_file)
+
+        start = time.perf_counter()
+        index.update()
+        print(f"build         {_ms(time.perf_counter() - start)}  ({index.file_count():,} notes, "
+              f"{os.path.getsize(index_file) / 1e6:.1f} MB on disk)")
+
+        index = NotesIndex(root, index_file)
+        start = time.perf_counter()
+        changed = index.update()
+        print(f"reopen+update {_ms(time.perf_counter() - start)}  ({changed} changed)  "
+              f"{'ok' if changed == 0 else 'RE-INDEXED UNCHANGED NOTES'}")
+
+        # A search cancelled while the index updates must not prune the files not listed yet.
+        cancelled = threading.Event()
+        cancelled.set()
+        count = index.file_count()
+        index.update(cancelled)
+        kept = NotesIndex(root, index_file)
+        kept.load()
+        print(f"cancelled update keeps {kept.file_count():,} of {count:,} notes  "
+              f"{'ok' if index.file_count() == kept.file_count() == count else 'PRUNED'}")
+
+        index = NotesIndex(root, index_file)
+        start = time.perf_counter()
+        index.load()
+        print(f"load          {_ms(time.perf_counter() - start)}")
+
+        start = time.perf_counter()
+        changed = index.update()
+        print(f"update        {_ms(time.perf_counter() - start)}  ({changed} changed)")
+
+        for path in rng.sample(list(iter_files(root)), args.edit):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\nedited meeting notes")
+        start = time.perf_counter()
+        changed = index.update()
+        print(f"update        {_ms(time.perf_counter() - start)}  ({changed} changed)")
+
+        all_files = list(iter_files(root))
+        for query, regex in QUERIES:
+            pattern = compile_pattern(query, False, False, regex)
+            start = time.perf_counter()
+            candidates = index.candidates(query, regex=regex)
+            lookup = time.perf_counter() - start
+            candidates = all_files if candidates is None else candidates
+            start = time.perf_counter()
+            hits = sum(bool(search_file(p, pattern, query, regex=regex)) for p in candidates)
+            indexed = time.perf_counter() - start
+            start = time.perf_counter()
+            expected = sum(bool(search_file(p, pattern, query, regex=regex)) for p in all_files)
+            full = time.perf_counter() - start
+            print(f"{query!r:16} lookup {_ms(lookup)}, {len(candidates):6,} candidates, "
+                  f"search {_ms(indexed)} vs full scan {_ms(full)}  "
+                  f"{'ok' if hits == expected else f'MISSED {expected - hits}'}")
+
+    if CRYPTO_AVAILABLE and args.encrypted:
+        with tempfile.TemporaryDirectory() as root:
+            bench_vault(root, args.encrypted)
+
+
+def bench_vault(root, count, password="vault password"):
+    for i in range(count):
+        token, salt = encrypt_data(f"encrypted note {i}: meeting agenda", password)
+        with open(os.path.join(root, f"secret{i:03d}.txt.enc"), "wb") as f:
+            f.write(salt + token)
+    index_file = os.path.join(root, ".index", "notes.eidx")
+
+    def opened():
+        """A new vault index that counts the notes it decrypts."""
+        vault = EncryptedNotesIndex(root, password, index_file)
+        read_words, vault.decrypted = vault._read_words, 0
+
+        def counting(path, data):
+            vault.decrypted += 1
+            return read_words(path, data)
+        vault._read_words = counting
+        return vault
+
+    vault = opened()
+    start = time.perf_counter()
+    vault.update()
+    print(f"vault build   {_ms(time.perf_counter() - start)}  ({vault.decrypted} notes decrypted)")
+    vault = opened()
+    start = time.perf_counter()
+    vault.update()
+    print(f"vault reopen  {_ms(time.perf_counter() - start)}  ({vault.decrypted} notes decrypted)  "
+          f"{'ok' if vault.decrypted == 0 else 'DECRYPTED UNCHANGED NOTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_quick_open.py
+------------------------------
+Quick Open ranking latency over a large workspace.
+
+Builds a FuzzyIndex of ``--paths`` synthetic paths, then types each query
+one character at a time (as the palette does) and reports the index build
+time and the median, 95th percentile and worst search() time per
+keystroke. Each keystroke's results, which search() narrows from the
+previous keystroke's, are checked against a fresh search for the same
+text on a second index, here and in a few small workspaces where every
+match is known. The process exits with status 1 on a mismatch.
+
+Run:  python -m benchmarks.bench_quick_open
+"""
+
+import sys
+import time
+import random
+import argparse
+import statistics
+
+from utils.fuzzy import FuzzyIndex
+
+PARTS = ("src lib docs notes project alpha beta utils core ui tests data config build assets "
+         "images meeting journal archive 2023 2024 drafts").split()
+QUERIES = ["meeting", "mtg12", "notesalpha", "jrnl2024", "ui_12345", "zzz", "12345", "secnot", "homeuser",
+           "dn", "ut3"]
+# Small workspaces where every match is known, so search() narrows each keystroke from the last one.
+SMALL_CASES = [
+    (["docs/notes/todo.md", "src/data.py", "readme.md"], ["dn", "todo", "srcdata"]),
+]
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:7.2f} ms"
+
+
+def make_paths(count, rng):
+    paths = []
+    for i in range(count):
+        directory = "/".join(rng.choice(PARTS) for _ in range(rng.randint(1, 5)))
+        extension = rng.choice(["txt", "md", "py", "txt.enc"])
+        paths.append(f"/home/user/{directory}/{rng.choice(PARTS)}_{i}.{extension}")
+    return paths
+
+
+def typing_mismatches(index, fresh_search, query):
+    """Type ``query`` into ``index`` and compare each keystroke with ``fresh_search(text)``."""
+    index.search("")  # the palette opens empty
+    typed, mismatches = [], 0
+    for length in range(1, len(query) + 1):
+        start = time.perf_counter()
+        results = index.search(query[:length])
+        typed.append(time.perf_counter() - start)
+        if results != fresh_search(query[:length]):
+            mismatches += 1
+            print(f"MISMATCH typing {query[:length]!r}: results differ from a fresh search")
+    return typed, results, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--paths", type=int, default=100_000, help="number of workspace paths")
+    args = parser.parse_args(argv)
+
+    paths = make_paths(args.paths, random.Random(1))
+    start = time.perf_counter()
+    index = FuzzyIndex(paths)
+    print(f"build       {_ms(time.perf_counter() - start)}  ({len(index):,} paths)")
+
+    reference = FuzzyIndex(paths)
+
+    def fresh_search(text):
+        reference.search("")  # forget the previous query: no narrowing
+        return reference.search(text)
+
+    timings, mismatches = [], 0
+    for query in QUERIES:
+        typed, results, wrong = typing_mismatches(index, fresh_search, query)
+        mismatches += wrong
+        timings += typed
+        best = results[0][1] if results else "-"
+        print(f"{query:12} worst keystroke {_ms(max(typed))}  top: {best}")
+
+    timings.sort()
+    print(f"per keystroke: median {_ms(statistics.median(timings))}, "
+          f"p95 {_ms(timings[int(len(timings) * 0.95)])}, max {_ms(timings[-1])}")
+    for small_paths, queries in SMALL_CASES:
+        for query in queries:
+            fresh = lambda text: FuzzyIndex(small_paths).search(text)
+            mismatches += typing_mismatches(FuzzyIndex(small_paths), fresh, query)[2]
+    print("FAILED: typed results differ from fresh searches" if mismatches else "ok")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_replace_all.py
+-------------------------------
+Replace All cost with many matches.
+
+Builds a document with ``--matches`` occurrences of the query (four per
+line), runs SearchEngine.replace_all() and reports the time, whether the
+result equals ``re.subn`` over the original text and whether a single undo
+restores the original. Then it checks regex replacements with zero-width
+matches (``^``, ``$``, ``\b``, ...) against ``re.subn`` on texts spanning
+several chunks, ending with and without a newline, and on an empty text.
+``--naive`` times the per-match loop (QTextDocument.find + insertText, one
+undo step each) instead; it is O(matches x document), so use it with far
+fewer matches.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_replace_all
+"""
+
+import re
+import sys
+import time
+import argparse
+
+from PyQt5.QtWidgets import QApplication
+
+from utils.editor import EnhancedTextEditor
+
+LINE = "{0}: foo bar FOO baz foo qux Foo end"
+ZERO_WIDTH_CASES = [(r"^", "> "), (r"$", ";"), (r"^$", "(empty)"), (r"\b", "|"), (r"o*", "-"), (r"(?=foo)", "_")]
+
+
+def naive_replace_all(document, query, replacement):
+    """The per-match loop Replace All is usually written as, kept for comparison."""
+    count = 0
+    cursor = document.find(query)
+    while not cursor.isNull():
+        cursor.insertText(replacement)
+        count += 1
+        cursor = document.find(query, cursor)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--matches", type=int, default=1_000_000, help="occurrences of the query")
+    parser.add_argument("--naive", action="store_true", help="time the per-match insertText loop instead")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    text = "\n".join(LINE.format(i) for i in range(args.matches // 4))
+    expected, expected_count = re.subn("foo", "replacement", text, flags=re.IGNORECASE)
+
+    editor = EnhancedTextEditor()
+    editor.setPlainText(text)
+    document = editor.document()
+    print(f"{document.blockCount():,} lines, {len(text) / 1e6:.1f} M characters")
+
+    start = time.perf_counter()
+    if args.naive:
+        count = naive_replace_all(document, "foo", "replacement")
+    else:
+        engine = editor.search_engine()
+        engine.set_query("foo")
+        count = engine.replace_all("replacement")
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+
+    print(f"{'naive' if args.naive else 'replace_all'}  {count:,} replacements in {elapsed * 1000:.1f} ms")
+    print(f"matches re.subn: {count == expected_count and editor.toPlainText() == expected}")
+    document.undo()
+    print(f"one undo restores the original: {editor.toPlainText() == text}")
+    print(f"zero-width matches like re.subn: {check_zero_width(editor)}")
+
+
+def check_zero_width(editor):
+    """Whether regex Replace All with zero-width matches gives what re.subn gives."""
+    lines = "\n".join(LINE.format(i) if i % 7 else "" for i in range(5000))  # > 3 chunks
+    ok = True
+    for text in (lines, lines + "\n", "", "\n", "foo"):
+        for query, replacement in ZERO_WIDTH_CASES:
+            expected, expected_count = re.subn(query, replacement, text, flags=re.MULTILINE | re.IGNORECASE)
+            editor.setPlainText(text)
+            engine = editor.search_engine()
+            engine.set_query(query, regex=True)
+            count = engine.replace_all(replacement)
+            if count != expected_count or editor.toPlainText() != expected:
+                print(f"  {query!r} over {len(text):,} characters: {count} replaced, re.subn {expected_count}")
+                ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_search.py
+--------------------------
+Find cost on a large document.
+
+Loads a document of about ``--mb`` megabytes and times, for one query:
+setting the query (viewport highlights), the first find-next (scanning from
+the cursor), building the full match index in idle ticks (total time and
+longest tick) and find-next / find-previous once the index is complete.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_search
+"""
+
+import sys
+import time
+import argparse
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QTextCursor
+
+from utils.editor import EnhancedTextEditor
+
+LINE = "the quick brown fox jumps over the lazy dog {} times, said Émile\n"
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--mb", type=int, default=100, help="document size in megabytes")
+    parser.add_argument("--query", default="lazy", help="text to search for")
+    parser.add_argument("--regex", action="store_true", help="treat the query as a regular expression")
+    parser.add_argument("--steps", type=int, default=1000, help="find-next calls to average")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    count = args.mb * 1024 * 1024 // len(LINE)
+    editor = EnhancedTextEditor()
+    editor.resize(1000, 800)
+    start = time.perf_counter()
+    editor.setPlainText("".join(LINE.format(i) for i in range(count)))
+    print(f"{count:,} lines loaded in {time.perf_counter() - start:.1f} s")
+    editor.show()
+    editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum() // 2)
+    app.processEvents()
+    engine = editor.search_engine()
+
+    start = time.perf_counter()
+    engine.set_query(args.query, regex=args.regex)
+    print(f"set query     {_ms(time.perf_counter() - start)}  (viewport highlighted)")
+
+    start = time.perf_counter()
+    engine.find_next()
+    print(f"first find    {_ms(time.perf_counter() - start)}  (no index yet)")
+
+    ticks = []
+    tick = engine._count_tick
+
+    def timed_tick():
+        begin = time.perf_counter()
+        tick()
+        ticks.append(time.perf_counter() - begin)
+
+    engine._timer.timeout.disconnect()
+    engine._timer.timeout.connect(timed_tick)
+    engine._start_count()
+    start = time.perf_counter()
+    while not engine.is_complete():
+        app.processEvents()
+    print(f"count         {_ms(time.perf_counter() - start)}  {engine.count():,} matches, "
+          f"{len(ticks)} ticks, longest {max(ticks, default=0) * 1000:.1f} ms")
+
+    for backward in (False, True):
+        cursor = editor.textCursor()
+        cursor.movePosition(QTextCursor.Start)
+        editor.setTextCursor(cursor)
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            engine.find_next(backward=backward)
+        name = "find previous" if backward else "find next"
+        print(f"{name:<13} {_ms((time.perf_counter() - start) / args.steps)}  per call (indexed)")
+
+
+if __name__ == "__main__":
+    main()
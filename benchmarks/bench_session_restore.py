@@ -0,0 +1,63 @@
+"""
+benchmarks/bench_session_restore.py
+-----------------------------------
+Startup time with a restored session of 2 to 200 tabs.
+
+Writes ``--lines``-line notes to a temporary home folder, stores a session
+with each of the ``--sizes`` tab counts and times constructing the main
+window (which restores the session as placeholder tabs) and then the
+background load of the current tab.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_session_restore
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:8.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 20, 200], help="session tab counts")
+    parser.add_argument("--lines", type=int, default=20_000, help="lines per note")
+    args = parser.parse_args(argv)
+
+    home = tempfile.mkdtemp(prefix="bench_session_")
+    os.environ["HOME"] = home  # before the state store is opened
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.secure_notepad import EnhancedNotepad
+    from utils.state_store import state_store
+
+    text = "".join(f"line {i}: the quick brown fox jumps over the lazy dog\n" for i in range(args.lines))
+    paths = []
+    for i in range(max(args.sizes)):
+        paths.append(os.path.join(home, f"note{i:03d}.txt"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write(text)
+
+    for size in args.sizes:
+        state_store().set("session", "tabs", [{"path": path, "encrypted": False, "view": {}} for path in paths[:size]])
+        state_store().set("session", "current", size - 1)
+        start = time.perf_counter()
+        window = EnhancedNotepad()
+        startup = time.perf_counter() - start
+        window.show()
+        while window.current_editor() is None:
+            app.processEvents()
+        loaded = time.perf_counter() - start
+        print(f"{size:4} tabs: window ready {_ms(startup)}, current tab loaded {_ms(loaded)}")
+        window.session.save = lambda: None  # keep the stored session for the next size
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+benchmarks/bench_status_keystroke.py
+------------------------------------
+Keystroke handling cost with large documents open.
+
+Opens several large tabs, types into the current one and reports the time
+per keystroke including the coalesced status bar refresh. ``--legacy`` adds
+the old per-keystroke ``len(editor.toPlainText())`` update for comparison.
+
+Run:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_status_keystroke
+"""
+
+import sys
+import time
+import argparse
+import statistics
+
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget
+from PyQt5.QtTest import QTest
+
+from utils.editor import EnhancedTextEditor
+from utils.status_manager import StatusManager
+
+
+class _Window(QMainWindow):
+    """Minimal host exposing the tab API StatusManager expects."""
+
+    default_font_size = 12
+
+    def __init__(self):
+        super().__init__()
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+        self.status_manager = StatusManager(self, self)
+        self.tabs.currentChanged.connect(self.status_manager.update_status_bar)
+
+    def current_editor(self):
+        return self.tabs.currentWidget()
+
+    def current_document(self):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--lines", type=int, default=200_000, help="lines per document")
+    parser.add_argument("--tabs", type=int, default=4, help="number of open documents")
+    parser.add_argument("--keys", type=int, default=300, help="keystrokes to type")
+    parser.add_argument("--legacy", action="store_true", help="also time toPlainText() per keystroke")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = _Window()
+    window.resize(1000, 700)
+    window.show()
+
+    text = "\n".join(f"line {i}: the quick brown fox jumps over the lazy dog" for i in range(args.lines))
+    for _ in range(args.tabs):
+        editor = EnhancedTextEditor()
+        editor.setPlainText(text)
+        window.tabs.addTab(editor, "bench")
+    editor = window.current_editor()
+    editor.moveCursor(editor.textCursor().End)
+    app.processEvents()
+
+    flushes = 0
+    original_flush = window.status_manager.flush
+
+    def counting_flush():
+        nonlocal flushes
+        flushes += 1
+        original_flush()
+
+    window.status_manager._timer.timeout.disconnect()
+    window.status_manager._timer.timeout.connect(counting_flush)
+
+    samples, legacy = [], []
+    for _ in range(args.keys):
+        start = time.perf_counter()
+        QTest.keyClick(editor, "a")
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+        if args.legacy:
+            start = time.perf_counter()
+            len(editor.toPlainText())
+            legacy.append(time.perf_counter() - start)
+    QTest.qWait(StatusManager.FRAME_INTERVAL_MS * 2)
+
+    samples.sort()
+    print(f"documents: {args.tabs} x {args.lines} lines ({len(text) / 1e6:.1f} MB each)")
+    print(f"keystrokes: {args.keys}, status refreshes: {flushes}")
+    print(f"per keystroke: mean {statistics.mean(samples) * 1e3:.3f} ms, "
+          f"p95 {samples[int(len(samples) * 0.95) - 1] * 1e3:.3f} ms")
+    if legacy:
+        print(f"legacy toPlainText() per keystroke: mean {statistics.mean(legacy) * 1e3:.3f} ms")
+    print(f"status label: {window.status_manager.char_count_label.text()}")
+
+
+if __name__ == "__main__":
+    main()
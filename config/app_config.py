@@ -5,16 +5,25 @@
 
 import os
 import sys
-from dotenv import load_dotenv
+import logging
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------
 # 🌍 Load .env File (Development Mode)
 # ---------------------------------------------------------
+# python-dotenv is only needed when there is a .env file to read, so it is
+# imported only then (it is not in requirements.txt). A missing .env is the
+# normal case for installed builds and is only logged at debug level.
 ENV_FILE = ".env"
 if os.path.exists(ENV_FILE):
-    load_dotenv(ENV_FILE)
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(ENV_FILE)
+    except ImportError:
+        logger.warning(f"{ENV_FILE} found but python-dotenv is not installed. Using default values.")
 else:
-    print(f"⚠️ Warning: {ENV_FILE} not found. Using default values.")
+    logger.debug(f"{ENV_FILE} not found. Using default values.")
 
 # ---------------------------------------------------------
 # 📦 Resource Path (Supports PyInstaller)
@@ -93,4 +102,4 @@ def safe_log(msg: str):
     except Exception:
         pass
 
-safe_log(f"✅ Secure Notepad Pro config loaded successfully ({APP_ENV.upper()} MODE)")
+logger.debug(f"Secure Notepad Pro config loaded ({APP_ENV.upper()} MODE)")
@@ -11,7 +11,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPixmap, QFont, QColor
 from PyQt5.QtCore import Qt
-from config.app_config import CONFIG, ABOUT_APP, APP_NAME, APP_VERSION, APP_DEVELOPER, AUTHOR, HASH_NAME
+from config.app_config import GITHUB_ID, PAYPAL_ID, KOFI_ID, BTC_ID, ETH_ID, ABOUT_APP, APP_NAME, APP_VERSION, APP_DEVELOPER, AUTHOR, HASH_NAME
 
 
 class DonateDialog(QDialog):
@@ -102,7 +102,7 @@ class DonateDialog(QDialog):
         github_btn = QPushButton("Visit GitHub")
         github_btn.setFixedWidth(135)
         github_btn.setFixedHeight(36)
-        github_btn.clicked.connect(lambda: webbrowser.open(CONFIG["GITHUB_ID"]))
+        github_btn.clicked.connect(lambda: webbrowser.open(GITHUB_ID))
 
         github_layout.addWidget(github_icon)
         github_layout.addLayout(github_text_layout)
@@ -133,7 +133,7 @@ class DonateDialog(QDialog):
         paypal_btn = QPushButton("Donate Now")
         paypal_btn.setFixedWidth(135)
         paypal_btn.setFixedHeight(36)
-        paypal_btn.clicked.connect(lambda: webbrowser.open(CONFIG["PAYPAL_ID"]))
+        paypal_btn.clicked.connect(lambda: webbrowser.open(PAYPAL_ID))
 
         paypal_layout.addWidget(paypal_icon)
         paypal_layout.addLayout(paypal_text_layout)
@@ -164,7 +164,7 @@ class DonateDialog(QDialog):
         kofi_btn = QPushButton("Ko-fi")
         kofi_btn.setFixedWidth(135)
         kofi_btn.setFixedHeight(36)
-        kofi_btn.clicked.connect(lambda: webbrowser.open(CONFIG["KOFI_ID"]))
+        kofi_btn.clicked.connect(lambda: webbrowser.open(KOFI_ID))
 
         kofi_layout.addWidget(kofi_icon)
         kofi_layout.addLayout(kofi_text_layout)
@@ -339,8 +339,8 @@ class DonateDialog(QDialog):
     def show_crypto_addresses(self):
         """Show cryptocurrency addresses with copy support"""
         addresses = {
-            "Bitcoin (BTC)": {CONFIG["BTC_ID"]},
-            "Ethereum (ETH)": {CONFIG["ETH_ID"]}
+            "Bitcoin (BTC)": {BTC_ID},
+            "Ethereum (ETH)": {ETH_ID}
         }
 
         msg = ""
@@ -37,13 +37,23 @@ class HelpDialog(QDialog):
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
 
-        # Tab widget
+        # Tab widget: each tab's content is built the first time it is shown
         tab_widget = QTabWidget()
-        tab_widget.addTab(self.create_overview_tab(), "Overview")
-        tab_widget.addTab(self.create_shortcuts_tab(), "Keyboard Shortcuts")
-        tab_widget.addTab(self.create_encryption_tab(), "Encryption & Security")
-        tab_widget.addTab(self.create_theming_tab(), "Themes & Appearance")
-        tab_widget.addTab(self.create_troubleshooting_tab(), "Troubleshooting")
+        self._tab_builders = {}
+        for builder, title in (
+            (self.create_overview_tab, "Overview"),
+            (self.create_shortcuts_tab, "Keyboard Shortcuts"),
+            (self.create_encryption_tab, "Encryption & Security"),
+            (self.create_theming_tab, "Themes & Appearance"),
+            (self.create_troubleshooting_tab, "Troubleshooting"),
+        ):
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self._tab_builders[page] = builder
+            tab_widget.addTab(page, title)
+        tab_widget.currentChanged.connect(lambda index: self.build_tab(tab_widget.widget(index)))
+        self.build_tab(tab_widget.widget(0))
         layout.addWidget(tab_widget)
 
         # Close button
@@ -425,6 +435,12 @@ class HelpDialog(QDialog):
             }
         """)
 
+    def build_tab(self, page):
+        """Fill a tab page with its content if that has not been done yet."""
+        builder = self._tab_builders.pop(page, None)
+        if builder is not None:
+            page.layout().addWidget(builder())
+
     # ================================
     #   TAB CONTENTS
     # ================================
@@ -18,9 +18,9 @@ Dependencies: PyQt5 >= 5.15.7, cryptography >= 41.0.0 (optional)
 
 import sys
 import os
+import time
 import logging
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QApplication, QMessageBox
+import multiprocessing
 
 # -----------------------------------------------------
 # Helper: Get Absolute Resource Path
@@ -41,11 +41,23 @@ def resource_path(relative_path: str) -> str:
 # -----------------------------------------------------
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+# -----------------------------------------------------
+# Startup Profiling (--profile-startup[=TRACE.json])
+# -----------------------------------------------------
+from utils import startup_profiler
+startup_profiler.enable_from_argv()
+span = startup_profiler.span
+
+with span("import PyQt5", "import"):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+
 # -----------------------------------------------------
 # Import Main Window
 # -----------------------------------------------------
 try:
-    from ui.secure_notepad import EnhancedNotepad
+    with span("import ui.secure_notepad", "import"):
+        from ui.secure_notepad import EnhancedNotepad
 except ImportError as e:
     logging.exception("Failed to import EnhancedNotepad from ui.secure_notepad")
     QMessageBox.critical(None, "Import Error", f"Cannot import main window:\n{e}")
@@ -55,13 +67,15 @@ except ImportError as e:
 # Optional Safe Imports
 # -----------------------------------------------------
 try:
-    from utils.theme_manager import load_theme
+    with span("import utils.theme_manager", "import"):
+        from utils.theme_manager import load_theme
 except ImportError:
     load_theme = None
     logging.warning("Theme manager not found. Skipping theme loading.")
 
 try:
-    from utils.icon_manager import load_icon
+    with span("import utils.icon_manager", "import"):
+        from utils.icon_manager import load_icon
 except ImportError:
     load_icon = None
     logging.warning("Icon manager not found. Skipping icon loading.")
@@ -88,20 +102,23 @@ def main():
             QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
 
         # Create QApplication
-        app = QApplication(sys.argv)
+        with span("QApplication"):
+            app = QApplication(sys.argv)
         app.setQuitOnLastWindowClosed(True)
 
         # Load Theme (Safe)
         if load_theme:
             try:
-                load_theme(app)
+                with span("load_theme"):
+                    load_theme(app)
                 logging.info("Theme loaded successfully.")
             except Exception as e:
                 logging.exception("Failed to load theme. Continuing without theme.")
 
         # Initialize Main Window
         try:
-            window = EnhancedNotepad()
+            with span("EnhancedNotepad.__init__"):
+                window = EnhancedNotepad()
         except Exception as e:
             logging.exception("Failed to initialize main window.")
             QMessageBox.critical(None, "Startup Error", f"Failed to initialize main window:\n\n{e}")
@@ -110,7 +127,8 @@ def main():
         # Load Window Icon (Safe)
         if load_icon:
             try:
-                icon = load_icon("icon.png")
+                with span("load_icon"):
+                    icon = load_icon("icon.png")
                 if icon:
                     window.setWindowIcon(icon)
             except Exception as e:
@@ -118,7 +136,10 @@ def main():
 
         # Show Window
         try:
-            window.show()
+            with span("window.show"):
+                window.show()
+            if startup_profiler.profiler():
+                startup_profiler.profiler().finish_after_first_paint(window, time.perf_counter())
         except Exception as e:
             logging.exception("Failed to show main window.")
             QMessageBox.critical(None, "Runtime Error", f"Failed to show main window:\n\n{e}")
@@ -136,5 +157,7 @@ def main():
 # Run Main
 # -----------------------------------------------------
 if __name__ == "__main__":
+    # Highlighter worker processes are spawned; needed for PyInstaller builds.
+    multiprocessing.freeze_support()
     logging.info("🚀 Secure Notepad Pro starting in production mode...")
     main()
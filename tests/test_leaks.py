@@ -0,0 +1,72 @@
+"""
+tests/test_leaks.py
+-------------------
+Opening and closing 1,000 tabs and 1,000 dialogs must not leak.
+
+Runs offscreen against a throwaway home folder and asserts the bounds that
+benchmarks/bench_leaks.py reports: live widgets and QObjects under the
+window grow by at most SLACK over each phase, gc-tracked Python objects by
+at most SLACK * 100, and RSS by at most RSS_MB over the second half of a
+phase (the first half raises the heap to its working size).
+
+Run:  python -m pytest tests/test_leaks.py
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+TABS = 1000
+DIALOGS = 1000
+SLACK = 20
+RSS_MB = 10
+
+
+@pytest.fixture(scope="module")
+def app_window(tmp_path_factory):
+    # Before the app modules are imported: they place their state under HOME.
+    home = os.environ.get("HOME")
+    os.environ["HOME"] = str(tmp_path_factory.mktemp("home"))
+    from PyQt5.QtWidgets import QApplication
+    from benchmarks.bench_leaks import open_close_tabs, open_close_dialogs
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.secure_notepad import EnhancedNotepad
+    window = EnhancedNotepad()
+    window.resize(1000, 700)
+    window.show()
+    # Warm up: first-use caches (fonts, grammars, styles, cached dialogs) are not leaks.
+    open_close_tabs(app, window, 20)
+    open_close_dialogs(app, window, 12)
+    yield app, window
+    window.session.save = lambda: None
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    if home is not None:
+        os.environ["HOME"] = home
+
+
+def assert_bounded(run, app, window, count):
+    from benchmarks.bench_leaks import snapshot
+    before = snapshot(app, window)
+    run(app, window, count // 2)
+    middle = snapshot(app, window)
+    run(app, window, count - count // 2)
+    after = snapshot(app, window)
+    assert after["widgets"] - before["widgets"] <= SLACK
+    assert after["window objects"] - before["window objects"] <= SLACK
+    assert after["python objects"] - before["python objects"] <= SLACK * 100
+    assert after["rss MB"] - middle["rss MB"] <= RSS_MB
+
+
+def test_tabs_do_not_leak(app_window):
+    from benchmarks.bench_leaks import open_close_tabs
+    assert_bounded(open_close_tabs, *app_window, TABS)
+
+
+def test_dialogs_do_not_leak(app_window):
+    from benchmarks.bench_leaks import open_close_dialogs
+    assert_bounded(open_close_dialogs, *app_window, DIALOGS)
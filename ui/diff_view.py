@@ -0,0 +1,149 @@
+"""
+ui/diff_view.py
+---------------
+Side-by-side diff view for opcodes produced by utils.diff_engine.
+
+The view never builds per-line widgets or a text document: it keeps the
+opcode list plus a cumulative row table and paints only the rows that
+intersect the viewport, so a diff of a 1M-line document scrolls as cheaply
+as a small one.
+"""
+
+from bisect import bisect_right
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtGui import QPainter, QColor, QFontDatabase
+from PyQt5.QtCore import Qt
+
+COLORS = {
+    "background": QColor("#1e1e1e"),
+    "gutter": QColor("#222222"),
+    "gutter_text": QColor("#858585"),
+    "text": QColor("#dcdcdc"),
+    "delete": QColor("#4b1d1d"),
+    "insert": QColor("#1d3d24"),
+    "filler": QColor("#2a2a2a"),
+    "divider": QColor("#3d3d5c"),
+}
+
+
+class SideBySideDiffView(QAbstractScrollArea):
+    """Paints two columns (old | new) for the rows visible in the viewport."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.setFont(font)
+        self.a_lines = []
+        self.b_lines = []
+        self.opcodes = []
+        self._row_starts = []
+        self._total_rows = 0
+        self._max_chars = 0
+
+    # ---------------- Data ----------------
+    def set_diff(self, a_lines, b_lines, opcodes):
+        self.a_lines = a_lines
+        self.b_lines = b_lines
+        self.opcodes = opcodes
+        self._row_starts = []
+        rows = 0
+        for _, i1, i2, j1, j2 in opcodes:
+            self._row_starts.append(rows)
+            rows += max(i2 - i1, j2 - j1)
+        self._total_rows = rows
+        self._max_chars = max(max(map(len, a_lines), default=0), max(map(len, b_lines), default=0))
+        self._update_scrollbars()
+        self.verticalScrollBar().setValue(0)
+        self.next_hunk()
+        self.viewport().update()
+
+    def clear(self):
+        self.set_diff([], [], [])
+
+    def _row(self, row):
+        """Return (tag, old_index or None, new_index or None) for a display row."""
+        op_index = bisect_right(self._row_starts, row) - 1
+        tag, i1, i2, j1, j2 = self.opcodes[op_index]
+        offset = row - self._row_starts[op_index]
+        a = i1 + offset if i1 + offset < i2 else None
+        b = j1 + offset if j1 + offset < j2 else None
+        return tag, a, b
+
+    # ---------------- Navigation ----------------
+    def _visible_rows(self):
+        return max(1, self.viewport().height() // self.fontMetrics().height())
+
+    def _update_scrollbars(self):
+        visible = self._visible_rows()
+        self.verticalScrollBar().setRange(0, max(0, self._total_rows - visible))
+        self.verticalScrollBar().setPageStep(visible)
+        char_width = self.fontMetrics().horizontalAdvance("9")
+        column = max(1, self.viewport().width() // 2 - self._gutter_width())
+        self.horizontalScrollBar().setRange(0, max(0, self._max_chars * char_width - column))
+        self.horizontalScrollBar().setPageStep(column)
+
+    def _scroll_to_row(self, row):
+        self.verticalScrollBar().setValue(max(0, row - self._visible_rows() // 3))
+
+    def next_hunk(self):
+        """Scroll to the first change below the top of the viewport."""
+        top = self.verticalScrollBar().value() + self._visible_rows() // 3
+        for index, op in enumerate(self.opcodes):
+            if op[0] != "equal" and self._row_starts[index] > top:
+                self._scroll_to_row(self._row_starts[index])
+                return
+
+    def previous_hunk(self):
+        top = self.verticalScrollBar().value() + self._visible_rows() // 3
+        for index in range(len(self.opcodes) - 1, -1, -1):
+            if self.opcodes[index][0] != "equal" and self._row_starts[index] < top:
+                self._scroll_to_row(self._row_starts[index])
+                return
+
+    # ---------------- Painting ----------------
+    def _gutter_width(self):
+        digits = len(str(max(1, len(self.a_lines), len(self.b_lines))))
+        return self.fontMetrics().horizontalAdvance("9") * digits + 8
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = self.viewport().rect()
+        painter.fillRect(rect, COLORS["background"])
+        if not self._total_rows:
+            return
+
+        fm = self.fontMetrics()
+        line_height = fm.height()
+        gutter = self._gutter_width()
+        half = rect.width() // 2
+        x_offset = self.horizontalScrollBar().value()
+        first = self.verticalScrollBar().value() + event.rect().top() // line_height
+        last = min(self._total_rows, self.verticalScrollBar().value() + event.rect().bottom() // line_height + 1)
+
+        for row in range(first, last):
+            y = (row - self.verticalScrollBar().value()) * line_height
+            tag, a, b = self._row(row)
+            for side, index, lines, x0 in ((0, a, self.a_lines, 0), (1, b, self.b_lines, half)):
+                if index is None:
+                    painter.fillRect(x0, y, half, line_height, COLORS["filler"])
+                    continue
+                if tag != "equal":
+                    color = COLORS["delete"] if side == 0 else COLORS["insert"]
+                    painter.fillRect(x0 + gutter, y, half - gutter, line_height, color)
+                painter.fillRect(x0, y, gutter, line_height, COLORS["gutter"])
+                painter.setPen(COLORS["gutter_text"])
+                painter.drawText(x0, y, gutter - 4, line_height, Qt.AlignRight | Qt.AlignVCenter, str(index + 1))
+                painter.setPen(COLORS["text"])
+                painter.setClipRect(x0 + gutter + 4, y, half - gutter - 4, line_height)
+                painter.drawText(x0 + gutter + 4 - x_offset, y + fm.ascent(), lines[index])
+                painter.setClipping(False)
+
+        painter.setPen(COLORS["divider"])
+        painter.drawLine(half, rect.top(), half, rect.bottom())
@@ -0,0 +1,507 @@
+"""
+ui/find_in_files.py
+-------------------
+Find in Files dock: search every note under a folder.
+
+A walker task lists the files on a worker and queues one search task per
+file on the panel's own QThreadPool (see utils/file_search.py for how a
+file is searched). Results are streamed back per file and appended to the
+list as they arrive. Starting a new search or pressing Cancel sets the
+job's Event, drops the queued tasks and ignores late results.
+
+With "Index" checked, the folder is kept in a utils.notes_index.NotesIndex:
+built in the background, refreshed periodically and after each save, and
+brought up to date (a stat of every file) before each search, which then
+reads only the files the index says may match. When encrypted notes are
+searched too, their words come from an EncryptedNotesIndex for the search
+password, kept encrypted on disk and in memory for the rest of the session,
+so only the encrypted notes that may match are decrypted.
+"""
+
+import os
+import threading
+
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QListView, QPushButton,
+    QLineEdit, QLabel, QCheckBox, QFileDialog
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThread, QThreadPool, QTimer, pyqtSignal
+)
+
+from utils.encryption import CRYPTO_AVAILABLE
+from utils.file_search import iter_files, search_file, is_encrypted, name_patterns, name_matches
+from utils.notes_index import NotesIndex, EncryptedNotesIndex
+from utils.state_store import state_store
+from utils.search_engine import compile_pattern, SearchError
+
+
+class FileMatchModel(QAbstractListModel):
+    """List model over FileMatch records, appended to as results stream in."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matches = []
+        self.root = ""
+
+    def clear(self, root=""):
+        self.beginResetModel()
+        self.matches = []
+        self.root = root
+        self.endResetModel()
+
+    def append(self, matches):
+        if not matches:
+            return
+        first = len(self.matches)
+        self.beginInsertRows(QModelIndex(), first, first + len(matches) - 1)
+        self.matches.extend(matches)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.matches)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        match = self.matches[index.row()]
+        if role == Qt.DisplayRole:
+            path = os.path.relpath(match.path, self.root) if self.root else match.path
+            return f"{path}:{match.line}:  {match.preview}"
+        if role == Qt.ToolTipRole:
+            return match.path
+        if role == Qt.UserRole:
+            return match
+        return None
+
+
+class _SearchSignals(QObject):
+    found = pyqtSignal(int, object)  # job, [FileMatch] of one file
+    failed = pyqtSignal(int, str, str)  # job, path, error
+    file_done = pyqtSignal(int)
+    walk_done = pyqtSignal(int, int)  # job, number of files queued
+    indexed = pyqtSignal(object)  # NotesIndex brought up to date
+
+
+class _FileTask(QRunnable):
+    """Search one file."""
+
+    def __init__(self, job, path, search, cancelled, signals):
+        super().__init__()
+        self.job = job
+        self.path = path
+        self.search = search  # keyword arguments for search_file()
+        self.cancelled = cancelled
+        self.signals = signals
+
+    def run(self):
+        try:
+            if not self.cancelled.is_set():
+                matches = search_file(self.path, cancelled=self.cancelled, **self.search)
+                if matches:
+                    self.signals.found.emit(self.job, matches)
+        except Exception as e:
+            self.signals.failed.emit(self.job, self.path, str(e) or type(e).__name__)
+        finally:
+            self.signals.file_done.emit(self.job)
+
+
+class _WalkTask(QRunnable):
+    """List the files under the folder (or the index candidates) and queue a _FileTask for each."""
+
+    def __init__(self, job, pool, root, patterns, include_encrypted, search, cancelled, signals,
+                 index=None, vault=None, whole_words=False):
+        super().__init__()
+        self.job = job
+        self.pool = pool
+        self.root = root
+        self.patterns = patterns
+        self.include_encrypted = include_encrypted
+        self.search = search
+        self.cancelled = cancelled
+        self.signals = signals
+        self.index = index
+        self.vault = vault  # EncryptedNotesIndex for the search password
+        self.whole_words = whole_words
+
+    def _indexed_files(self):
+        """The files the indexes say may match, or None to walk the folder."""
+        lookup = (self.search["query"], self.whole_words, self.search["regex"])
+        plain = encrypted = None
+        if self.index is not None:
+            self.index.update(self.cancelled)
+            plain = self.index.candidates(*lookup)
+        if self.vault is not None:
+            self.vault.update(self.cancelled)
+            encrypted = self.vault.candidates(*lookup)
+        if plain is None and encrypted is None:
+            return None
+        if plain is None:
+            plain = iter_files(self.root, self.patterns, False, self.cancelled)
+        elif encrypted is not None:
+            plain = [path for path in plain if not is_encrypted(path)]
+        patterns = name_patterns(self.patterns)
+        return [path for path in [*plain, *(encrypted or ())]
+                if path.startswith(os.path.join(self.root, ""))
+                and name_matches(os.path.basename(path), patterns, self.include_encrypted)]
+
+    def run(self):
+        count = 0
+        try:
+            files = self._indexed_files() if self.index or self.vault else None
+            if files is None:
+                files = iter_files(self.root, self.patterns, self.include_encrypted, self.cancelled)
+            for path in files:
+                if self.cancelled.is_set():
+                    break
+                self.pool.start(_FileTask(self.job, path, self.search, self.cancelled, self.signals))
+                count += 1
+        except Exception as e:
+            self.signals.failed.emit(self.job, self.root, str(e))
+        finally:
+            self.signals.walk_done.emit(self.job, count)
+
+
+class _IndexTask(QRunnable):
+    """Load (the first time) and update a NotesIndex, or re-index just ``paths``."""
+
+    def __init__(self, index, signals, paths=None):
+        super().__init__()
+        self.index = index
+        self.signals = signals
+        self.paths = paths
+
+    def run(self):
+        try:
+            if self.paths:
+                self.index.refresh(self.paths)
+            else:
+                self.index.update()
+        except Exception as e:
+            print(f"Error updating notes index: {e}")
+        finally:
+            self.signals.indexed.emit(self.index)
+
+
+class FindInFilesPanel(QDockWidget):
+    """Dock that searches a folder and lists the matches as they are found."""
+
+    open_requested = pyqtSignal(str, int, int, int, str)  # path, line, column, length, password
+
+    MAX_RESULTS = 10000
+    INDEX_REFRESH_MS = 5 * 60 * 1000
+    INDEX_SAVE_DELAY_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__("Find in Files", parent)
+        self.setObjectName("FindInFilesPanel")
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThread.idealThreadCount()))
+
+        self._job = 0
+        self._cancelled = None
+        self._running = False
+        self._files = None  # files queued, known once the walk is done
+        self._done = 0
+        self._errors = 0
+        self._matched_files = 0
+        self._truncated = False
+        self._password = ""
+
+        self.signals = _SearchSignals(self)
+        self.signals.found.connect(self._on_found)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.file_done.connect(self._on_file_done)
+        self.signals.walk_done.connect(self._on_walk_done)
+        self.signals.indexed.connect(self._on_indexed)
+
+        self.index = None
+        self.vault = None  # EncryptedNotesIndex of the indexed folder, for one password
+        self._ready = set()  # indexes built or loaded at least once
+        self._indexing = set()  # indexes being updated
+        self._saved_paths = {}  # path -> password (None for plain text)
+        self.index_timer = QTimer(self)
+        self.index_timer.setInterval(self.INDEX_REFRESH_MS)
+        self.index_timer.timeout.connect(self.update_index)
+        self.saved_timer = QTimer(self)
+        self.saved_timer.setSingleShot(True)
+        self.saved_timer.setInterval(self.INDEX_SAVE_DELAY_MS)
+        self.saved_timer.timeout.connect(self._refresh_saved)
+
+        self.setup_ui()
+        self.load_settings()
+
+    def setup_ui(self):
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        folder_layout = QHBoxLayout()
+        folder_layout.addWidget(QLabel("Folder:"))
+        self.folder_input = QLineEdit()
+        self.folder_input.textChanged.connect(self._sync_index_checkbox)
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse_folder)
+        self.index_checkbox = QCheckBox("Index")
+        self.index_checkbox.setToolTip("Keep a search index of this folder so searches only read the notes that can match")
+        self.index_checkbox.toggled.connect(self.set_indexed)
+        folder_layout.addWidget(self.folder_input)
+        folder_layout.addWidget(browse_btn)
+        folder_layout.addWidget(self.index_checkbox)
+        layout.addLayout(folder_layout)
+
+        query_layout = QHBoxLayout()
+        query_layout.addWidget(QLabel("Find:"))
+        self.search_input = QLineEdit()
+        self.search_input.returnPressed.connect(self.start_search)
+        query_layout.addWidget(self.search_input)
+        query_layout.addWidget(QLabel("Files:"))
+        self.patterns_input = QLineEdit("*")
+        self.patterns_input.setToolTip("File name patterns separated by ';' (*.txt also matches *.txt.enc)")
+        self.patterns_input.setMaximumWidth(160)
+        query_layout.addWidget(self.patterns_input)
+        layout.addLayout(query_layout)
+
+        options_layout = QHBoxLayout()
+        self.case_sensitive = QCheckBox("Case Sensitive")
+        self.whole_words = QCheckBox("Whole Words Only")
+        self.regex = QCheckBox("Regular Expression")
+        options_layout.addWidget(self.case_sensitive)
+        options_layout.addWidget(self.whole_words)
+        options_layout.addWidget(self.regex)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+
+        encrypted_layout = QHBoxLayout()
+        self.include_encrypted = QCheckBox("Search encrypted notes")
+        self.password_input = QLineEdit()
+        self.password_input.setEchoMode(QLineEdit.Password)
+        self.password_input.setPlaceholderText("Password")
+        self.password_input.setEnabled(False)
+        self.include_encrypted.toggled.connect(self.password_input.setEnabled)
+        if not CRYPTO_AVAILABLE:
+            self.include_encrypted.setEnabled(False)
+            self.include_encrypted.setToolTip("Cryptography module not available")
+        encrypted_layout.addWidget(self.include_encrypted)
+        encrypted_layout.addWidget(self.password_input)
+        layout.addLayout(encrypted_layout)
+
+        btn_layout = QHBoxLayout()
+        self.search_btn = QPushButton("Search")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.search_btn.clicked.connect(self.start_search)
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.status_label = QLabel("")
+        btn_layout.addWidget(self.search_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.status_label, 1)
+        layout.addLayout(btn_layout)
+
+        self.model = FileMatchModel(self)
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setModel(self.model)
+        self.list_view.activated.connect(self._on_activated)
+        layout.addWidget(self.list_view, 1)
+
+        self.setWidget(container)
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Search in Folder", self.folder_input.text())
+        if folder:
+            self.folder_input.setText(folder)
+
+    # ---------------- Index ----------------
+    def load_settings(self):
+        folder = state_store().get("settings", "find_in_files.indexed_folder")
+        if folder and os.path.isdir(folder):
+            self._open_index(folder)
+
+    def save_settings(self):
+        state_store().set("settings", "find_in_files.indexed_folder", self.index.root if self.index else None)
+
+    def _open_index(self, folder):
+        self.index = NotesIndex(folder)
+        self.vault = None
+        self._ready.clear()
+        self.index_timer.start()
+        self.update_index()
+        self._sync_index_checkbox()
+
+    def set_indexed(self, enabled):
+        """Start or stop indexing the folder in the Folder field."""
+        folder = self.folder_input.text().strip()
+        if enabled and os.path.isdir(folder):
+            if self.index is None or self.index.root != os.path.abspath(folder):
+                self._open_index(folder)
+        elif not enabled and self.index is not None and self.index.covers(folder or self.index.root):
+            self.index = self.vault = None
+            self._ready.clear()
+            self.index_timer.stop()
+        self._sync_index_checkbox()
+        self.save_settings()
+
+    def _sync_index_checkbox(self):
+        folder = self.folder_input.text().strip()
+        self.index_checkbox.blockSignals(True)
+        self.index_checkbox.setChecked(self.index is not None and bool(folder) and self.index.covers(folder))
+        self.index_checkbox.blockSignals(False)
+
+    def _open_vault(self, password):
+        """Use (loading or building in the background) the encrypted index for ``password``."""
+        if self.vault is None or self.vault.password != password:
+            self._ready.discard(self.vault)
+            self.vault = EncryptedNotesIndex(self.index.root, password)
+            self._start_indexing(self.vault)
+
+    def _start_indexing(self, index, paths=None):
+        if index is not None and index not in self._indexing:
+            self._indexing.add(index)
+            QThreadPool.globalInstance().start(_IndexTask(index, self.signals, paths))
+
+    def update_index(self):
+        """Bring the indexes up to date in the background."""
+        self._start_indexing(self.index)
+        self._start_indexing(self.vault)
+        if self.index is not None and self.index not in self._ready and not self._running:
+            self.status_label.setText("Indexing…")
+
+    def note_saved(self, path, password=None):
+        """Re-index a saved note shortly (saves in quick succession are batched)."""
+        if self.index is not None and self.index.covers(path):
+            self._saved_paths[os.path.abspath(path)] = password
+            self.saved_timer.start()
+
+    def _refresh_saved(self):
+        if self._indexing:
+            self.saved_timer.start()  # try again once the running updates are done
+            return
+        saved, self._saved_paths = self._saved_paths, {}
+        if self.index is not None and saved:
+            self._start_indexing(self.index, list(saved))
+        if self.vault is not None:
+            paths = [path for path, password in saved.items() if password == self.vault.password]
+            if paths:
+                self._start_indexing(self.vault, paths)
+
+    def _on_indexed(self, index):
+        self._indexing.discard(index)
+        if index is not self.index and index is not self.vault:
+            self.update_index()  # indexing was switched off or moved meanwhile
+            return
+        self._ready.add(index)
+        if not self._running:
+            text = f"Index: {self.index.file_count():,} files"
+            if self.vault in self._ready:
+                text += f", {self.vault.file_count():,} encrypted"
+            self.status_label.setText(text)
+
+    # ---------------- Searching ----------------
+    def start_search(self):
+        self.cancel()
+        root = self.folder_input.text().strip()
+        query = self.search_input.text()
+        if not os.path.isdir(root):
+            self.status_label.setText("Choose a folder to search")
+            return
+        try:
+            pattern = compile_pattern(query, self.case_sensitive.isChecked(),
+                                      self.whole_words.isChecked(), self.regex.isChecked())
+        except SearchError as e:
+            self.status_label.setText(str(e))
+            return
+
+        include_encrypted = self.include_encrypted.isChecked() and bool(self.password_input.text())
+        self._password = self.password_input.text() if include_encrypted else ""
+        search = {
+            "pattern": pattern,
+            "query": query,
+            "case_sensitive": self.case_sensitive.isChecked(),
+            "regex": self.regex.isChecked(),
+            "password": self._password or None,
+        }
+        patterns = self.patterns_input.text().split(";")
+        index = vault = None
+        if self.index is not None and self.index.covers(root):
+            if include_encrypted:
+                self._open_vault(self._password)
+            index = self.index if self.index in self._ready else None
+            vault = self.vault if self.vault in self._ready else None
+
+        self._job += 1
+        self._cancelled = threading.Event()
+        self._running = True
+        self._files = None
+        self._done = self._errors = self._matched_files = 0
+        self._truncated = False
+        self.model.clear(root)
+        self.cancel_btn.setEnabled(True)
+        self._update_status()
+        self.pool.start(_WalkTask(self._job, self.pool, os.path.abspath(root), patterns, include_encrypted,
+                                  search, self._cancelled, self.signals, index, vault, self.whole_words.isChecked()))
+
+    def cancel(self):
+        """Stop the running search; results found so far stay listed."""
+        if not self._running:
+            return
+        self._cancelled.set()
+        self.pool.clear()  # queued tasks never start
+        self._job += 1  # and results still in flight are ignored
+        self._finish("Cancelled: ")
+
+    def _finish(self, prefix=""):
+        self._running = False
+        self.cancel_btn.setEnabled(False)
+        self._update_status(prefix)
+
+    def _update_status(self, prefix=""):
+        matches = len(self.model.matches)
+        text = f"{prefix}{matches:,} matches in {self._matched_files:,} files"
+        if self._running:
+            total = f"{self._files:,}" if self._files is not None else "…"
+            text += f", {self._done:,} / {total} files searched"
+        if self._truncated:
+            text += f" (showing the first {self.MAX_RESULTS:,})"
+        if self._errors:
+            text += f", {self._errors} could not be read or decrypted"
+        self.status_label.setText(text)
+
+    # ---------------- Results ----------------
+    def _on_found(self, job, matches):
+        if job != self._job:
+            return
+        room = self.MAX_RESULTS - len(self.model.matches)
+        self._matched_files += 1
+        self.model.append(matches[:room])
+        if len(matches) > room:
+            self._truncated = True
+            self.cancel()
+
+    def _on_failed(self, job, path, error):
+        if job == self._job:
+            self._errors += 1
+            print(f"Error searching {path}: {error}")
+
+    def _on_file_done(self, job):
+        if job != self._job:
+            return
+        self._done += 1
+        self._check_done()
+
+    def _on_walk_done(self, job, count):
+        if job != self._job:
+            return
+        self._files = count
+        self._check_done()
+
+    def _check_done(self):
+        if self._files is not None and self._done >= self._files:
+            self._finish()
+        else:
+            self._update_status()
+
+    def _on_activated(self, index):
+        match = index.data(Qt.UserRole)
+        if match is not None:
+            self.open_requested.emit(match.path, match.line, match.column, match.length, self._password)
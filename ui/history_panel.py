@@ -0,0 +1,194 @@
+"""
+ui/history_panel.py
+-------------------
+Backup history browser for the current tab.
+
+The version list is served straight from the backup index, so opening the
+panel never touches backup contents. A version's text (and its diff against
+the editor) is loaded on a QThreadPool worker only when it is selected, and
+stale results from earlier selections are dropped.
+"""
+
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QListView, QPushButton,
+    QPlainTextEdit, QTabWidget, QLabel
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+
+from utils.diff_engine import diff_texts
+from ui.diff_view import SideBySideDiffView
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class BackupListModel(QAbstractListModel):
+    """List model over BackupVersion records; rows are formatted on demand."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.versions = []
+
+    def set_versions(self, versions):
+        self.beginResetModel()
+        self.versions = versions
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.versions)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        version = self.versions[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{version.created:%Y-%m-%d %H:%M:%S}    {_format_size(version.size)}"
+        if role == Qt.ToolTipRole:
+            return version.name
+        if role == Qt.UserRole:
+            return version
+        return None
+
+
+class _PreviewSignals(QObject):
+    loaded = pyqtSignal(int, str, object)
+    failed = pyqtSignal(int, str)
+
+
+class _PreviewTask(QRunnable):
+    """Read one backup version and diff it against a snapshot of the editor."""
+
+    def __init__(self, request_id, manager, version, current_text, signals):
+        super().__init__()
+        self.request_id = request_id
+        self.manager = manager
+        self.version = version
+        self.current_text = current_text
+        self.signals = signals
+
+    def run(self):
+        try:
+            text = self.manager.read_backup(self.version)
+            diff = diff_texts(self.current_text, text)
+            self.signals.loaded.emit(self.request_id, text, diff)
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e))
+
+
+class BackupHistoryPanel(QDockWidget):
+    """Dock listing the backups of the current tab with preview, diff and restore."""
+
+    restore_requested = pyqtSignal(str)
+
+    def __init__(self, autosave_manager, parent=None):
+        super().__init__("Backup History", parent)
+        self.setObjectName("BackupHistoryPanel")
+        self.manager = autosave_manager
+        self.key = None
+        self.text_provider = None
+        self._request_id = 0
+        self._loaded_text = None
+
+        self.signals = _PreviewSignals(self)
+        self.signals.loaded.connect(self._on_loaded)
+        self.signals.failed.connect(self._on_failed)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        self.title_label = QLabel("No file selected")
+        layout.addWidget(self.title_label)
+
+        self.model = BackupListModel(self)
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setModel(self.model)
+        self.list_view.selectionModel().currentChanged.connect(self._on_current_changed)
+        layout.addWidget(self.list_view, 1)
+
+        self.preview_tabs = QTabWidget()
+        self.preview_edit = QPlainTextEdit()
+        self.preview_edit.setReadOnly(True)
+        self.diff_view = SideBySideDiffView()
+        self.preview_tabs.addTab(self.preview_edit, "Preview")
+        self.preview_tabs.addTab(self.diff_view, "Diff (current | backup)")
+        layout.addWidget(self.preview_tabs, 2)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        self.restore_btn = QPushButton("Restore")
+        self.restore_btn.setEnabled(False)
+        refresh_btn.clicked.connect(self.refresh)
+        self.restore_btn.clicked.connect(self.restore_selected)
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.restore_btn)
+        layout.addLayout(btn_layout)
+
+        self.setWidget(container)
+
+    # ---------------- Document Binding ----------------
+    def set_document(self, key, text_provider):
+        """Show history for ``key``; ``text_provider()`` returns the current text."""
+        self.key = str(key) if key else None
+        self.text_provider = text_provider
+        self.title_label.setText(self.key or "No file selected")
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        self._request_id += 1
+        self._loaded_text = None
+        self.preview_edit.clear()
+        self.diff_view.clear()
+        self.restore_btn.setEnabled(False)
+        self.model.set_versions(self.manager.get_backups(self.key) if self.key else [])
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    # ---------------- Preview ----------------
+    def _on_current_changed(self, current, _previous):
+        version = current.data(Qt.UserRole) if current.isValid() else None
+        self._request_id += 1
+        self._loaded_text = None
+        self.restore_btn.setEnabled(False)
+        if version is None:
+            return
+        self.preview_edit.setPlainText("Loading…")
+        self.diff_view.clear()
+        current_text = self.text_provider() if self.text_provider else ""
+        task = _PreviewTask(self._request_id, self.manager, version, current_text, self.signals)
+        QThreadPool.globalInstance().start(task)
+
+    def _on_loaded(self, request_id, text, diff):
+        if request_id != self._request_id:
+            return
+        self._loaded_text = text
+        self.preview_edit.setPlainText(text)
+        self.diff_view.set_diff(*diff)
+        self.restore_btn.setEnabled(True)
+
+    def _on_failed(self, request_id, error):
+        if request_id != self._request_id:
+            return
+        self.preview_edit.setPlainText(f"Unable to load backup:\n{error}")
+
+    # ---------------- Restore ----------------
+    def restore_selected(self):
+        """Restore the previewed version (the editor keeps it undoable)."""
+        if self._loaded_text is not None:
+            self.restore_requested.emit(self._loaded_text)
@@ -0,0 +1,228 @@
+"""
+ui/quick_open.py
+----------------
+Quick Open (Ctrl+P): fuzzy-find a recent file or any file of the workspace
+folder by typing part of its name.
+
+WorkspaceFiles lists the workspace folder on a QThreadPool worker and
+builds a utils.fuzzy.FuzzyIndex of it there, so the palette only ever runs
+lookups on the GUI thread. A QFileSystemWatcher on the listed directories
+triggers a (debounced) rescan when files are added, removed or renamed.
+Recent files are few and ranked directly, ahead of workspace files.
+"""
+
+import os
+
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+from utils.fuzzy import FuzzyIndex, fuzzy_score
+from utils.state_store import state_store
+
+MAX_WATCHED_DIRS = 2000  # inotify watches are a limited resource
+
+
+class _ScanSignals(QObject):
+    scanned = pyqtSignal(str, object, object)  # root, FuzzyIndex, directories
+    failed = pyqtSignal(str, str)
+
+
+class _ScanTask(QRunnable):
+    """List every file under the workspace (hidden directories skipped) and index them."""
+
+    def __init__(self, root, signals):
+        super().__init__()
+        self.root = root
+        self.signals = signals
+
+    def run(self):
+        try:
+            files, directories = [], []
+            for directory, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                directories.append(directory)
+                files.extend(os.path.join(directory, name) for name in filenames)
+            # Shallow, short paths first: FuzzyIndex prefers earlier paths.
+            files.sort(key=lambda path: (path.count(os.sep), len(path), path))
+            self.signals.scanned.emit(self.root, FuzzyIndex(files), directories)
+        except Exception as e:
+            self.signals.failed.emit(self.root, str(e))
+
+
+class WorkspaceFiles(QObject):
+    """The files of the workspace folder, kept indexed and up to date in the background."""
+
+    changed = pyqtSignal()
+
+    RESCAN_DELAY_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.index = FuzzyIndex([])
+        self._scanning = False
+        self._rescan = False
+
+        self.signals = _ScanSignals(self)
+        self.signals.scanned.connect(self._on_scanned)
+        self.signals.failed.connect(self._on_failed)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(self.RESCAN_DELAY_MS)
+        self.rescan_timer.timeout.connect(self.rescan)
+
+        self.load()
+
+    def load(self):
+        root = state_store().get("settings", "quick_open.workspace")
+        if root and os.path.isdir(root):
+            self.set_root(root, save=False)
+
+    def save(self):
+        state_store().set("settings", "quick_open.workspace", self.root)
+
+    def set_root(self, root, save=True):
+        self.root = os.path.abspath(root)
+        self.index = FuzzyIndex([])
+        directories = self.watcher.directories()
+        if directories:
+            self.watcher.removePaths(directories)
+        if save:
+            self.save()
+        self.rescan()
+        self.changed.emit()
+
+    def is_ready(self):
+        return len(self.index) > 0 or not self._scanning
+
+    def rescan(self):
+        if self.root is None:
+            return
+        if self._scanning:
+            self._rescan = True  # once the running scan is done
+            return
+        self._scanning = True
+        QThreadPool.globalInstance().start(_ScanTask(self.root, self.signals))
+
+    def _on_scanned(self, root, index, directories):
+        self._scanning = False
+        if root != self.root:
+            self.rescan()  # the workspace changed meanwhile
+            return
+        self.index = index
+        watched = set(self.watcher.directories())
+        wanted = set(directories[:MAX_WATCHED_DIRS])
+        if watched - wanted:
+            self.watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self.watcher.addPaths(list(wanted - watched))
+        if self._rescan:
+            self._rescan = False
+            self.rescan()
+        self.changed.emit()
+
+    def _on_failed(self, root, error):
+        self._scanning = False
+        print(f"Error listing workspace {root}: {error}")
+
+    def _on_directory_changed(self, path):
+        self.rescan_timer.start()
+
+
+class QuickOpenDialog(QDialog):
+    """Ctrl+P palette: type to filter, Enter opens the selected file."""
+
+    open_requested = pyqtSignal(str)
+
+    MAX_RESULTS = 50
+    RECENT_BONUS = 1000  # recent files rank above workspace files
+
+    def __init__(self, workspace, parent=None):
+        super().__init__(parent, Qt.Popup | Qt.FramelessWindowHint)
+        self.workspace = workspace
+        self.recent_files = []
+        self.resize(600, 380)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Type to search recent and workspace files")
+        self.search_input.textChanged.connect(self.refresh)
+        self.search_input.returnPressed.connect(self.open_selected)
+        self.search_input.installEventFilter(self)
+        self.results = QListWidget()
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(lambda item: self.open_selected())
+        self.hint_label = QLabel("")
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.results, 1)
+        layout.addWidget(self.hint_label)
+
+        self.workspace.changed.connect(self._on_workspace_changed)
+
+    def popup(self, recent_files):
+        """Show the palette over the parent window with an empty query."""
+        self.recent_files = list(recent_files)
+        self.search_input.clear()
+        self.refresh()
+        parent = self.parentWidget()
+        if parent is not None:
+            top_left = parent.mapToGlobal(parent.rect().topLeft())
+            self.move(top_left.x() + (parent.width() - self.width()) // 2, top_left.y() + 60)
+        self.show()
+        self.search_input.setFocus()
+
+    def _on_workspace_changed(self):
+        if self.isVisible():
+            self.refresh()
+
+    def refresh(self):
+        query = "".join(self.search_input.text().lower().split())
+        ranked, seen = [], set()
+        for path in self.recent_files:
+            score = fuzzy_score(query, path.lower())
+            if score is not None:
+                ranked.append((self.RECENT_BONUS + score, path))
+                seen.add(path)
+        ranked.sort(key=lambda item: -item[0])
+        for score, path in self.workspace.index.search(query, self.MAX_RESULTS):
+            if path not in seen:
+                ranked.append((score, path))
+
+        self.results.clear()
+        root = self.workspace.root
+        for _, path in ranked[:self.MAX_RESULTS]:
+            directory = os.path.dirname(path)
+            if root and path.startswith(os.path.join(root, "")):
+                directory = os.path.relpath(directory, root)
+            item = QListWidgetItem(f"{os.path.basename(path)}    {directory}")
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+        if root is None:
+            self.hint_label.setText("No workspace folder (File > Set Workspace Folder...)")
+        elif not self.workspace.is_ready():
+            self.hint_label.setText("Listing workspace files…")
+        else:
+            self.hint_label.setText(f"{len(self.workspace.index):,} files in {root}")
+
+    def open_selected(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.hide()
+            self.open_requested.emit(item.data(Qt.UserRole))
+
+    def eventFilter(self, obj, event):
+        if obj is self.search_input and event.type() == event.KeyPress:
+            if event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+                self.results.keyPressEvent(event)
+                return True
+            if event.key() == Qt.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(obj, event)
@@ -4,25 +4,44 @@ Secure Notepad Pro - Combined Working Version
 """
 
 import os
+import time
+import importlib
 import webbrowser
 import subprocess
 import logging
 from PyQt5.QtWidgets import (
-    QMainWindow, QLabel, QStatusBar, QAction, QFileDialog,
+    QMainWindow, QStatusBar, QAction, QFileDialog,
     QMessageBox, QInputDialog, QTabWidget
 )
 from PyQt5.QtCore import Qt, QTimer
 
 from utils.editor import EnhancedTextEditor
-from utils.encryption import encrypt_data, decrypt_data, CRYPTO_AVAILABLE
+from utils.encryption import encrypt_data, decrypt_with_key, CRYPTO_AVAILABLE
+from utils.file_search import KEY_CACHE
 from utils.icon_manager import load_icon
+from utils.status_manager import StatusManager
+from utils.text_format import TextFormat, read_text, write_text, encode_eol, detect_eol, SAMPLE_SIZE
+from utils.advanced_features import AutosaveManager, RecentFilesManager, SearchReplaceDialog
+from utils.languages import detect_language
+from utils.state_store import state_store
+from utils.document_registry import DocumentRegistry
+from utils.tab_hibernation import TabHibernator
+from utils.session import SessionManager
+from utils.startup_profiler import span
+from ui.history_panel import BackupHistoryPanel
+from ui.find_in_files import FindInFilesPanel
+from ui.quick_open import WorkspaceFiles, QuickOpenDialog
 
 from dialogs.save_dialog import SaveModeDialog
-from dialogs.about_dialog import AboutDialog
-from dialogs.donate_dialog import DonateDialog
-from dialogs.help_dialog import HelpDialog
-from dialogs.terms_conditions_dialog import TermsConditionsDialog
-from dialogs.license_dialog import LicenseDialog
+
+# Help-menu dialogs: (module, class), imported and built on first use
+HELP_DIALOGS = {
+    "about": ("dialogs.about_dialog", "AboutDialog"),
+    "donate": ("dialogs.donate_dialog", "DonateDialog"),
+    "help": ("dialogs.help_dialog", "HelpDialog"),
+    "terms": ("dialogs.terms_conditions_dialog", "TermsConditionsDialog"),
+    "license": ("dialogs.license_dialog", "LicenseDialog"),
+}
 
 
 logging.basicConfig(level=logging.INFO)
@@ -33,99 +52,132 @@ class EnhancedNotepad(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Untitled - Secure Notepad Pro")
-        self.setGeometry(100, 100, 1000, 700)
-        self.setWindowIcon(load_icon("notepad.png"))
-
-        self.tabs = QTabWidget()
-        self.tabs.setTabsClosable(True)
-        self.tabs.tabCloseRequested.connect(self.close_tab)
-        self.tabs.currentChanged.connect(self.update_status_bar)
-        self.setCentralWidget(self.tabs)
-
-        self.tab_files = {}
-        self.default_font_size = 12
-
-        self.init_status_bar()
-        self.init_menu()
-
-        self.autosave_timer = QTimer()
-        self.autosave_timer.timeout.connect(self.autosave_all_tabs)
-        self.autosave_timer.start(self.AUTOSAVE_INTERVAL_MS)
-
-        self.new_tab()
+        with span("tabs"):
+            self.setWindowTitle("Untitled - Secure Notepad Pro")
+            self.setGeometry(100, 100, 1000, 700)
+            self.setWindowIcon(load_icon("notepad.png"))
+
+            self.tabs = QTabWidget()
+            self.tabs.setTabsClosable(True)
+            self.tabs.setMovable(True)  # documents are not keyed by tab index
+            self.tabs.tabCloseRequested.connect(self.close_tab)
+            self.setCentralWidget(self.tabs)
+
+            self.documents = DocumentRegistry()
+            self.default_font_size = 12
+
+        with span("backup history panel"):
+            self.backup_manager = AutosaveManager(interval_seconds=self.AUTOSAVE_INTERVAL_MS // 1000)
+            self.history_panel = BackupHistoryPanel(self.backup_manager, self)
+            self.history_panel.restore_requested.connect(self.restore_backup_text)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.history_panel)
+            self.history_panel.hide()
+            self.tabs.currentChanged.connect(self.update_history_panel)
+            self.search_dialog = None
+            self.help_dialogs = {}  # HELP_DIALOGS name -> dialog, built once
+
+        with span("find in files panel"):
+            self.find_in_files = FindInFilesPanel(self)
+            self.find_in_files.open_requested.connect(self.open_search_result)
+            self.addDockWidget(Qt.BottomDockWidgetArea, self.find_in_files)
+            self.find_in_files.hide()
+
+        with span("recent files and quick open"):
+            self.recent_files = RecentFilesManager()
+            self.workspace = WorkspaceFiles(self)
+            self.quick_open = QuickOpenDialog(self.workspace, self)
+            self.quick_open.open_requested.connect(self.open_quick_open_path)
+
+        with span("init_status_bar"):
+            self.init_status_bar()
+        with span("init_menu"):
+            self.init_menu()
+        with span("hibernator and session"):
+            self.hibernator = TabHibernator(self, self.create_editor)
+            self.session = SessionManager(self, self.create_editor)
+
+            self.autosave_timer = QTimer()
+            self.autosave_timer.timeout.connect(self.autosave_all_tabs)
+            self.autosave_timer.start(self.AUTOSAVE_INTERVAL_MS)
+
+        with span("session restore"):
+            if not self.session.restore():
+                self.new_tab()
 
     # ---------------- Tab Helpers ----------------
     def current_editor(self):
         editor = self.tabs.currentWidget()
         return editor if isinstance(editor, EnhancedTextEditor) else None
 
-    def current_tab_index(self):
-        return self.tabs.currentIndex()
+    def current_document(self):
+        return self.documents.for_editor(self.tabs.currentWidget())
 
-    def current_tab_data(self):
-        return self.tab_files.get(self.current_tab_index(), {})
+    def current_path(self):
+        document = self.current_document()
+        return document.path if document else None
+
+    def editor_call(self, method):
+        """Call an editor method (undo, copy, ...) on the current tab if it holds an editor."""
+        editor = self.current_editor()
+        if editor is not None:
+            getattr(editor, method)()
+
+    def _editable(self, document):
+        """
+        Whether ``document`` has its editor; a restored tab that is not
+        loaded yet (or failed to load) only has a placeholder, so saving it
+        starts (or retries) the load instead.
+        """
+        if isinstance(document.editor, EnhancedTextEditor):
+            return True
+        if self.session.is_pending(document):
+            self.session.load(document)
+        self.statusBar.showMessage(f"'{document.name}' is not loaded yet", 4000)
+        return False
 
     # ---------------- Status Bar ----------------
     def init_status_bar(self):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
-        self.line_col_label = QLabel("Ln 1, Col 1")
-        self.char_count_label = QLabel("Length: 0")
-        self.encoding_label = QLabel("UTF-8")
-        self.crypto_status_label = QLabel("Plaintext")
-        self.crlf_label = QLabel("CRLF")
-        self.zoom_label = QLabel("Zoom: 100%")
-
-        for w in [
-            self.line_col_label, "|",
-            self.char_count_label, "|",
-            self.encoding_label, "|",
-            self.crypto_status_label, "|",
-            self.crlf_label, "|",
-            self.zoom_label
-        ]:
-            self.statusBar.addPermanentWidget(QLabel(w) if isinstance(w, str) else w)
+        self.status_manager = StatusManager(self, self)
+        self.tabs.currentChanged.connect(self.status_manager.update_status_bar)
         self.update_status_bar()
 
-    def update_status_bar(self):
-        if getattr(self, "_updating_status", False):
-            return
-        self._updating_status = True
-        try:
-            editor = self.current_editor()
-            if not editor:
-                return
-            cursor = editor.textCursor()
-            self.line_col_label.setText(f"Ln {cursor.blockNumber() + 1}, Col {cursor.columnNumber()}")
-            self.char_count_label.setText(f"Length: {len(editor.toPlainText())}")
-            font_size = editor.font().pointSize()
-            zoom_percent = round((font_size / self.default_font_size) * 100)
-            self.zoom_label.setText(f"Zoom: {zoom_percent}%")
-            tab_data = self.current_tab_data()
-            self.crypto_status_label.setText("Encrypted (AES-256)" if tab_data.get("encrypted") else "Plaintext")
-        finally:
-            self._updating_status = False
+    def update_status_bar(self, fields=StatusManager.ALL):
+        """Schedule a (frame-coalesced) status bar refresh."""
+        self.status_manager.mark_dirty(fields)
 
     # ---------------- Tab Management ----------------
-    def new_tab(self, path=None, content="", encrypted=False, password=None):
+    def create_editor(self, path, content, text_format):
         editor = EnhancedTextEditor()
         editor.setPlainText(content)
         editor.document().setModified(False)
-        editor.cursorPositionChanged.connect(self.update_status_bar)
-        editor.textChanged.connect(self.update_status_bar)
+        editor.stats.set_line_ending(text_format.eol)
+        editor.set_language(detect_language(path, content))
         # ✅ fix: enable mouse wheel zoom
         editor.set_wheel_zoom_callback(self.zoom_editor)
+        return editor
 
-        index = self.tabs.addTab(editor, os.path.basename(path) if path else "Untitled")
+    def tab_modified(self, index):
+        """Whether tab ``index`` has unsaved changes (hibernated tabs never do)."""
+        editor = self.tabs.widget(index)
+        return isinstance(editor, EnhancedTextEditor) and editor.document().isModified()
+
+    def new_tab(self, path=None, content="", encrypted=False, password=None, text_format=None):
+        text_format = text_format or TextFormat()
+        editor = self.create_editor(path, content, text_format)
+        document = self.documents.add(editor, path, encrypted, password, text_format)
+        if path:
+            self.documents.mark_saved(document, content)
+        index = self.tabs.addTab(editor, document.name)
         self.tabs.setCurrentIndex(index)
-        self.tab_files[index] = {"path": path, "encrypted": encrypted, "password": password}
         if not self.default_font_size:
             self.default_font_size = editor.font().pointSize()
+        return document
 
     def close_tab(self, index):
         editor = self.tabs.widget(index)
-        if editor.document().isModified():
+        if self.tab_modified(index):
             reply = QMessageBox.question(
                 self, "Unsaved Changes",
                 f"Tab '{self.tabs.tabText(index)}' has unsaved changes. Save?",
@@ -137,8 +189,13 @@ class EnhancedNotepad(QMainWindow):
                     return
             elif reply == QMessageBox.Cancel:
                 return
-        self.tabs.removeTab(index)
-        self.tab_files.pop(index, None)
+        self.tabs.removeTab(index)  # does not delete the widget
+        document = self.documents.for_editor(editor)
+        if document is not None:
+            self.documents.remove(document)
+            self.hibernator.forget(document)
+            self.session.forget(document)
+        editor.deleteLater()
 
     # ---------------- Zoom ----------------
     def zoom_editor(self, delta):
@@ -149,7 +206,7 @@ class EnhancedNotepad(QMainWindow):
         new_size = max(8, min(48, font.pointSize() + delta))
         font.setPointSize(new_size)
         editor.setFont(font)
-        self.update_status_bar()
+        self.update_status_bar(StatusManager.ZOOM)
 
     def zoom_in(self): self.zoom_editor(1)
     def zoom_out(self): self.zoom_editor(-1)
@@ -159,7 +216,7 @@ class EnhancedNotepad(QMainWindow):
             font = editor.font()
             font.setPointSize(self.default_font_size)
             editor.setFont(font)
-            self.update_status_bar()
+            self.update_status_bar(StatusManager.ZOOM)
 
     # ---------------- Menu Bar ----------------
     def init_menu(self):
@@ -169,6 +226,11 @@ class EnhancedNotepad(QMainWindow):
         file_menu = menu.addMenu("&File")
         file_menu.addAction(QAction("&New Tab", self, shortcut="Ctrl+T", triggered=self.new_tab))
         file_menu.addAction(QAction("&Open...", self, shortcut="Ctrl+O", triggered=self.open_file))
+        self.recent_menu = file_menu.addMenu("Open &Recent")
+        self.recent_menu.aboutToShow.connect(self.update_recent_menu)
+        self.recent_files.changed.connect(self._on_recent_files_changed)
+        file_menu.addAction(QAction("&Quick Open...", self, shortcut="Ctrl+P", triggered=self.show_quick_open))
+        file_menu.addAction(QAction("Set &Workspace Folder...", self, triggered=self.choose_workspace))
         file_menu.addAction(QAction("&Save", self, shortcut="Ctrl+S", triggered=self.save_file))
         file_menu.addAction(QAction("Save &As...", self, shortcut="Ctrl+Shift+S", triggered=self.save_file_as))
         file_menu.addSeparator()
@@ -176,12 +238,18 @@ class EnhancedNotepad(QMainWindow):
 
         # --- Edit Menu ---
         edit_menu = menu.addMenu("&Edit")
-        edit_menu.addAction(QAction("&Undo", self, shortcut="Ctrl+Z", triggered=lambda: self.current_editor().undo()))
-        edit_menu.addAction(QAction("&Redo", self, shortcut="Ctrl+Y", triggered=lambda: self.current_editor().redo()))
+        edit_menu.addAction(QAction("&Undo", self, shortcut="Ctrl+Z", triggered=lambda: self.editor_call("undo")))
+        edit_menu.addAction(QAction("&Redo", self, shortcut="Ctrl+Y", triggered=lambda: self.editor_call("redo")))
+        edit_menu.addSeparator()
+        edit_menu.addAction(QAction("Cu&t", self, shortcut="Ctrl+X", triggered=lambda: self.editor_call("cut")))
+        edit_menu.addAction(QAction("&Copy", self, shortcut="Ctrl+C", triggered=lambda: self.editor_call("copy")))
+        edit_menu.addAction(QAction("&Paste", self, shortcut="Ctrl+V", triggered=lambda: self.editor_call("paste")))
         edit_menu.addSeparator()
-        edit_menu.addAction(QAction("Cu&t", self, shortcut="Ctrl+X", triggered=lambda: self.current_editor().cut()))
-        edit_menu.addAction(QAction("&Copy", self, shortcut="Ctrl+C", triggered=lambda: self.current_editor().copy()))
-        edit_menu.addAction(QAction("&Paste", self, shortcut="Ctrl+V", triggered=lambda: self.current_editor().paste()))
+        edit_menu.addAction(QAction("&Find...", self, shortcut="Ctrl+F", triggered=lambda: self.show_find_dialog()))
+        edit_menu.addAction(QAction("Find &Next", self, shortcut="F3", triggered=lambda: self.find_next()))
+        edit_menu.addAction(QAction("Find Pre&vious", self, shortcut="Shift+F3", triggered=lambda: self.find_next(True)))
+        edit_menu.addAction(QAction("&Replace...", self, shortcut="Ctrl+H", triggered=lambda: self.show_find_dialog(True)))
+        edit_menu.addAction(QAction("Find in F&iles...", self, shortcut="Ctrl+Shift+F", triggered=self.show_find_in_files))
 
         # --- View Menu ---
         view_menu = menu.addMenu("&View")
@@ -194,6 +262,11 @@ class EnhancedNotepad(QMainWindow):
         zoom_menu.addAction(QAction("Zoom Out", self, shortcut="Ctrl+-", triggered=self.zoom_out))
         zoom_menu.addAction(QAction("Reset Zoom (100%)", self, shortcut="Ctrl+0", triggered=self.reset_zoom))
 
+        history_action = self.history_panel.toggleViewAction()
+        history_action.setText("Backup &History")
+        history_action.setShortcut("Ctrl+Shift+H")
+        view_menu.addAction(history_action)
+
         # --- Help Menu ---
         help_menu = menu.addMenu("&Help")
 
@@ -216,12 +289,14 @@ class EnhancedNotepad(QMainWindow):
 
     # ---------------- File Handling ----------------
     def open_file(self):
-        from PyQt5.QtWidgets import QLineEdit
-
         file_filter = "All Files (*);;Text Files (*.txt);;Encrypted Files (*.txt.enc)"
         path, _ = QFileDialog.getOpenFileName(self, "Open File", "", file_filter)
-        if not path:
-            return
+        if path:
+            self.open_path(path)
+
+    def open_path(self, path, password=None):
+        """Open ``path`` in a new tab; encrypted files ask for a password unless given one."""
+        from PyQt5.QtWidgets import QLineEdit
 
         try:
             if path.endswith(".enc"):
@@ -233,94 +308,273 @@ class EnhancedNotepad(QMainWindow):
 
                 salt, token = data[:16], data[16:]
 
-                password, ok = QInputDialog.getText(self, "Decrypt File", "Enter password:", QLineEdit.Password)
-                if not ok or not password:
-                    return
+                if not password:
+                    password, ok = QInputDialog.getText(self, "Decrypt File", "Enter password:", QLineEdit.Password)
+                    if not ok or not password:
+                        return False
 
                 try:
-                    plaintext = decrypt_data(token, password, salt)
+                    # Keys are cached per (password, salt), shared with Find in Files.
+                    plaintext = decrypt_with_key(token, KEY_CACHE.key(password, salt))
                     self.statusBar.showMessage("File open successfully!", 4000)
                 except Exception:
                     # Password incorrect or decryption failed
                     QMessageBox.warning(self, "Decryption Error", "Incorrect password or corrupted file!")
                     self.statusBar.showMessage("Failed to open encrypted file: incorrect password", 4000)
-                    return
+                    return False
 
-                self.new_tab(path, plaintext, True, password)
+                text_format = TextFormat("utf-8", detect_eol(plaintext[:SAMPLE_SIZE]))
+                self.new_tab(path, plaintext, True, password, text_format)
             else:
-                with open(path, "r", encoding="utf-8") as f:
-                    self.new_tab(path, f.read(), False)
+                content, text_format = read_text(path)
+                self.new_tab(path, content, False, text_format=text_format)
+            self.recent_files.add_file(path)
+            return True
 
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
+            return False
 
     def save_file(self):
-        index = self.current_tab_index()
-        tab_data = self.current_tab_data()
-        path = tab_data.get("path")
-        if path:
-            return self._save_plaintext_flow(path, index)
-        return self.save_file_as()
+        document = self.current_document()
+        if document is None or not self._editable(document):
+            return False
+        if not document.path:
+            return self.save_file_as()
+        if document.encrypted:
+            return self._save_encrypted_flow(document.path, document.password, document)
+        return self._save_plaintext_flow(document.path, document)
 
     def save_file_as(self):
+        document = self.current_document()
+        if document is None or not self._editable(document):
+            return False
         dialog = SaveModeDialog(self, crypto_available=CRYPTO_AVAILABLE)
-        if dialog.exec_() != dialog.Accepted:
+        if self.exec_dialog(dialog) != dialog.Accepted:
             return False
-        save_mode = dialog.save_mode
-        password = dialog.password
-        index = self.current_tab_index()
+        save_mode, password = dialog.save_mode, dialog.password
 
         if save_mode == "plaintext":
             path, _ = QFileDialog.getSaveFileName(self, "Save File As", "untitled.txt", "Text Files (*.txt)")
             if path:
-                return self._save_plaintext_flow(path, index)
+                return self._save_plaintext_flow(path, document)
         elif save_mode == "encrypted":
             path, _ = QFileDialog.getSaveFileName(self, "Save Encrypted File As", "untitled.txt.enc", "Encrypted Files (*.txt.enc)")
             if path:
-                return self._save_encrypted_flow(path, password, index)
+                return self._save_encrypted_flow(path, password, document)
         return False
 
-    def _save_plaintext_flow(self, path, index):
+    def _save_plaintext_flow(self, path, document, interactive=True):
+        """
+        Save ``document`` as plain text to ``path``. Autosave passes
+        ``interactive=False``: then nothing modal is shown, text the file's
+        encoding cannot hold is left unsaved (autosave has just backed it
+        up) and errors go to the status bar.
+        """
         try:
-            editor = self.tabs.widget(index)
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(editor.toPlainText())
-            self.tab_files[index] = {"path": path, "encrypted": False, "password": None}
-            self.tabs.setTabText(index, os.path.basename(path))
+            editor = document.editor
+            text = editor.toPlainText()
+            text_format = document.format
+            try:
+                write_text(path, text, text_format)
+            except UnicodeEncodeError:
+                if not interactive:
+                    self.statusBar.showMessage(
+                        f"Autosave skipped {document.name}: it cannot be saved as {text_format.label} "
+                        f"(a backup was kept)", 10000)
+                    return False
+                reply = QMessageBox.question(
+                    self, "Encoding",
+                    f"The text cannot be saved as {text_format.label}. Save as UTF-8 instead?",
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return False
+                text_format = TextFormat("utf-8", text_format.eol)
+                write_text(path, text, text_format)
+            self.documents.set_path(document, path)
+            document.encrypted, document.password, document.format = False, None, text_format
+            self.documents.mark_saved(document, text)
+            self.tabs.setTabText(self.tabs.indexOf(editor), document.name)
+            editor.set_language(detect_language(path, editor.document().firstBlock().text()))
             editor.document().setModified(False)
             self.statusBar.showMessage(f"Saved: {os.path.basename(path)}", 5000)
+            self.find_in_files.note_saved(path)
+            self.recent_files.add_file(path)
             self.update_status_bar()
             return True
         except Exception as e:
+            if not interactive:
+                self.statusBar.showMessage(f"Autosave of {document.name} failed: {e}", 10000)
+                return False
             QMessageBox.critical(self, "Error", f"Save failed:\n{e}")
             return False
 
-    def _save_encrypted_flow(self, path, password, index):
+    def _save_encrypted_flow(self, path, password, document, interactive=True):
         try:
-            editor = self.tabs.widget(index)
-            token, salt = encrypt_data(editor.toPlainText(), password)
+            editor = document.editor
+            text = editor.toPlainText()
+            token, salt = encrypt_data(encode_eol(text, document.format), password)
             with open(path, "wb") as f:
                 f.write(salt + token)
-            self.tab_files[index] = {"path": path, "encrypted": True, "password": password}
-            self.tabs.setTabText(index, os.path.basename(path))
+            self.documents.set_path(document, path)
+            document.encrypted, document.password = True, password
+            document.format = TextFormat("utf-8", document.format.eol)
+            self.documents.mark_saved(document, text)
+            self.tabs.setTabText(self.tabs.indexOf(editor), document.name)
+            editor.set_language(detect_language(path, editor.document().firstBlock().text()))
             editor.document().setModified(False)
             self.statusBar.showMessage(f"Encrypted Save: {os.path.basename(path)}", 5000)
+            self.find_in_files.note_saved(path, password)
+            self.recent_files.add_file(path)
             self.update_status_bar()
             return True
         except Exception as e:
+            if not interactive:
+                self.statusBar.showMessage(f"Autosave of {document.name} failed: {e}", 10000)
+                return False
             QMessageBox.critical(self, "Error", f"Encryption failed:\n{e}")
             return False
 
     # ---------------- Autosave ----------------
     def autosave_all_tabs(self):
-        for i in range(self.tabs.count()):
-            ed = self.tabs.widget(i)
-            if not ed or not ed.document().isModified():
-                continue
-            d = self.tab_files.get(i, {})
-            path = d.get("path")
-            if path:
-                self._save_plaintext_flow(path, i)
+        for document in self.documents:
+            if not document.path or not isinstance(document.editor, EnhancedTextEditor) \
+                    or not document.editor.document().isModified():
+                continue  # hibernated and session tabs not loaded yet are unmodified
+            if document.encrypted:
+                self._save_encrypted_flow(document.path, document.password, document, interactive=False)
+            else:
+                self.backup_manager.create_backup(document.path, document.editor.toPlainText())
+                self._save_plaintext_flow(document.path, document, interactive=False)
+        self.update_history_panel()
+
+    # ---------------- Backup History ----------------
+    def update_history_panel(self):
+        """Point the history panel at the current tab's file."""
+        editor = self.current_editor()
+        self.history_panel.set_document(self.current_path(), editor.toPlainText if editor else None)
+
+    def restore_backup_text(self, text):
+        """Replace the current tab's text with a backup as one undo step."""
+        editor = self.current_editor()
+        if not editor:
+            return
+        cursor = editor.textCursor()
+        cursor.beginEditBlock()
+        cursor.select(cursor.Document)
+        cursor.insertText(text)
+        cursor.endEditBlock()
+        self.statusBar.showMessage("Backup restored (Ctrl+Z to undo)", 4000)
+
+    # ---------------- Find & Replace ----------------
+    def show_find_dialog(self, replace=False):
+        """Open the (single, non-modal) find & replace dialog for the current tab."""
+        if self.search_dialog is None:
+            self.search_dialog = SearchReplaceDialog(self, self.current_editor)
+        dialog = self.search_dialog
+        editor = self.current_editor()
+        selected = editor.textCursor().selectedText() if editor else ""
+        if selected and "\u2029" not in selected:
+            dialog.search_input.setText(selected)
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+        field = dialog.replace_input if replace else dialog.search_input
+        field.setFocus()
+        field.selectAll()
+
+    def find_next(self, backward=False):
+        if self.search_dialog is None or not self.search_dialog.search_input.text():
+            self.show_find_dialog()
+            return
+        if not self.search_dialog.find_next(backward):
+            self.statusBar.showMessage("No matches", 3000)
+
+    def show_find_in_files(self):
+        panel = self.find_in_files
+        path = self.current_path()
+        if not panel.folder_input.text() and path:
+            panel.folder_input.setText(os.path.dirname(path))
+        editor = self.current_editor()
+        selected = editor.textCursor().selectedText() if editor else ""
+        if selected and "\u2029" not in selected:
+            panel.search_input.setText(selected)
+        panel.show()
+        panel.raise_()
+        panel.search_input.setFocus()
+        panel.search_input.selectAll()
+
+    # ---------------- Recent Files ----------------
+    RECENT_MENU_SIZE = 15
+
+    def update_recent_menu(self):
+        """Fill Open Recent from cached existence checks; stale entries are rechecked meanwhile."""
+        self.recent_menu.clear()
+        files = self.recent_files.get_files(self.RECENT_MENU_SIZE)
+        for number, path in enumerate(files, 1):
+            label = os.path.basename(path)
+            action = QAction(f"&{number % 10}  {label}" if number <= 10 else label, self)
+            status = self.recent_files.status(path)
+            tooltip = path
+            if status is not None and status.mtime is not None:
+                tooltip += f"\n{status.size:,} bytes, modified {time.strftime('%Y-%m-%d %H:%M', time.localtime(status.mtime))}"
+            action.setToolTip(tooltip)
+            action.setStatusTip(path)
+            action.triggered.connect(lambda checked=False, p=path: self.open_recent_file(p))
+            self.recent_menu.addAction(action)
+        if not files:
+            self.recent_menu.addAction(QAction("No Recent Files", self, enabled=False))
+        self.recent_menu.setToolTipsVisible(True)
+        self.recent_menu.addSeparator()
+        self.recent_menu.addAction(QAction("&Clear Recent Files", self, enabled=bool(files),
+                                           triggered=self.recent_files.clear))
+
+    def _on_recent_files_changed(self):
+        if self.recent_menu.isVisible():
+            self.update_recent_menu()
+
+    def open_recent_file(self, path):
+        if not self.open_quick_open_path(path):
+            self.recent_files.check([path], force=True)  # hide it if it is gone
+
+    # ---------------- Quick Open ----------------
+    def show_quick_open(self):
+        self.quick_open.popup(self.recent_files.get_files())
+
+    def choose_workspace(self):
+        folder = QFileDialog.getExistingDirectory(self, "Workspace Folder", self.workspace.root or "")
+        if folder:
+            self.workspace.set_root(folder)
+
+    def open_quick_open_path(self, path):
+        """Switch to the tab of ``path`` if it is open, else open it."""
+        document = self.documents.for_path(path)
+        if document is not None:
+            self.tabs.setCurrentWidget(document.editor)
+            return True
+        return self.open_path(path)
+
+    def open_search_result(self, path, line, column, length, password):
+        """Show a Find in Files match, opening its file if needed."""
+        document = self.documents.for_path(path)
+        if document is not None:
+            self.tabs.setCurrentWidget(document.editor)
+        elif not self.open_path(path, password or None):
+            return
+        editor = self.current_editor()
+        if editor is None:
+            return  # a restored tab still loading
+        block = editor.document().findBlockByNumber(line - 1)
+        if not block.isValid():
+            return
+        cursor = editor.textCursor()
+        cursor.setPosition(min(block.position() + column, block.position() + block.length() - 1))
+        cursor.setPosition(min(cursor.position() + length, block.position() + block.length() - 1),
+                           cursor.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+        editor.setFocus()
 
     # ---------------- Help & Dialogs ----------------
     def open_help_file(self):
@@ -448,15 +702,33 @@ class EnhancedNotepad(QMainWindow):
         webbrowser.open("https://www.patronhubdevs.online")
         self.statusBar.showMessage("Opening homepage...", 3000)
 
-    def show_about_dialog(self): AboutDialog(self).exec_()
-    def show_donate_dialog(self): DonateDialog(self).exec_()
-    def show_help_dialog(self): HelpDialog(self).exec_()
-    def show_terms_conditions_dialog(self): TermsConditionsDialog(self).exec_()
-    def show_license_dialog(self): LicenseDialog(self).exec_()
+    def exec_dialog(self, dialog):
+        """
+        Run a per-use modal dialog that is deleted when it closes (it would
+        otherwise stay a child of the window). Deletion waits for the event
+        loop, so the caller can still read the dialog's fields afterwards.
+        """
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        return dialog.exec_()
+
+    def show_help_menu_dialog(self, name):
+        """Run a Help-menu dialog; its module is imported and the dialog built the first time."""
+        dialog = self.help_dialogs.get(name)
+        if dialog is None:
+            module_name, class_name = HELP_DIALOGS[name]
+            dialog_class = getattr(importlib.import_module(module_name), class_name)
+            dialog = self.help_dialogs[name] = dialog_class(self)
+        return dialog.exec_()
+
+    def show_about_dialog(self): self.show_help_menu_dialog("about")
+    def show_donate_dialog(self): self.show_help_menu_dialog("donate")
+    def show_help_dialog(self): self.show_help_menu_dialog("help")
+    def show_terms_conditions_dialog(self): self.show_help_menu_dialog("terms")
+    def show_license_dialog(self): self.show_help_menu_dialog("license")
 
     # ---------------- Close Event ----------------
     def closeEvent(self, event):
-        unsaved_tabs = [i for i in range(self.tabs.count()) if self.tabs.widget(i).document().isModified()]
+        unsaved_tabs = [i for i in range(self.tabs.count()) if self.tab_modified(i)]
         for index in unsaved_tabs:
             self.tabs.setCurrentIndex(index)
             editor = self.tabs.widget(index)
@@ -472,6 +744,8 @@ class EnhancedNotepad(QMainWindow):
             elif reply == QMessageBox.Cancel:
                 event.ignore()
                 return
+        self.session.save()
+        state_store().flush(timeout=5)
         event.accept()
 
 
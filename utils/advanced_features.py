@@ -12,8 +12,11 @@ Advanced features module for Secure Notepad Pro:
 - Custom shortcuts
 """
 
+import os
+import re
 import json
-from datetime import datetime
+import time
+import errno
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QTabWidget, QMessageBox, QDialog, QVBoxLayout, QHBoxLayout,
@@ -22,89 +25,171 @@ from PyQt5.QtWidgets import (
     QLineEdit
 )
 from PyQt5.QtGui import QSyntaxHighlighter, QColor, QTextCharFormat
-from PyQt5.QtCore import QTimer, pyqtSignal, QObject
+from PyQt5.QtCore import QTimer, pyqtSignal, QObject, QRunnable, QThreadPool
 
+from utils.backup_store import BackupStore
+from utils.state_store import state_store
+from utils.document_registry import DocumentRegistry
+from utils.languages import get_grammar
+from utils.search_engine import SearchError
 
-# ===================== SYNTAX HIGHLIGHTER =====================
-class PythonHighlighter(QSyntaxHighlighter):
-    """Python syntax highlighter"""
 
-    def __init__(self, document):
+# ===================== SYNTAX HIGHLIGHTER =====================
+_FORMATS = {}  # grammar name -> [QTextCharFormat per style id]
+
+
+def grammar_formats(grammar):
+    """QTextCharFormats for a grammar's styles, built once and shared."""
+    formats = _FORMATS.get(grammar.name)
+    if formats is None:
+        formats = []
+        for spec in grammar.style_specs:
+            char_format = QTextCharFormat()
+            if "color" in spec:
+                char_format.setForeground(QColor(spec["color"]))
+            if spec.get("bold"):
+                char_format.setFontWeight(75)
+            if spec.get("italic"):
+                char_format.setFontItalic(True)
+            formats.append(char_format)
+        _FORMATS[grammar.name] = formats
+    return formats
+
+
+class GrammarHighlighter(QSyntaxHighlighter):
+    """Highlights a document with a utils.syntax_engine Grammar."""
+
+    def __init__(self, document, grammar):
         super().__init__(document)
-        self.highlighting_rules = []
-
-        # Keywords
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("#6366f1"))
-        keyword_format.setFontWeight(75)
-        keywords = ["def", "class", "import", "from", "if", "else", "elif",
-                    "for", "while", "return", "True", "False", "None", "try", "except"]
-        for word in keywords:
-            self.highlighting_rules.append((f"\\b{word}\\b", keyword_format))
-
-        # Strings
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#22c55e"))
-        self.highlighting_rules.append((r'\".*?\"', string_format))
-        self.highlighting_rules.append((r"'.*?'", string_format))
-
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#888888"))
-        comment_format.setFontItalic(True)
-        self.highlighting_rules.append((r"#.*", comment_format))
+        self.grammar = grammar
+        self.formats = grammar_formats(grammar)
 
     def highlightBlock(self, text):
         """Apply highlighting to text block"""
-        import re
-        for pattern, char_format in self.highlighting_rules:
-            for match in re.finditer(pattern, text):
-                start, end = match.span()
-                self.setFormat(start, end - start, char_format)
+        state = self.previousBlockState()
+        spans, end_state = self.grammar.tokenize(text, state if state > 0 else 0)
+        formats = self.formats
+        for start, length, style in spans:
+            self.setFormat(start, length, formats[style])
+        self.setCurrentBlockState(end_state)
+
 
+class PythonHighlighter(GrammarHighlighter):
+    """Python syntax highlighter"""
 
-class HTMLHighlighter(QSyntaxHighlighter):
+    def __init__(self, document):
+        super().__init__(document, get_grammar("python"))
+
+
+class HTMLHighlighter(GrammarHighlighter):
     """HTML syntax highlighter"""
 
     def __init__(self, document):
-        super().__init__(document)
-        self.highlighting_rules = []
+        super().__init__(document, get_grammar("html"))
+
 
-        # HTML Tags
-        tag_format = QTextCharFormat()
-        tag_format.setForeground(QColor("#6366f1"))
-        tag_format.setFontWeight(75)
-        self.highlighting_rules.append((r"<[^>]*>", tag_format))
+# ===================== RECENT FILES MANAGER =====================
+class _FileStatus:
+    """What the last check of a recent file found."""
 
-        # Attributes
-        attr_format = QTextCharFormat()
-        attr_format.setForeground(QColor("#0078D4"))
-        self.highlighting_rules.append((r'\w+(?==)', attr_format))
+    __slots__ = ("exists", "mtime", "size", "checked_at")
 
-        # Strings
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#22c55e"))
-        self.highlighting_rules.append((r'\".*?\"', string_format))
-        self.highlighting_rules.append((r"'.*?'", string_format))
+    def __init__(self, exists, mtime=None, size=None, checked_at=0.0):
+        self.exists = exists
+        self.mtime = mtime
+        self.size = size
+        self.checked_at = checked_at
 
-    def highlightBlock(self, text):
-        """Apply highlighting to text block"""
-        import re
-        for pattern, char_format in self.highlighting_rules:
-            for match in re.finditer(pattern, text):
-                start, end = match.span()
-                self.setFormat(start, end - start, char_format)
 
+# stat() errors that mean the file is not there, as opposed to its volume not answering
+_MISSING_ERRNOS = {errno.ENOENT, errno.ENOTDIR, errno.EACCES, errno.EPERM, errno.ENAMETOOLONG}
+
+
+def _mount_points():
+    """Mount points listed in /proc/self/mounts, longest first ([] where there is none)."""
+    try:
+        with open("/proc/self/mounts", encoding="utf-8", errors="replace") as f:
+            fields = [line.split() for line in f]
+    except OSError:
+        return []
+    # Spaces and the like in mount points are written as octal escapes (\040).
+    mounts = {re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), parts[1])
+              for parts in fields if len(parts) > 1}
+    return sorted(mounts, key=len, reverse=True)
+
+
+def _volume_of(path, mounts):
+    """The drive, UNC share or mount point ``path`` is on, worked out without touching the disk."""
+    drive = os.path.splitdrive(path)[0]
+    if drive:
+        return drive
+    for mount in mounts:
+        if path == mount or path.startswith(mount.rstrip("/") + "/"):
+            return mount
+    return os.path.dirname(path)
+
+
+class _StatSignals(QObject):
+    checked = pyqtSignal(str, bool, bool, object, object)  # path, exists, volume failed, mtime, size
 
-# ===================== RECENT FILES MANAGER =====================
-class RecentFilesManager:
-    """Manage recent files list (last 10 files)"""
 
-    def __init__(self, max_files=10):
+class _StatTask(QRunnable):
+    """stat() one path off the GUI thread; it may hang on an unreachable share."""
+
+    def __init__(self, path, signals):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        try:
+            st = os.stat(self.path)
+            self.signals.checked.emit(self.path, True, False, st.st_mtime, st.st_size)
+        except OSError as e:
+            self.signals.checked.emit(self.path, False, e.errno not in _MISSING_ERRNOS, None, None)
+
+
+class RecentFilesManager(QObject):
+    """
+    Manage the recent files list (newest first).
+
+    Whether each file still exists is checked on a small thread pool, never
+    on the GUI thread: get_files() answers from the cached results at once
+    (files not checked yet count as existing), starts checks for entries
+    older than their TTL and ``changed`` is emitted when a check changes
+    the answer.
+
+    Checks on one volume (drive, UNC share or mount point) run one at a
+    time, so a dead share holds at most one thread however many recent
+    files live on it. When a check fails for another reason than the file
+    being absent (timed out, host down, stale handle...) the files still
+    queued on that volume are dropped and it is left alone for
+    VOLUME_BACKOFF seconds.
+    """
+
+    changed = pyqtSignal()
+
+    NAMESPACE = "recent_files"  # path -> last opened time in the state store
+    EXISTS_TTL = 30.0  # seconds a file found on disk is trusted
+    MISSING_TTL = 10.0  # seconds a missing file stays hidden before it is checked again
+    MAX_CHECKS = 4  # threads, shared by at most this many volumes at once
+    VOLUME_BACKOFF = 60.0  # seconds a volume is not checked after a failed stat
+
+    def __init__(self, max_files=100, store=None, parent=None):
+        super().__init__(parent)
         self.max_files = max_files
-        self.config_file = Path.home() / ".secure_notepad" / "recent_files.json"
-        self.config_file.parent.mkdir(exist_ok=True)
+        self.store = store or state_store()
         self.recent_files = self.load()
+        self._status = {}  # path -> _FileStatus
+        self._checking = {}  # path -> volume, while queued or being checked
+        self._volume_busy = {}  # volume -> path being checked on it
+        self._volume_queue = {}  # volume -> paths waiting for it, in order
+        self._volume_retry = {}  # volume -> monotonic time it may be checked again
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.MAX_CHECKS)
+        self.signals = _StatSignals(self)
+        self.signals.checked.connect(self._on_checked)
+        self.check()  # warm the cache before the first menu is shown
 
     def add_file(self, file_path):
         """Add file to recent list"""
@@ -112,34 +197,93 @@ class RecentFilesManager:
         if file_path in self.recent_files:
             self.recent_files.remove(file_path)
         self.recent_files.insert(0, file_path)
+        self.store.set(self.NAMESPACE, file_path, time.time())
+        for path in self.recent_files[self.max_files:]:
+            self.store.delete(self.NAMESPACE, path)
+            self._status.pop(path, None)
         self.recent_files = self.recent_files[:self.max_files]
-        self.save()
+        # It was just opened or saved, so it exists; stat it for its size and date.
+        self._status[file_path] = _FileStatus(True)
+        self.check([file_path], force=True)
+        self.changed.emit()
 
     def remove_file(self, file_path):
         """Remove file from recent list"""
         file_path = str(Path(file_path).resolve())
         if file_path in self.recent_files:
             self.recent_files.remove(file_path)
-            self.save()
-
-    def get_files(self):
-        """Get list of recent files"""
-        return [f for f in self.recent_files if Path(f).exists()]
-
-    def save(self):
-        """Save recent files to config"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.recent_files, f)
-        except Exception as e:
-            print(f"Error saving recent files: {e}")
+            self._status.pop(file_path, None)
+            self.store.delete(self.NAMESPACE, file_path)
+            self.changed.emit()
+
+    def get_files(self, limit=None):
+        """Recent files not known to be missing, without touching the disk."""
+        files, looked_at = [], 0
+        for path in self.recent_files:
+            if limit is not None and len(files) >= limit:
+                break
+            looked_at += 1
+            status = self._status.get(path)
+            if status is None or status.exists:
+                files.append(path)
+        self.check(self.recent_files[:looked_at])
+        return files
+
+    def status(self, file_path):
+        """The cached _FileStatus of a recent file, or None before its first check."""
+        return self._status.get(file_path)
+
+    def check(self, files=None, force=False):
+        """Start background checks of ``files`` (default: all) whose result is stale."""
+        now = time.monotonic()
+        mounts = None
+        for path in self.recent_files if files is None else files:
+            if path in self._checking:
+                continue
+            status = self._status.get(path)
+            if not force and status is not None and status.checked_at and \
+                    now - status.checked_at < (self.EXISTS_TTL if status.exists else self.MISSING_TTL):
+                continue
+            if mounts is None:
+                mounts = _mount_points()
+            volume = _volume_of(path, mounts)
+            if self._volume_retry.get(volume, 0.0) > now:
+                continue
+            self._checking[path] = volume
+            if volume in self._volume_busy:
+                self._volume_queue.setdefault(volume, []).append(path)
+            else:
+                self._start_check(path, volume)
+
+    def _start_check(self, path, volume):
+        self._volume_busy[volume] = path
+        self.pool.start(_StatTask(path, self.signals))
+
+    def _on_checked(self, path, exists, failed, mtime, size):
+        volume = self._checking.pop(path, None)
+        if volume is not None:
+            del self._volume_busy[volume]
+            waiting = self._volume_queue.pop(volume, [])
+            if failed:
+                self._volume_retry[volume] = time.monotonic() + self.VOLUME_BACKOFF
+                for other in waiting:
+                    del self._checking[other]  # checked again after the backoff
+            elif waiting:
+                if len(waiting) > 1:
+                    self._volume_queue[volume] = waiting[1:]
+                self._start_check(waiting[0], volume)
+        if path not in self.recent_files:
+            return
+        previous = self._status.get(path)
+        self._status[path] = _FileStatus(exists, mtime, size, time.monotonic())
+        if previous is None or previous.exists != exists or previous.mtime != mtime:
+            self.changed.emit()
 
     def load(self):
-        """Load recent files from config"""
+        """Load recent files from the state store, newest first"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+            opened = self.store.items(self.NAMESPACE)
+            return sorted(opened, key=opened.get, reverse=True)[:self.max_files]
         except Exception as e:
             print(f"Error loading recent files: {e}")
         return []
@@ -147,7 +291,9 @@ class RecentFilesManager:
     def clear(self):
         """Clear recent files"""
         self.recent_files = []
-        self.save()
+        self._status.clear()
+        self.store.replace(self.NAMESPACE, {})
+        self.changed.emit()
 
 
 # ===================== AUTOSAVE & BACKUP =====================
@@ -156,11 +302,15 @@ class AutosaveManager(QObject):
 
     autosave_triggered = pyqtSignal()
 
-    def __init__(self, interval_seconds=60):
+    def __init__(self, interval_seconds=60, max_backups=5):
         super().__init__()
         self.interval = interval_seconds * 1000
+        self.max_backups = max_backups
         self.backup_dir = Path.home() / ".secure_notepad" / "backups"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        # Recent files give legacy backups (named by file name only) their full path.
+        self.store = BackupStore(self.backup_dir, retention=max_backups, state=state_store(),
+                                 known_paths=state_store().items(RecentFilesManager.NAMESPACE))
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.autosave_triggered)
@@ -175,34 +325,32 @@ class AutosaveManager(QObject):
         self.timer.stop()
 
     def create_backup(self, file_path, content):
-        """Create backup of file"""
+        """Create backup of file (only changed chunks are written)"""
         try:
             if file_path:
-                filename = Path(file_path).name
-                backup_file = self.backup_dir / f"{filename}.backup.{datetime.now().timestamp()}"
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                # Keep only last 5 backups per file
-                self.cleanup_old_backups(filename)
+                return self.store.put(str(file_path), content)
         except Exception as e:
             print(f"Error creating backup: {e}")
+        return None
 
     def cleanup_old_backups(self, filename):
-        """Keep only last 5 backups per file"""
+        """Keep only the last ``max_backups`` backups per file"""
         try:
-            backups = sorted(self.backup_dir.glob(f"{filename}.backup.*"))
-            for backup in backups[:-5]:
-                backup.unlink()
+            self.store.prune(str(filename))
         except Exception as e:
             print(f"Error cleaning backups: {e}")
 
     def get_backups(self, filename):
-        """Get list of backups for a file"""
+        """Get list of backups for a file (newest first)"""
         try:
-            return sorted(self.backup_dir.glob(f"{filename}.backup.*"), reverse=True)
-        except:
+            return self.store.history(str(filename))
+        except Exception:
             return []
 
+    def read_backup(self, version):
+        """Return the text stored in a backup version"""
+        return self.store.read(version)
+
 
 # ===================== THEME MANAGER =====================
 class ThemeManager:
@@ -319,12 +467,22 @@ class EncryptionManager:
 
 # ===================== SEARCH & REPLACE =====================
 class SearchReplaceDialog(QDialog):
-    """Advanced search and replace dialog"""
+    """Find & replace in the current editor, searching as you type"""
 
-    def __init__(self, parent=None):
+    QUERY_DELAY_MS = 120
+
+    def __init__(self, parent=None, editor_provider=None):
         super().__init__(parent)
         self.setWindowTitle("Find & Replace")
         self.setFixedSize(500, 300)
+        self.editor_provider = editor_provider  # returns the editor to search in
+        self.engine = None
+        self._anchor = None  # where search-as-you-type starts from
+
+        self._query_timer = QTimer(self)
+        self._query_timer.setSingleShot(True)
+        self._query_timer.setInterval(self.QUERY_DELAY_MS)
+        self._query_timer.timeout.connect(self.search_as_you_type)
         self.setup_ui()
 
     def setup_ui(self):
@@ -365,19 +523,145 @@ class SearchReplaceDialog(QDialog):
 
         # Buttons
         btn_layout = QHBoxLayout()
-        find_btn = QPushButton("Find All")
+        previous_btn = QPushButton("Find Previous")
+        next_btn = QPushButton("Find Next")
+        replace_one_btn = QPushButton("Replace")
         replace_btn = QPushButton("Replace All")
         close_btn = QPushButton("Close")
 
-        btn_layout.addWidget(find_btn)
+        btn_layout.addWidget(previous_btn)
+        btn_layout.addWidget(next_btn)
+        btn_layout.addWidget(replace_one_btn)
         btn_layout.addWidget(replace_btn)
         btn_layout.addStretch()
         btn_layout.addWidget(close_btn)
 
         layout.addLayout(btn_layout)
 
+        self.search_input.textChanged.connect(self.schedule_search)
+        self.search_input.returnPressed.connect(self.find_next)
+        for option in (self.case_sensitive, self.whole_words, self.regex):
+            option.toggled.connect(self.schedule_search)
+        previous_btn.clicked.connect(self.find_previous)
+        next_btn.clicked.connect(self.find_next)
+        replace_one_btn.clicked.connect(self.replace_current)
+        replace_btn.clicked.connect(self.replace_all)
         close_btn.clicked.connect(self.accept)
 
+    # ---------------- Engine ----------------
+    def current_engine(self):
+        """SearchEngine of the current editor (follows tab switches)."""
+        editor = self.editor_provider() if self.editor_provider else None
+        engine = editor.search_engine() if editor is not None else None
+        if engine is not self.engine:
+            if self.engine is not None:
+                try:
+                    self.engine.count_changed.disconnect(self.on_count_changed)
+                    self.engine.clear()
+                except (TypeError, RuntimeError):
+                    pass
+            self.engine = engine
+            self._anchor = None
+            if engine is not None:
+                engine.count_changed.connect(self.on_count_changed)
+        return engine
+
+    def apply_query(self):
+        """Push the query and options to the engine; returns it, or None."""
+        engine = self.current_engine()
+        if engine is None:
+            return None
+        query = self.search_input.text()
+        if not query:
+            engine.clear()
+            self.results_text.clear()
+            return None
+        try:
+            engine.set_query(query, self.case_sensitive.isChecked(),
+                             self.whole_words.isChecked(), self.regex.isChecked())
+        except SearchError as e:
+            engine.clear()
+            self.results_text.setPlainText(str(e))
+            return None
+        return engine
+
+    # ---------------- Actions ----------------
+    def schedule_search(self):
+        self._query_timer.start()
+
+    def search_as_you_type(self):
+        """Select the first match from where typing the query started."""
+        engine = self.apply_query()
+        if engine is None:
+            return
+        if self._anchor is None:
+            self._anchor = engine.editor.textCursor().selectionStart()
+        engine.find_next(position=self._anchor)
+        self.show_status()
+
+    def find_next(self, backward=False):
+        self._query_timer.stop()
+        engine = self.apply_query()
+        if engine is None:
+            return False
+        found = engine.find_next(backward=backward)
+        self._anchor = engine.editor.textCursor().selectionStart()
+        self.show_status()
+        return found
+
+    def find_previous(self):
+        return self.find_next(backward=True)
+
+    def replace_current(self):
+        self._query_timer.stop()
+        engine = self.apply_query()
+        if engine is None:
+            return
+        try:
+            engine.replace_current(self.replace_input.text())
+        except SearchError as e:
+            self.results_text.setPlainText(str(e))
+            return
+        self.show_status()
+
+    def replace_all(self):
+        self._query_timer.stop()
+        engine = self.apply_query()
+        if engine is None:
+            return
+        try:
+            count = engine.replace_all(self.replace_input.text())
+        except SearchError as e:
+            self.results_text.setPlainText(str(e))
+            return
+        self.results_text.setPlainText(f"Replaced {count:,} matches (Ctrl+Z to undo)")
+
+    # ---------------- Status ----------------
+    def on_count_changed(self, count, complete):
+        self.show_status()
+
+    def show_status(self):
+        engine = self.engine
+        if engine is None or engine.pattern is None:
+            return
+        count = engine.count()
+        if not engine.is_complete():
+            self.results_text.setPlainText(f"Counting... {count:,} matches so far")
+        elif not count:
+            self.results_text.setPlainText("No matches")
+        else:
+            number = engine.match_number(engine.editor.textCursor().selectionStart())
+            prefix = f"Match {number:,} of " if number else ""
+            self.results_text.setPlainText(f"{prefix}{count:,} matches")
+
+    def hideEvent(self, event):
+        """Drop the match highlights when the dialog closes."""
+        self._query_timer.stop()
+        if self.engine is not None:
+            self.engine.clear()
+        self._anchor = None
+        super().hideEvent(event)
+
 
 # ===================== CUSTOM SHORTCUTS MANAGER =====================
 class ShortcutsDialog(QDialog):
@@ -387,7 +671,7 @@ class ShortcutsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Customize Shortcuts")
         self.setFixedSize(600, 400)
-        self.config_file = Path.home() / ".secure_notepad" / "shortcuts.json"
+        self.store = state_store()
         self.shortcuts = self.load_shortcuts()
         self.setup_ui()
 
@@ -428,13 +712,10 @@ class ShortcutsDialog(QDialog):
             self.shortcuts_list.addItem(item)
 
     def load_shortcuts(self):
-        """Load shortcuts from config"""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-        except:
-            pass
+        """Load shortcuts from the state store"""
+        shortcuts = self.store.items("shortcuts")
+        if shortcuts:
+            return shortcuts
 
         return {
             "New": "Ctrl+N",
@@ -455,9 +736,7 @@ class ShortcutsDialog(QDialog):
     def save_shortcuts(self):
         """Save shortcuts to config"""
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(self.shortcuts, f, indent=2)
+            self.store.replace("shortcuts", self.shortcuts)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save shortcuts: {e}")
 
@@ -505,7 +784,7 @@ class TabManager(QTabWidget):
         self.setTabsClosable(True)
         self.setMovable(True)
         self.tabCloseRequested.connect(self.close_tab)
-        self.tab_files = {}
+        self.documents = DocumentRegistry()  # tabs move, so nothing is keyed by index
 
         # ---------------- Managers ----------------
         from utils.advanced_features import AutosaveManager, RecentFilesManager
@@ -523,42 +802,31 @@ class TabManager(QTabWidget):
         editor.setPlainText(content)
         editor.document().setModified(False)
 
-        tab_name = Path(file_path).name if file_path else "Untitled"
-        tab_index = self.addTab(editor, tab_name)
-
-        self.tab_files[tab_index] = {
-            "path": file_path,
-            "encrypted": is_encrypted,
-            "modified": False,
-        }
+        document = self.documents.add(editor, file_path, is_encrypted)
+        tab_index = self.addTab(editor, document.name)
 
         # Update recent files
         if file_path:
             self.recent_files_manager.add_file(file_path)
 
         # Connect editor changes to mark tab as modified
-        editor.textChanged.connect(lambda idx=tab_index: self.mark_tab_modified(idx, True))
+        editor.textChanged.connect(lambda: self.mark_tab_modified(document, True))
 
         self.setCurrentIndex(tab_index)
         return editor
 
-    def mark_tab_modified(self, index, modified=True):
-        """Mark tab as modified (adds * to tab name)"""
-        editor_info = self.tab_files.get(index)
-        if editor_info:
-            editor_info["modified"] = modified
-            base_name = Path(editor_info["path"]).name if editor_info["path"] else "Untitled"
-            tab_name = f"*{base_name}" if modified else base_name
-            self.setTabText(index, tab_name)
+    def mark_tab_modified(self, document, modified=True):
+        """Mark a document's tab as modified (adds * to tab name)"""
+        index = self.indexOf(document.editor)
+        if index >= 0:
+            self.setTabText(index, f"*{document.name}" if modified else document.name)
 
     def autosave_all_tabs(self):
         """Autosave all modified tabs to backup directory"""
-        for index, info in self.tab_files.items():
-            editor = self.widget(index)
-            if editor and info.get("modified"):
-                content = editor.toPlainText()
-                file_path = info.get("path")
-                filename = Path(file_path).name if file_path else f"untitled_{index}.txt"
+        for document in self.documents:
+            if document.editor.document().isModified():
+                content = document.editor.toPlainText()
+                filename = document.name if document.path else f"untitled_{document.id}.txt"
                 self.autosave_manager.create_backup(filename, content)
 
     # ---------------- Save Methods ----------------
@@ -568,10 +836,9 @@ class TabManager(QTabWidget):
         if editor is None:
             return False
 
-        index = self.currentIndex()
-        info = self.tab_files.get(index, {})
-        file_path = info.get("path")
-        is_encrypted = info.get("encrypted", False)
+        document = self.documents.for_editor(editor)
+        file_path = document.path
+        is_encrypted = document.encrypted
 
         # If no file or save_as requested, ask for file path
         if not file_path or save_as:
@@ -581,8 +848,7 @@ class TabManager(QTabWidget):
             )
             if not file_path:
                 return False
-            info["path"] = file_path
-            self.tab_files[index] = info
+            self.documents.set_path(document, file_path)
 
         content = editor.toPlainText()
         try:
@@ -601,7 +867,7 @@ class TabManager(QTabWidget):
                     f.write(content)
 
             editor.document().setModified(False)
-            self.mark_tab_modified(index, False)
+            self.mark_tab_modified(document, False)
 
             # Update recent files
             if file_path:
@@ -625,7 +891,6 @@ class TabManager(QTabWidget):
     def close_tab(self, index):
         """Close specific tab with unsaved check"""
         editor = self.widget(index)
-        info = self.tab_files.get(index, {})
         if editor and editor.document().isModified():
             reply = QMessageBox.question(
                 self,
@@ -638,8 +903,12 @@ class TabManager(QTabWidget):
                     return
             elif reply == QMessageBox.Cancel:
                 return
-        self.removeTab(index)
-        self.tab_files.pop(index, None)
+        self.removeTab(index)  # does not delete the widget
+        document = self.documents.for_editor(editor)
+        if document is not None:
+            self.documents.remove(document)
+        if editor is not None:
+            editor.deleteLater()
 
     def close_all_tabs(self):
         """Close all tabs with unsaved check"""
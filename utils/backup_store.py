@@ -0,0 +1,360 @@
+"""
+utils/backup_store.py
+---------------------
+Content-addressed, deduplicated backup store used by AutosaveManager.
+
+Each backup version is split into content-defined chunks. Chunk boundaries are
+picked by hashing a small window of bytes in front of a line break, so an edit
+only changes the chunks around it and every other chunk is shared with the
+previous versions (and with any other file that contains the same text).
+Chunks are stored once, zlib-compressed, under ``objects/`` and named by their
+BLAKE2b digest. A single small ``index.json`` records the versions of every
+file together with chunk reference counts, so retention and cleanup never
+have to list the backup directory.
+
+Given a StateStore (utils.state_store), the index lives there instead, one
+entry per file under the ``backups`` namespace, so a put rewrites only the
+entry of the file it changed; reference counts are rebuilt from the
+versions on load. An existing ``index.json`` is imported on first use.
+
+Legacy ``{name}.backup.{timestamp}`` copies only carry a file name. They
+are imported under the full path of the one known file (e.g. a recent
+file) with that name, else under ``imported:{name}``; history() lists
+those versions for every file with that name.
+"""
+
+import os
+import json
+import zlib
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+INDEX_VERSION = 1
+IMPORTED_PREFIX = "imported:"  # key prefix of legacy backups whose full path is unknown
+
+# Chunking parameters (bytes). Boundaries are only considered at line breaks
+# once a chunk reaches MIN_CHUNK; a chunk never grows past MAX_CHUNK. Past the
+# minimum, a line of n bytes ends a chunk with probability n / AVG_EXTRA, so
+# chunks average roughly MIN_CHUNK + AVG_EXTRA whatever the line length.
+MIN_CHUNK = 4 * 1024
+AVG_EXTRA = 8 * 1024
+MAX_CHUNK = 64 * 1024
+WINDOW = 32
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def chunk_bytes(data: bytes, start=0, stop_at=None):
+    """
+    Split data into content-defined chunks and return a list of slices.
+
+    Scanning begins at ``start``; if a boundary lands on an offset in
+    ``stop_at`` the scan ends there so the caller can reuse its known chunks.
+    """
+    chunks = []
+    size = len(data)
+    while start < size:
+        if stop_at and start in stop_at:
+            break
+        if size - start <= MIN_CHUNK:
+            chunks.append(data[start:])
+            break
+        limit = min(start + MAX_CHUNK, size)
+        cut = limit
+        prev = start + MIN_CHUNK
+        pos = data.find(b"\n", prev, limit)
+        while pos != -1:
+            window = data[max(start, pos - WINDOW):pos]
+            if (zlib.crc32(window) & 0xFFFF) * AVG_EXTRA < (pos - prev + 1) << 16:
+                cut = pos + 1
+                break
+            prev = pos
+            pos = data.find(b"\n", pos + 1, limit)
+        chunks.append(data[start:cut])
+        start = cut
+    return chunks
+
+
+class BackupVersion:
+    """Metadata for one stored backup version (no content is loaded)."""
+
+    __slots__ = ("key", "version_id", "timestamp", "size", "digest", "chunks")
+
+    def __init__(self, key, version_id, timestamp, size, digest, chunks):
+        self.key = key
+        self.version_id = version_id
+        self.timestamp = timestamp
+        self.size = size
+        self.digest = digest
+        self.chunks = chunks
+
+    @property
+    def name(self):
+        """Legacy-style display name (``{file}.backup.{timestamp}``)."""
+        return f"{Path(self.key).name}.backup.{self.version_id}"
+
+    @property
+    def created(self):
+        return datetime.fromtimestamp(self.timestamp)
+
+    def to_dict(self):
+        return {
+            "id": self.version_id,
+            "ts": self.timestamp,
+            "size": self.size,
+            "digest": self.digest,
+            "chunks": self.chunks,
+        }
+
+    @classmethod
+    def from_dict(cls, key, data):
+        return cls(key, data["id"], data["ts"], data["size"], data["digest"], data["chunks"])
+
+    def __repr__(self):
+        return f"BackupVersion({self.key!r}, {self.version_id!r}, size={self.size})"
+
+
+class BackupStore:
+    """Chunked, content-addressed backup storage with per-file retention."""
+
+    STATE_NAMESPACE = "backups"
+
+    def __init__(self, root, retention=5, state=None, known_paths=()):
+        self.root = Path(root)
+        self.known_paths = known_paths  # full paths legacy backup names are matched against
+        self.objects_dir = self.root / "objects"
+        self.index_file = self.root / "index.json"
+        self.retention = retention
+        self.state = state
+        self._changed = set()  # keys whose versions changed since the last save_index()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        self.files = {}  # key -> [BackupVersion, ...] oldest first
+        self.refs = {}   # chunk digest -> reference count
+        self._layouts = {}  # key -> [(chunk digest, size), ...] of the last put
+        self.load_index()
+
+    # ---------------- Index ----------------
+    def load_index(self):
+        """Load the index, importing legacy full-copy backups on first run."""
+        if self.state is not None and (self.state.items(self.STATE_NAMESPACE) or not self.index_file.exists()):
+            self._load_state()
+            return
+        if not self.index_file.exists():
+            self._import_legacy_backups()
+            return
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for key, versions in data.get("files", {}).items():
+                self.files[key] = [BackupVersion.from_dict(key, v) for v in versions]
+            self.refs = data.get("refs", {})
+        except Exception as e:
+            print(f"Error loading backup index: {e}")
+            return
+        if self.state is not None:
+            self._changed.update(self.files)
+            self.save_index()
+            self.index_file.replace(self.index_file.with_name("index.json.migrated"))
+
+    def _load_state(self):
+        for key, versions in self.state.items(self.STATE_NAMESPACE).items():
+            self.files[key] = [BackupVersion.from_dict(key, v) for v in versions]
+        for versions in self.files.values():
+            for version in versions:
+                for chunk_id in version.chunks:
+                    self.refs[chunk_id] = self.refs.get(chunk_id, 0) + 1
+        if not self.files:
+            self._import_legacy_backups()
+
+    def save_index(self):
+        """Atomically rewrite the index file (or the changed entries of the state store)."""
+        if self.state is not None:
+            for key in self._changed:
+                versions = self.files.get(key)
+                if versions:
+                    self.state.set(self.STATE_NAMESPACE, key, [v.to_dict() for v in versions])
+                else:
+                    self.state.delete(self.STATE_NAMESPACE, key)
+            self._changed.clear()
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "files": {key: [v.to_dict() for v in versions] for key, versions in self.files.items()},
+            "refs": self.refs,
+        }
+        tmp = self.index_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.index_file)
+
+    def _import_legacy_backups(self):
+        """Convert ``{file}.backup.{timestamp}`` copies into chunked versions."""
+        legacy = sorted(self.root.glob("*.backup.*"), key=lambda p: p.name)
+        by_name = {}
+        if legacy:
+            for known in self.known_paths:
+                by_name.setdefault(os.path.basename(known), set()).add(str(known))
+        for path in legacy:
+            name, _, stamp = path.name.rpartition(".backup.")
+            matches = by_name.get(name, ())
+            key = next(iter(matches)) if len(matches) == 1 else IMPORTED_PREFIX + name
+            try:
+                content = path.read_text(encoding="utf-8")
+                self._add_version(key, content, float(stamp))
+                path.unlink()
+            except Exception as e:
+                print(f"Error importing legacy backup {path.name}: {e}")
+        if legacy:
+            for key in list(self.files):
+                self._prune(key, self.retention)
+            self.save_index()
+
+    # ---------------- Chunks ----------------
+    def _chunk_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _write_chunk(self, digest, data):
+        path = self._chunk_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp, path)
+
+    def read_chunk(self, digest):
+        with open(self._chunk_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    # ---------------- Versions ----------------
+    def _add_version(self, key, content, timestamp):
+        data = content.encode("utf-8", "surrogatepass")
+        digest = _digest(data)
+        versions = self.files.setdefault(key, [])
+        if versions and versions[-1].digest == digest:
+            return None
+
+        layout = self._chunk_layout(key, data)
+        chunk_ids = []
+        for chunk_id, chunk in layout:
+            if chunk_id not in self.refs:
+                self._write_chunk(chunk_id, chunk)
+                self.refs[chunk_id] = 0
+            self.refs[chunk_id] += 1
+            chunk_ids.append(chunk_id)
+        self._layouts[key] = [(chunk_id, len(chunk)) for chunk_id, chunk in layout]
+
+        if versions and versions[-1].timestamp >= timestamp:
+            timestamp = versions[-1].timestamp + 0.000001
+        version_id = f"{timestamp:.6f}"
+        version = BackupVersion(key, version_id, timestamp, len(data), digest, chunk_ids)
+        versions.append(version)
+        self._changed.add(key)
+        return version
+
+    def _chunk_layout(self, key, data):
+        """
+        Chunk data, reusing the previous layout of key where it still matches.
+
+        Leading chunks whose bytes are unchanged are verified by digest and
+        reused without rescanning; the scan over the edited region stops as
+        soon as it reaches the start of an unchanged trailing run of chunks.
+        Only the changed region is walked line by line.
+        """
+        previous = self._layouts.get(key, [])
+        head, offset = [], 0
+        for chunk_id, size in previous:
+            chunk = data[offset:offset + size]
+            if len(chunk) != size or _digest(chunk) != chunk_id:
+                break
+            head.append((chunk_id, chunk))
+            offset += size
+
+        tail, tail_starts, end = [], {}, len(data)
+        for chunk_id, size in reversed(previous[len(head):]):
+            begin = end - size
+            if begin < offset or _digest(data[begin:end]) != chunk_id:
+                break
+            tail.append((chunk_id, data[begin:end]))
+            tail_starts[begin] = len(tail)
+            end = begin
+
+        middle = chunk_bytes(data, offset, tail_starts)
+        stop = offset + sum(len(c) for c in middle)
+        reused_tail = list(reversed(tail[:tail_starts.get(stop, 0)]))
+        return head + [(_digest(c), c) for c in middle] + reused_tail
+
+    def put(self, key, content, keep=None):
+        """Store content as a new version of key; returns None if unchanged."""
+        version = self._add_version(key, content, datetime.now().timestamp())
+        if version is None:
+            return None
+        self._prune(key, self.retention if keep is None else keep)
+        self.save_index()
+        return version
+
+    def versions(self, key):
+        """Return versions of key, newest first, without reading any content."""
+        return list(reversed(self.files.get(key, [])))
+
+    def history(self, path):
+        """Versions of ``path`` and the imported legacy versions of its file name, newest first."""
+        versions = self.files.get(path, []) + self.files.get(IMPORTED_PREFIX + os.path.basename(path), [])
+        return sorted(versions, key=lambda v: v.timestamp, reverse=True)
+
+    def latest(self, key):
+        versions = self.files.get(key)
+        return versions[-1] if versions else None
+
+    def read(self, version):
+        """Reassemble the text of a version."""
+        data = b"".join(self.read_chunk(c) for c in version.chunks)
+        return data.decode("utf-8", "surrogatepass")
+
+    def keys(self):
+        return list(self.files)
+
+    def _prune(self, key, keep):
+        versions = self.files.get(key, [])
+        excess = len(versions) - max(keep, 0)
+        if excess <= 0:
+            return 0
+        for version in versions[:excess]:
+            self._release(version)
+        del versions[:excess]
+        self._changed.add(key)
+        if not versions:
+            del self.files[key]
+        return excess
+
+    def _release(self, version):
+        for chunk_id in version.chunks:
+            count = self.refs.get(chunk_id, 0) - 1
+            if count > 0:
+                self.refs[chunk_id] = count
+                continue
+            self.refs.pop(chunk_id, None)
+            try:
+                self._chunk_path(chunk_id).unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune(self, key, keep=None):
+        """Drop all but the newest ``keep`` versions of key."""
+        removed = self._prune(key, self.retention if keep is None else keep)
+        if removed:
+            self.save_index()
+        return removed
+
+    def remove(self, key):
+        """Delete every version of key."""
+        self.prune(key, 0)
+
+    def disk_usage(self):
+        """Total bytes used by stored chunks."""
+        return sum(self._chunk_path(c).stat().st_size for c in self.refs if self._chunk_path(c).exists())
@@ -0,0 +1,349 @@
+"""
+utils/diff_engine.py
+--------------------
+Line-based diff engine used for backup, disk and autosave comparisons.
+
+Lines are compared through their hashes: CPython caches the hash of every
+str, so the dict/Counter lookups below work on integer hashes without
+building a second integer array. Equal runs are skipped with galloping slice
+comparisons (C speed) and after each change the walk resyncs by looking only
+at the lines around it, so a large document costs O(edits * log n) Python
+steps plus C-level list compares. Each changed region is then split on lines
+that are unique in both sides (patience diff) and only the small gaps left
+between those anchors go through Myers' O(ND) algorithm. Gaps whose edit
+distance exceeds ``max_d`` are reported as a single replace instead of being
+searched exhaustively.
+
+Results use the same opcode tuples as ``difflib.SequenceMatcher``:
+``(tag, i1, i2, j1, j2)`` with tag in equal/replace/delete/insert.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+
+MAX_D = 1000
+SYNC_THRESHOLD = 4096  # ranges larger than this are walked with _sync_walk
+RESYNC_WINDOW = 64     # initial lines searched for a resync anchor
+ANCHOR_CONFIRM = 2     # lines that must match at a resync anchor
+
+
+# ---------------- Helpers ----------------
+def _common_prefix(a, b, a0, a1, b0, b1):
+    """Length of the common prefix of a[a0:a1] and b[b0:b1]."""
+    hi = min(a1 - a0, b1 - b0)
+    if a[a0:a0 + hi] == b[b0:b0 + hi]:
+        return hi
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[a0 + lo:a0 + mid] == b[b0 + lo:b0 + mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, a0, a1, b0, b1):
+    """Length of the common suffix of a[a0:a1] and b[b0:b1]."""
+    hi = min(a1 - a0, b1 - b0)
+    if a[a1 - hi:a1] == b[b1 - hi:b1]:
+        return hi
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[a1 - mid:a1 - lo] == b[b1 - mid:b1 - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _gallop_prefix(a, b, i, a1, j, b1):
+    """Common prefix length found by exponential probing (cheap for long runs)."""
+    limit = min(a1 - i, b1 - j)
+    step = 1
+    lo = 0
+    while lo < limit:
+        hi = min(limit, lo + step)
+        if a[i + lo:i + hi] != b[j + lo:j + hi]:
+            return lo + _common_prefix(a, b, i + lo, i + hi, j + lo, j + hi)
+        lo = hi
+        step *= 2
+    return lo
+
+
+# ---------------- Myers ----------------
+def _myers(a, b, a0, a1, b0, b1, out, max_d):
+    """Append per-line steps for a[a0:a1] -> b[b0:b1]; False if D > max_d."""
+    n, m = a1 - a0, b1 - b0
+    limit = min(n + m, max_d)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+    found = False
+    for d in range(limit + 1):
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                found = True
+                break
+        if found:
+            break
+    if not found:
+        return False
+
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        snapshot = trace[d]  # v before step d, indices -d-1..d+1
+        k = x - y
+        base = d + 1
+        if k == -d or (k != d and snapshot[base + k - 1] < snapshot[base + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = snapshot[base + prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            steps.append(("equal", x, y))
+        if x == prev_x:
+            y -= 1
+            steps.append(("insert", x, y))
+        else:
+            x -= 1
+            steps.append(("delete", x, y))
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        steps.append(("equal", x, y))
+
+    for tag, x, y in reversed(steps):
+        if tag == "equal":
+            out.append(("equal", a0 + x, a0 + x + 1, b0 + y, b0 + y + 1))
+        elif tag == "delete":
+            out.append(("delete", a0 + x, a0 + x + 1, b0 + y, b0 + y))
+        else:
+            out.append(("insert", a0 + x, a0 + x, b0 + y, b0 + y + 1))
+    return True
+
+
+# ---------------- Patience ----------------
+def _unique_anchors(a, b, a0, a1, b0, b1):
+    """Longest increasing run of lines that occur exactly once on both sides."""
+    count_a = Counter(a[a0:a1])
+    count_b = Counter(b[b0:b1])
+    b_pos = {}
+    for j in range(b0, b1):
+        value = b[j]
+        if count_b[value] == 1 and count_a.get(value) == 1:
+            b_pos[value] = j
+    if not b_pos:
+        return []
+    pairs = [(i, b_pos[a[i]]) for i in range(a0, a1) if a[i] in b_pos]
+
+    # Patience sort: longest increasing subsequence on the b positions.
+    tails, tail_idx, prev = [], [], [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        prev[idx] = tail_idx[pos - 1] if pos else -1
+    anchors = []
+    idx = tail_idx[-1]
+    while idx != -1:
+        anchors.append(pairs[idx])
+        idx = prev[idx]
+    anchors.reverse()
+    return anchors
+
+
+def _find_anchor(a, b, i, a1, j, b1):
+    """
+    Find the cheapest resync point after a mismatch at (i, j).
+
+    Looks for a line of a that reappears in b (confirmed by the following
+    ANCHOR_CONFIRM lines) inside a window that doubles until one is found,
+    so only the neighbourhood of the change is examined.
+    """
+    window = RESYNC_WINDOW
+    while True:
+        a_end, b_end = min(a1, i + window), min(b1, j + window)
+        first = {}
+        for jj in range(j, b_end):
+            first.setdefault(b[jj], jj)
+        best, best_cost = None, None
+        for ii in range(i, a_end):
+            jj = first.get(a[ii])
+            if jj is None or a[ii:ii + ANCHOR_CONFIRM] != b[jj:jj + ANCHOR_CONFIRM]:
+                continue
+            cost = (ii - i) + (jj - j)
+            if best is None or cost < best_cost:
+                best, best_cost = (ii, jj), cost
+            if ii - i >= best_cost:
+                break
+        if best is not None or (a_end == a1 and b_end == b1):
+            return best
+        window *= 2
+
+
+def _sync_walk(a, b, a0, a1, b0, b1, out, max_d):
+    """Walk a large range: skip equal runs, resync locally after each change."""
+    i, j = a0, b0
+    while i < a1 and j < b1:
+        run = _gallop_prefix(a, b, i, a1, j, b1)
+        if run:
+            out.append(("equal", i, i + run, j, j + run))
+            i += run
+            j += run
+            continue
+        anchor = _find_anchor(a, b, i, a1, j, b1)
+        if anchor is None:
+            break
+        _diff_range(a, b, i, anchor[0], j, anchor[1], out, max_d)
+        i, j = anchor
+    if i < a1 or j < b1:
+        _diff_gap(a, b, i, a1, j, b1, out, max_d)
+
+
+def _diff_gap(a, b, a0, a1, b0, b1, out, max_d):
+    """Diff a trimmed range with patience anchors, falling back to Myers."""
+    if a0 == a1:
+        out.append(("insert", a0, a0, b0, b1))
+        return
+    if b0 == b1:
+        out.append(("delete", a0, a1, b0, b0))
+        return
+    anchors = _unique_anchors(a, b, a0, a1, b0, b1)
+    if anchors:
+        i, j = a0, b0
+        for ai, bj in anchors:
+            if ai > i or bj > j:
+                _diff_range(a, b, i, ai, j, bj, out, max_d)
+            out.append(("equal", ai, ai + 1, bj, bj + 1))
+            i, j = ai + 1, bj + 1
+        if i < a1 or j < b1:
+            _diff_range(a, b, i, a1, j, b1, out, max_d)
+    elif not _myers(a, b, a0, a1, b0, b1, out, max_d):
+        out.append(("replace", a0, a1, b0, b1))
+
+
+def _diff_range(a, b, a0, a1, b0, b1, out, max_d):
+    prefix = _common_prefix(a, b, a0, a1, b0, b1)
+    if prefix:
+        out.append(("equal", a0, a0 + prefix, b0, b0 + prefix))
+        a0 += prefix
+        b0 += prefix
+    suffix = _common_suffix(a, b, a0, a1, b0, b1)
+    a1 -= suffix
+    b1 -= suffix
+
+    if a0 < a1 and b0 < b1 and (a1 - a0) + (b1 - b0) > SYNC_THRESHOLD:
+        _sync_walk(a, b, a0, a1, b0, b1, out, max_d)
+    elif a0 < a1 or b0 < b1:
+        _diff_gap(a, b, a0, a1, b0, b1, out, max_d)
+
+    if suffix:
+        out.append(("equal", a1, a1 + suffix, b1, b1 + suffix))
+
+
+def _merge(steps):
+    """Coalesce adjacent steps and fold delete+insert pairs into replace."""
+    merged = []
+    for tag, i1, i2, j1, j2 in steps:
+        if i1 == i2 and j1 == j2:
+            continue
+        if merged:
+            ptag, pi1, pi2, pj1, pj2 = merged[-1]
+            if ptag == tag or (ptag != "equal" and tag != "equal"):
+                if ptag != tag:
+                    tag = "replace"
+                merged[-1] = (tag, pi1, i2, pj1, j2)
+                continue
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+# ---------------- Public API ----------------
+def diff_lines(a_lines, b_lines, max_d=MAX_D):
+    """Return difflib-style opcodes turning a_lines into b_lines."""
+    a = a_lines if isinstance(a_lines, list) else list(a_lines)
+    b = b_lines if isinstance(b_lines, list) else list(b_lines)
+    steps = []
+    _diff_range(a, b, 0, len(a), 0, len(b), steps, max_d)
+    return _merge(steps)
+
+
+def diff_texts(a_text, b_text, max_d=MAX_D):
+    """Split both texts into lines and diff them; returns (a_lines, b_lines, opcodes)."""
+    a_lines = a_text.splitlines()
+    b_lines = b_text.splitlines()
+    return a_lines, b_lines, diff_lines(a_lines, b_lines, max_d)
+
+
+def group_opcodes(opcodes, context=3):
+    """Split opcodes into hunks with ``context`` equal lines around changes."""
+    if not opcodes:
+        return []
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    groups, group = [], []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > context * 2:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return [g for g in groups if any(op[0] != "equal" for op in g)]
+
+
+def _hunk_range(start, stop):
+    """``start,length`` of a hunk header, as difflib writes it (``,1`` left out)."""
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start + 1 if length else start},{length}"
+
+
+def unified_diff(a_lines, b_lines, fromfile="", tofile="", context=3, opcodes=None):
+    """Render a unified diff (as a string) from precomputed or fresh opcodes."""
+    if opcodes is None:
+        opcodes = diff_lines(a_lines, b_lines)
+    out = []
+    for group in group_opcodes(opcodes, context):
+        if not out:
+            out.append(f"--- {fromfile}\n+++ {tofile}\n")
+        first, last = group[0], group[-1]
+        out.append(f"@@ -{_hunk_range(first[1], last[2])} +{_hunk_range(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(f" {line}\n" for line in a_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend(f"-{line}\n" for line in a_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend(f"+{line}\n" for line in b_lines[j1:j2])
+    return "".join(out)
@@ -0,0 +1,119 @@
+"""
+utils/document_registry.py
+--------------------------
+The open documents, independent of tab positions.
+
+Every tab's editor is registered as a Document with a stable id. Tab
+indexes change whenever a tab is closed or moved, so nothing is keyed by
+them: the main window finds a tab's Document from its editor and, when it
+needs the index, asks the tab widget with indexOf(). Lookups by id, editor
+and path are dictionary lookups. Per-document caches should key on
+Document.id, which is never reused.
+
+This module does not import Qt.
+"""
+
+import os
+import hashlib
+from itertools import count
+
+from utils.text_format import TextFormat
+
+
+def content_digest(text):
+    """Short digest of a document's text, to tell whether it changed."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def path_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class Document:
+    """
+    One open document. ``password`` is the key handle of an encrypted file
+    (what its save flow encrypts with); ``digest``, ``mtime`` and ``size``
+    describe the text and file as last opened or saved (None until then).
+    """
+
+    __slots__ = ("id", "editor", "path", "encrypted", "password", "format", "digest", "mtime", "size")
+
+    def __init__(self, doc_id, editor, path=None, encrypted=False, password=None, text_format=None):
+        self.id = doc_id
+        self.editor = editor
+        self.path = path
+        self.encrypted = encrypted
+        self.password = password
+        self.format = text_format or TextFormat()
+        self.digest = None
+        self.mtime = None
+        self.size = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.path) if self.path else "Untitled"
+
+    def __repr__(self):
+        return f"Document({self.id}, {self.path!r}, encrypted={self.encrypted})"
+
+
+class DocumentRegistry:
+    """Documents by id, by editor and by path."""
+
+    def __init__(self):
+        self._ids = count(1)
+        self._by_id = {}
+        self._by_editor = {}
+        self._by_path = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def add(self, editor, path=None, encrypted=False, password=None, text_format=None):
+        document = Document(next(self._ids), editor, None, encrypted, password, text_format)
+        self._by_id[document.id] = document
+        self._by_editor[editor] = document
+        self.set_path(document, path)
+        return document
+
+    def remove(self, document):
+        self._by_id.pop(document.id, None)
+        self._by_editor.pop(document.editor, None)
+        if document.path and self._by_path.get(path_key(document.path)) is document:
+            del self._by_path[path_key(document.path)]
+
+    def get(self, doc_id):
+        return self._by_id.get(doc_id)
+
+    def for_editor(self, editor):
+        """The Document shown by ``editor``, or None."""
+        return self._by_editor.get(editor) if editor is not None else None
+
+    def for_path(self, path):
+        """The open Document of file ``path``, or None."""
+        return self._by_path.get(path_key(path)) if path else None
+
+    def set_path(self, document, path):
+        if document.path and self._by_path.get(path_key(document.path)) is document:
+            del self._by_path[path_key(document.path)]
+        document.path = path
+        if path:
+            self._by_path[path_key(path)] = document
+
+    def set_editor(self, document, editor):
+        """Show ``document`` in another editor widget."""
+        self._by_editor.pop(document.editor, None)
+        document.editor = editor
+        self._by_editor[editor] = document
+
+    def mark_saved(self, document, text):
+        """Record the text and file state after ``document`` was opened or saved."""
+        document.digest = content_digest(text)
+        try:
+            st = os.stat(document.path)
+            document.mtime, document.size = st.st_mtime, st.st_size
+        except (OSError, TypeError):
+            document.mtime = document.size = None
@@ -0,0 +1,104 @@
+"""
+utils/document_stats.py
+-----------------------
+Incremental character / word / line statistics for a QTextDocument.
+
+The tracker keeps one (chars, words) entry per block and listens to
+``QTextDocument.contentsChange``. Each change only rescans the blocks it
+touched and splices the per-block lists, so the totals stay current in
+O(edit size) instead of copying the whole document with toPlainText() on
+every keystroke.
+
+QTextDocument turns CR, LF and CRLF into plain block separators, so the
+line-ending style is not visible in the document itself; it is carried as
+metadata (``line_ending``) set by whoever loaded the text.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Above this many touched blocks a change is recounted from one plain-text
+# snapshot, which is cheaper than walking QTextBlocks one by one.
+BULK_RESCAN_BLOCKS = 2000
+
+
+def _count_words(text):
+    return len(text.split())
+
+
+class DocumentStats(QObject):
+    """Tracks char, word and line counts of a document as it is edited."""
+
+    changed = pyqtSignal()
+
+    def __init__(self, document, line_ending="LF"):
+        super().__init__(document)
+        self.document = document
+        self.line_ending = line_ending
+        self._chars = []  # characters per block (without the separator)
+        self._words = []  # words per block
+        self._char_total = 0
+        self._word_total = 0
+        self.rescan()
+        document.contentsChange.connect(self._on_contents_change)
+
+    # ---------------- Totals ----------------
+    @property
+    def chars(self):
+        """Character count, matching len(document.toPlainText())."""
+        return self._char_total + max(0, len(self._chars) - 1)
+
+    @property
+    def words(self):
+        return self._word_total
+
+    @property
+    def lines(self):
+        return len(self._chars)
+
+    def set_line_ending(self, line_ending):
+        if line_ending != self.line_ending:
+            self.line_ending = line_ending
+            self.changed.emit()
+
+    # ---------------- Scanning ----------------
+    def rescan(self):
+        """Recount everything from one plain-text snapshot."""
+        lines = self.document.toPlainText().split("\n")
+        self._chars = list(map(len, lines))
+        self._words = [_count_words(line) for line in lines]
+        self._char_total = sum(self._chars)
+        self._word_total = sum(self._words)
+        self.changed.emit()
+
+    def _on_contents_change(self, position, removed, added):
+        doc = self.document
+        first_block = doc.findBlock(position)
+        last_block = doc.findBlock(position + added)
+        if not last_block.isValid():
+            last_block = doc.lastBlock()
+        first = first_block.blockNumber()
+        last = last_block.blockNumber()
+
+        new_span = last - first + 1
+        old_span = new_span - (doc.blockCount() - len(self._chars))
+        if first < 0 or old_span < 1 or first + old_span > len(self._chars):
+            self.rescan()
+            return
+        if new_span > BULK_RESCAN_BLOCKS:
+            self.rescan()
+            return
+
+        chars, words = [], []
+        block = first_block
+        for _ in range(new_span):
+            text = block.text()
+            chars.append(len(text))
+            words.append(_count_words(text))
+            block = block.next()
+
+        stop = first + old_span
+        self._char_total += sum(chars) - sum(self._chars[first:stop])
+        self._word_total += sum(words) - sum(self._words[first:stop])
+        self._chars[first:stop] = chars
+        self._words[first:stop] = words
+        self.changed.emit()
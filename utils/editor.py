@@ -4,9 +4,92 @@ utils/editor.py
 EnhancedTextEditor with line numbers, current-line highlighting, and professional defaults.
 """
 
+from math import ceil
+from collections import OrderedDict
+
 from PyQt5.QtWidgets import QPlainTextEdit, QWidget, QTextEdit
-from PyQt5.QtCore import Qt, QRect, QSize
-from PyQt5.QtGui import QPainter, QColor, QTextFormat, QFontDatabase, QFont, QWheelEvent
+from PyQt5.QtCore import Qt, QRect, QSize, QEvent
+from PyQt5.QtGui import QPainter, QColor, QTextFormat, QFontDatabase, QFont, QWheelEvent, QFontMetrics, QPixmap
+
+from utils.document_stats import DocumentStats
+from utils.languages import get_grammar
+from utils.lazy_highlighter import LazyHighlighter, ThreadedHighlighter, OFFLOAD_MIN_BLOCKS
+from utils.search_engine import SearchEngine
+
+GUTTER_BACKGROUND = QColor("#222222")
+GUTTER_TEXT = QColor("#858585")
+
+
+class DigitAtlas:
+    """
+    The ten digit glyphs pre-rendered once for a font, colour and device
+    pixel ratio. Line numbers are composed from these pixmaps instead of
+    shaping and rasterising a new string for every visible line, and the
+    composed numbers are kept in a small LRU so a scrolled gutter costs one
+    blit per row.
+    """
+
+    MAX_CACHED_NUMBERS = 2048
+
+    def __init__(self, font, color, device_pixel_ratio=1.0):
+        metrics = QFontMetrics(font)
+        self.advance = max(metrics.horizontalAdvance(d) for d in "0123456789")
+        self.height = metrics.height()
+        self.device_pixel_ratio = device_pixel_ratio
+        self.digits = [self._blank(1) for _ in range(10)]
+        for digit, pixmap in zip("0123456789", self.digits):
+            painter = QPainter(pixmap)
+            painter.setFont(font)
+            painter.setPen(color)
+            x = (self.advance - metrics.horizontalAdvance(digit)) / 2
+            painter.drawText(int(x), metrics.ascent(), digit)
+            painter.end()
+        self._numbers = OrderedDict()
+
+    def _blank(self, digits):
+        ratio = self.device_pixel_ratio
+        pixmap = QPixmap(ceil(self.advance * digits * ratio), ceil(self.height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        return pixmap
+
+    def number(self, number):
+        """Pixmap of ``number``, composed from the digit glyphs on first use."""
+        numbers = self._numbers
+        pixmap = numbers.get(number)
+        if pixmap is not None:
+            numbers.move_to_end(number)
+            return pixmap
+        text = str(number)
+        pixmap = self._blank(len(text))
+        painter = QPainter(pixmap)
+        for index, ch in enumerate(text):
+            painter.drawPixmap(index * self.advance, 0, self.digits[ord(ch) - 48])
+        painter.end()
+        numbers[number] = pixmap
+        if len(numbers) > self.MAX_CACHED_NUMBERS:
+            numbers.popitem(last=False)
+        return pixmap
+
+    def draw_number(self, painter, right, top, number, cache=True):
+        """
+        Draw ``number`` right-aligned so that its last digit ends at ``right``.
+
+        With ``cache=False`` a number that is not cached yet is blitted digit
+        by digit instead of being composed, which is cheaper for one-off rows
+        (e.g. after a jump to a far part of the file).
+        """
+        pixmap = self._numbers.get(number)
+        if pixmap is None and cache:
+            pixmap = self.number(number)
+        text = str(number)
+        x = right - self.advance * len(text)
+        if pixmap is not None:
+            painter.drawPixmap(x, top, pixmap)
+            return
+        for ch in text:
+            painter.drawPixmap(x, top, self.digits[ord(ch) - 48])
+            x += self.advance
 
 
 class LineNumberArea(QWidget):
@@ -30,6 +113,14 @@ class EnhancedTextEditor(QPlainTextEdit):
     def __init__(self):
         super().__init__()
 
+        # --- Line Number Area ---
+        self.lineNumberArea = LineNumberArea(self)
+        self._gutter_digits = 0
+        self._gutter_width = 0
+        self._digit_atlas = None
+        self._gutter_cache = None  # (key, pixmap) of the last full gutter paint
+        self._gutter_first = -1  # first block number of the previous gutter paint
+
         # --- Font Setup ---
         font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
         font.setPointSize(self.DEFAULT_FONT_SIZE)
@@ -38,8 +129,16 @@ class EnhancedTextEditor(QPlainTextEdit):
         # Tab stops = 4 spaces
         self.setTabStopDistance(self.fontMetrics().horizontalAdvance(' ') * 4)
 
-        # --- Line Number Area ---
-        self.lineNumberArea = LineNumberArea(self)
+        # --- Incremental document statistics (chars/words/lines) ---
+        self.stats = DocumentStats(self.document())
+
+        # --- Syntax highlighting (see set_language) ---
+        self.language = None
+        self.highlighter = None
+
+        # --- Find / replace (see search_engine) ---
+        self._search_engine = None
+        self._search_selections = []
 
         # --- Signals ---
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
@@ -52,44 +151,113 @@ class EnhancedTextEditor(QPlainTextEdit):
 
     # ---------------- Line Number Area ----------------
     def lineNumberAreaWidth(self):
-        """Calculate required width for line numbers."""
+        """Required gutter width; only recomputed when the digit count changes."""
         digits = len(str(max(1, self.blockCount())))
-        return 3 + self.fontMetrics().horizontalAdvance("9") * digits + 4
+        if digits != self._gutter_digits or not self._gutter_width:
+            self._gutter_digits = digits
+            self._gutter_width = 3 + self.digitAtlas().advance * digits + 4
+        return self._gutter_width
 
     def updateLineNumberAreaWidth(self, _):
-        """Update the left margin to fit line numbers."""
-        self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
+        """Update the left margin to fit line numbers (no-op unless the width changed)."""
+        old_width = self._gutter_width
+        width = self.lineNumberAreaWidth()
+        if width == old_width and self.viewportMargins().left() == width:
+            return
+        self.setViewportMargins(width, 0, 0, 0)
+        cr = self.contentsRect()
+        self.lineNumberArea.setGeometry(QRect(cr.left(), cr.top(), width, cr.height()))
+
+    def digitAtlas(self):
+        if self._digit_atlas is None:
+            self._digit_atlas = DigitAtlas(self.font(), GUTTER_TEXT, self.devicePixelRatioF())
+        return self._digit_atlas
+
+    def _invalidate_gutter(self):
+        """Drop cached glyphs and width after a font (zoom) or screen change."""
+        self._digit_atlas = None
+        self._gutter_width = 0
+        self._gutter_cache = None
+        self.updateLineNumberAreaWidth(0)
+        self.lineNumberArea.update()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.FontChange:
+            self._invalidate_gutter()
 
     def updateLineNumberArea(self, rect, dy):
         """Scroll or update the line number area when editor changes."""
         if dy:
+            # Qt shifts the existing pixels and only exposes the new rows.
             self.lineNumberArea.scroll(0, dy)
         else:
             self.lineNumberArea.update(0, rect.y(), self.lineNumberArea.width(), rect.height())
 
-        if rect.contains(self.viewport().rect()):
-            self.updateLineNumberAreaWidth(0)
+    def _gutter_key(self):
+        """Everything the painted line numbers depend on."""
+        area = self.lineNumberArea
+        return (
+            self.firstVisibleBlock().blockNumber(), self.contentOffset().y(),
+            self.document().revision(), self.blockCount(),
+            # Wrapped lines take more rows when the text gets narrower.
+            self.viewport().width(), self.lineWrapMode(), self.wordWrapMode(),
+            area.width(), area.height(), id(self._digit_atlas),
+        )
 
     def lineNumberAreaPaintEvent(self, event):
-        """Paint the line numbers."""
-        painter = QPainter(self.lineNumberArea)
-        painter.fillRect(event.rect(), QColor("#222222"))
+        """
+        Paint the line numbers.
+
+        Qt repaints the whole viewport for most cursor moves (the current-line
+        highlight is an extra selection), so the last full gutter is kept as a
+        pixmap and re-blitted while nothing it depends on has changed. Partial
+        updates (scrolling, edits on one line) only draw the exposed rows.
+        """
+        area = self.lineNumberArea
+        rect = event.rect()
+        painter = QPainter(area)
+        key = self._gutter_key()
+        if self._gutter_cache is not None and self._gutter_cache[0] == key:
+            painter.drawPixmap(rect, self._gutter_cache[1], rect)
+            return
+
+        full = rect.contains(area.rect())
+        if full:
+            pixmap = QPixmap(area.size() * area.devicePixelRatioF())
+            pixmap.setDevicePixelRatio(area.devicePixelRatioF())
+            target = QPainter(pixmap)
+        else:
+            target = painter
+        self._paint_line_numbers(target, rect)
+        if full:
+            target.end()
+            painter.drawPixmap(0, 0, pixmap)
+            self._gutter_cache = (key, pixmap)
+
+    def _paint_line_numbers(self, painter, rect):
+        painter.fillRect(rect, GUTTER_BACKGROUND)
+        atlas = self.digitAtlas()
+        right = self.lineNumberArea.width() - 4
+        offset = self.contentOffset()
 
         block = self.firstVisibleBlock()
         block_number = block.blockNumber()
-        top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                painter.setPen(QColor("#858585"))
-                painter.drawText(
-                    0, top, self.lineNumberArea.width() - 4, self.fontMetrics().height(),
-                    Qt.AlignRight, str(block_number + 1)
-                )
+        top = int(self.blockBoundingGeometry(block).translated(offset).top())
+        rect_top, rect_bottom = rect.top(), rect.bottom()
+
+        # Only keep composed numbers while scrolling nearby; rows reached by a
+        # jump are unlikely to be painted again soon.
+        visible_rows = max(1, rect.height() // atlas.height)
+        nearby = self._gutter_first >= 0 and abs(block_number - self._gutter_first) <= visible_rows
+        self._gutter_first = block_number
+
+        while block.isValid() and top <= rect_bottom:
+            bottom = top + int(self.blockBoundingRect(block).height())
+            if block.isVisible() and bottom >= rect_top:
+                atlas.draw_number(painter, right, top, block_number + 1, nearby)
             block = block.next()
             top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
             block_number += 1
 
     def resizeEvent(self, event):
@@ -98,6 +266,35 @@ class EnhancedTextEditor(QPlainTextEdit):
         cr = self.contentsRect()
         self.lineNumberArea.setGeometry(QRect(cr.left(), cr.top(), self.lineNumberAreaWidth(), cr.height()))
 
+    # ---------------- Syntax Highlighting ----------------
+    def set_language(self, language):
+        """Highlight as a registered language (utils.languages); None for plain text."""
+        if language == self.language:
+            return
+        if self.highlighter is not None:
+            self.highlighter.detach(clear=True)
+            self.highlighter.deleteLater()
+        self.language = language
+        if not language:
+            self.highlighter = None
+            return
+        # Large documents tokenize their background fill on a worker.
+        offload = self.blockCount() >= OFFLOAD_MIN_BLOCKS
+        highlighter_class = ThreadedHighlighter if offload else LazyHighlighter
+        self.highlighter = highlighter_class(self, get_grammar(language))
+
+    # ---------------- Find / Replace ----------------
+    def search_engine(self):
+        """The SearchEngine of this editor, created on first use."""
+        if self._search_engine is None:
+            self._search_engine = SearchEngine(self)
+        return self._search_engine
+
+    def set_search_selections(self, selections):
+        """Show search match highlights (drawn over the current-line highlight)."""
+        self._search_selections = selections
+        self.highlightCurrentLine()
+
     # ---------------- Highlight Current Line ----------------
     def highlightCurrentLine(self):
         """Highlight the line where the cursor is."""
@@ -109,6 +306,7 @@ class EnhancedTextEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extraSelections.append(selection)
+        extraSelections.extend(self._search_selections)
         self.setExtraSelections(extraSelections)
 
     # ---------------- Wheel Event ----------------
@@ -45,3 +45,31 @@ def decrypt_data(token: bytes, password: str, salt: bytes) -> str:
         raise RuntimeError("Cryptography library is not available.")
     key = derive_key(password, salt)
     return Fernet(key).decrypt(token).decode('utf-8')
+
+
+def decrypt_with_key(token: bytes, key: bytes) -> str:
+    """Decrypt a token with an already derived key (see derive_key)."""
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography library is not available.")
+    return Fernet(key).decrypt(token).decode('utf-8')
+
+
+def new_session_key() -> bytes:
+    """A random key for data that is only kept in memory (no password involved)."""
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography library is not available.")
+    return Fernet.generate_key()
+
+
+def encrypt_bytes(data: bytes, key: bytes) -> bytes:
+    """Encrypt raw bytes with an already derived key."""
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography library is not available.")
+    return Fernet(key).encrypt(data)
+
+
+def decrypt_bytes(token: bytes, key: bytes) -> bytes:
+    """Decrypt a token made by encrypt_bytes."""
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography library is not available.")
+    return Fernet(key).decrypt(token)
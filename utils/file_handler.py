@@ -6,6 +6,8 @@ File handling utilities for Secure Notepad Pro.
 import os
 from PyQt5.QtWidgets import QFileDialog, QInputDialog, QLineEdit, QMessageBox
 from utils.encryption import encrypt_data, decrypt_data, CRYPTO_AVAILABLE
+from utils.languages import detect_language
+from utils.text_format import TextFormat, read_text, write_text, encode_eol, detect_eol, SAMPLE_SIZE
 
 class FileHandler:
     """Handles file operations for Secure Notepad Pro."""
@@ -36,11 +38,12 @@ class FileHandler:
                 if not ok or not password:
                     return
                 plaintext = decrypt_data(token, password, salt)
-                self.tab_manager.new_tab(file_path, plaintext, encrypted=True, password=password)
+                text_format = TextFormat("utf-8", detect_eol(plaintext[:SAMPLE_SIZE]))
+                self.tab_manager.new_tab(file_path, plaintext, encrypted=True, password=password,
+                                         text_format=text_format)
             else:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                self.tab_manager.new_tab(file_path, content, encrypted=False)
+                content, text_format = read_text(file_path)
+                self.tab_manager.new_tab(file_path, content, encrypted=False, text_format=text_format)
         except Exception as e:
             QMessageBox.critical(self.tab_manager.tabs, "Error", f"Failed to open file:\n{e}")
 
@@ -49,67 +52,68 @@ class FileHandler:
         if not editor:
             return False
 
-        index = self.tab_manager.current_tab_index()
-        tab_data = self.tab_manager.current_tab_data()
-        path = tab_data.get("path")
-        encrypted = tab_data.get("encrypted", False)
-        password = tab_data.get("password", None)
-
-        if path:
-            if encrypted:
-                return self._save_encrypted(path, password, index)
+        document = self.tab_manager.documents.for_editor(editor)
+        if document.path:
+            if document.encrypted:
+                return self._save_encrypted(document.path, document.password, document)
             else:
-                return self._save_plaintext(path, index)
+                return self._save_plaintext(document.path, document)
         return self.save_file_as()
 
     def save_file_as(self):
         from modules.dialogs import SaveModeDialog
         dialog = SaveModeDialog(self.tab_manager.tabs, crypto_available=CRYPTO_AVAILABLE)
-        if dialog.exec_() != dialog.Accepted:
-            return False
-
+        accepted = dialog.exec_() == dialog.Accepted
         save_mode = dialog.save_mode
         password = dialog.password
-        index = self.tab_manager.current_tab_index()
-        editor = self.tab_manager.current_editor()
+        dialog.deleteLater()
+        if not accepted:
+            return False
+        document = self.tab_manager.current_document()
+        if document is None:
+            return False
 
         if save_mode == "plaintext":
             file_path, _ = QFileDialog.getSaveFileName(self.tab_manager.tabs, "Save File As", "untitled.txt", "Text Files (*.txt)")
             if file_path:
-                return self._save_plaintext(file_path, index)
+                return self._save_plaintext(file_path, document)
         elif save_mode == "encrypted":
             if not password:
                 QMessageBox.warning(self.tab_manager.tabs, "Error", "Encryption password cannot be empty.")
                 return False
             file_path, _ = QFileDialog.getSaveFileName(self.tab_manager.tabs, "Save Encrypted File As", "untitled.txt.enc", "Encrypted Files (*.txt.enc)")
             if file_path:
-                return self._save_encrypted(file_path, password, index)
+                return self._save_encrypted(file_path, password, document)
         return False
 
-    def _save_plaintext(self, path, index):
+    def _save_plaintext(self, path, document):
         try:
-            editor = self.tab_manager.tabs.widget(index)
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(editor.toPlainText())
-            self.tab_manager.tab_files[index] = {"path": path, "encrypted": False, "password": None}
-            self.tab_manager.tabs.setTabText(index, os.path.basename(path))
+            editor = document.editor
+            write_text(path, editor.toPlainText(), document.format)
+            self.tab_manager.documents.set_path(document, path)
+            document.encrypted, document.password = False, None
+            self.tab_manager.tabs.setTabText(self.tab_manager.tabs.indexOf(editor), os.path.basename(path))
+            editor.set_language(detect_language(path, editor.document().firstBlock().text()))
             editor.document().setModified(False)
             return True
         except Exception as e:
             QMessageBox.critical(self.tab_manager.tabs, "Error", f"Failed to save file:\n{e}")
             return False
 
-    def _save_encrypted(self, path, password, index):
+    def _save_encrypted(self, path, password, document):
         if not CRYPTO_AVAILABLE:
             QMessageBox.critical(self.tab_manager.tabs, "Error", "Cryptography not installed")
             return False
         try:
-            editor = self.tab_manager.tabs.widget(index)
-            token, salt = encrypt_data(editor.toPlainText(), password)
+            editor = document.editor
+            token, salt = encrypt_data(encode_eol(editor.toPlainText(), document.format), password)
             with open(path, "wb") as f:
                 f.write(salt + token)
-            self.tab_manager.tab_files[index] = {"path": path, "encrypted": True, "password": password}
-            self.tab_manager.tabs.setTabText(index, os.path.basename(path))
+            self.tab_manager.documents.set_path(document, path)
+            document.encrypted, document.password = True, password
+            document.format = TextFormat("utf-8", document.format.eol)
+            self.tab_manager.tabs.setTabText(self.tab_manager.tabs.indexOf(editor), os.path.basename(path))
+            editor.set_language(detect_language(path, editor.document().firstBlock().text()))
             editor.document().setModified(False)
             return True
         except Exception as e:
@@ -117,16 +121,11 @@ class FileHandler:
             return False
 
     def autosave_all_tabs(self):
-        for index in range(self.tab_manager.tabs.count()):
-            editor = self.tab_manager.tabs.widget(index)
-            if not editor.document().isModified():
+        for document in self.tab_manager.documents:
+            if not document.editor.document().isModified():
                 continue
-            tab_data = self.tab_manager.tab_files.get(index, {})
-            path = tab_data.get("path")
-            encrypted = tab_data.get("encrypted", False)
-            password = tab_data.get("password", None)
-            if path:
-                if encrypted:
-                    self._save_encrypted(path, password, index)
+            if document.path:
+                if document.encrypted:
+                    self._save_encrypted(document.path, document.password, document)
                 else:
-                    self._save_plaintext(path, index)
+                    self._save_plaintext(document.path, document)
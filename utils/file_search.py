@@ -0,0 +1,237 @@
+"""
+utils/file_search.py
+--------------------
+Find in Files: search every note under a folder, including encrypted ones.
+
+This module does not import Qt; ui/find_in_files.py runs search_file() on
+QThreadPool workers, one file per task.
+
+- Plaintext files are memory-mapped. For a plain (non-regex) query in an
+  ASCII-compatible encoding the mapped bytes are scanned with a bytes
+  regex of the query, and only the lines it hits are decoded and checked
+  with the same pattern the editor uses (utils.search_engine), so whole
+  word and case rules behave exactly as in Find. Other files (regexes,
+  UTF-16, case-insensitive non-ASCII queries) are decoded and searched as
+  text.
+- ``.enc`` notes are decrypted in memory with the password given for the
+  search. PBKDF2 is slow by design, so derived keys are kept per (password,
+  salt) in KEY_CACHE for the session and repeated searches skip it.
+"""
+
+import os
+import re
+import mmap
+import fnmatch
+import threading
+
+from utils.encryption import derive_key, decrypt_with_key
+from utils.text_format import SAMPLE_SIZE, sniff_bytes, read_text
+
+ENCRYPTED_SUFFIX = ".enc"
+SALT_SIZE = 16
+BINARY_SAMPLE = 8192
+MAX_MATCHES_PER_FILE = 1000
+PREVIEW_CHARS = 200
+CHECK_EVERY = 64  # candidate lines between cancellation checks
+
+# Encodings in which ASCII bytes (and so b"\n") mean the same as in ASCII.
+_ASCII_COMPATIBLE = ("utf-8", "cp1252", "latin-1")
+
+
+class FileMatch:
+    """One match: 1-based line, 0-based column in UTF-16 units (as QTextDocument counts)."""
+
+    __slots__ = ("path", "line", "column", "length", "preview")
+
+    def __init__(self, path, line, column, length, preview):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.length = length
+        self.preview = preview
+
+    def __repr__(self):
+        return f"FileMatch({self.path!r}, line={self.line}, column={self.column})"
+
+
+class KeyCache:
+    """Thread-safe cache of keys derived from (password, salt)."""
+
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def key(self, password, salt):
+        cache_key = (password, bytes(salt))
+        with self._lock:
+            key = self._keys.get(cache_key)
+        if key is None:
+            key = derive_key(password, salt)  # slow; not under the lock
+            with self._lock:
+                self._keys[cache_key] = key
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+KEY_CACHE = KeyCache()
+
+
+# ---------------- Walking ----------------
+def is_encrypted(path):
+    return path.endswith(ENCRYPTED_SUFFIX)
+
+
+def name_patterns(patterns):
+    """Normalized file name patterns for name_matches()."""
+    return [p.strip().lower() for p in patterns if p.strip()] or ["*"]
+
+
+def name_matches(name, patterns, include_encrypted=True):
+    """Whether a file name matches one of ``patterns`` (``*.txt`` also matches ``notes.txt.enc``)."""
+    lowered = name.lower()
+    if is_encrypted(lowered):
+        if not include_encrypted:
+            return False
+        lowered = lowered[:-len(ENCRYPTED_SUFFIX)]
+    return any(fnmatch.fnmatchcase(lowered, p) for p in patterns)
+
+
+def iter_files(root, patterns=("*",), include_encrypted=True, cancelled=None):
+    """
+    Yield the files under ``root`` whose name matches one of ``patterns``.
+    Hidden directories are skipped.
+    """
+    patterns = name_patterns(patterns)
+    for directory, dirnames, filenames in os.walk(root):
+        if cancelled is not None and cancelled.is_set():
+            return
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name_matches(name, patterns, include_encrypted):
+                yield os.path.join(directory, name)
+
+
+# ---------------- Searching ----------------
+def _utf16_length(text):
+    return len(text) if text.isascii() else len(text.encode("utf-16-le")) // 2
+
+
+def _add_match(results, path, line_number, line, start, end):
+    preview = line if len(line) <= PREVIEW_CHARS else line[:PREVIEW_CHARS] + "…"
+    end = min(end, len(line))  # a regex match may run past the end of its line
+    results.append(FileMatch(path, line_number, _utf16_length(line[:start]),
+                             _utf16_length(line[start:end]), preview.strip()))
+
+
+def _line_matches(path, line_number, line, pattern, results):
+    """Append the matches of ``pattern`` in one line to ``results``."""
+    for match in pattern.finditer(line):
+        start, end = match.span()
+        if end > start:
+            _add_match(results, path, line_number, line, start, end)
+            if len(results) >= MAX_MATCHES_PER_FILE:
+                return
+
+
+def search_text(path, text, pattern, cancelled=None):
+    """Matches of ``pattern`` in already decoded text (they may span lines)."""
+    results = []
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    line_number, line_start, line_end = 0, 0, -1
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if end == start:
+            continue
+        if start > line_end:
+            line_number += text.count("\n", line_start, start) + (line_end < 0)
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", start)
+            line_end = len(text) if line_end < 0 else line_end
+            line = text[line_start:line_end]
+        _add_match(results, path, line_number, line, start - line_start, end - line_start)
+        if len(results) >= MAX_MATCHES_PER_FILE:
+            break
+        if len(results) % CHECK_EVERY == 0 and cancelled is not None and cancelled.is_set():
+            break
+    return results
+
+
+def bytes_prefilter(query, encoding, case_sensitive, regex):
+    """
+    A bytes pattern matching (at least) every line the query can match in
+    a file of ``encoding``, or None when the file has to be decoded.
+    """
+    if regex or encoding not in _ASCII_COMPATIBLE or not (case_sensitive or query.isascii()):
+        return None
+    try:
+        encoded = query.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+    return re.compile(re.escape(encoded), 0 if case_sensitive else re.IGNORECASE)
+
+
+def search_mapped(path, pattern, query, case_sensitive=False, regex=False, cancelled=None):
+    """Search a plaintext file through mmap (see the module docstring)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            sample = data[:SAMPLE_SIZE]
+            text_format = sniff_bytes(sample, at_eof=len(data) <= SAMPLE_SIZE)
+            if b"\0" in sample[:BINARY_SAMPLE] and not text_format.encoding.startswith(("utf-16", "utf-32")):
+                return []  # binary file
+            prefilter = bytes_prefilter(query, text_format.encoding, case_sensitive, regex)
+            if prefilter is None or text_format.eol == "CR":
+                text, _ = read_text(path, text_format)
+                return search_text(path, text, pattern, cancelled)
+
+            encoding = text_format.encoding
+            results = []
+            line_number, counted, position, candidates = 1, 0, 0, 0
+            for match in prefilter.finditer(data):
+                start = match.start()
+                if start < position:
+                    continue  # line already checked
+                line_start = data.rfind(b"\n", 0, start) + 1
+                line_end = data.find(b"\n", start)
+                line_end = len(data) if line_end < 0 else line_end
+                line_number += data[counted:line_start].count(b"\n")
+                counted = line_start
+                line = data[line_start:line_end].decode(encoding, errors="replace").rstrip("\r")
+                if line_start == 0:
+                    line = line.lstrip("\ufeff")
+                _line_matches(path, line_number, line, pattern, results)
+                if len(results) >= MAX_MATCHES_PER_FILE:
+                    break
+                candidates += 1
+                if candidates % CHECK_EVERY == 0 and cancelled is not None and cancelled.is_set():
+                    break
+                position = line_end + 1
+            return results
+
+
+def search_encrypted(path, pattern, password, key_cache=KEY_CACHE, cancelled=None):
+    """Decrypt an ``.enc`` note in memory and search it (raises on a wrong password)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    salt, token = data[:SALT_SIZE], data[SALT_SIZE:]
+    text = decrypt_with_key(token, key_cache.key(password, salt))
+    return search_text(path, text, pattern, cancelled)
+
+
+def search_file(path, pattern, query, case_sensitive=False, regex=False, password=None, cancelled=None):
+    """
+    All matches in one file (at most MAX_MATCHES_PER_FILE). Encrypted notes
+    are searched only with a ``password``; errors are raised to the caller.
+    """
+    if is_encrypted(path):
+        if not password:
+            return []
+        return search_encrypted(path, pattern, password, cancelled=cancelled)
+    return search_mapped(path, pattern, query, case_sensitive, regex, cancelled)
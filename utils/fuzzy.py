@@ -0,0 +1,186 @@
+"""
+utils/fuzzy.py
+--------------
+Fuzzy path matching for Quick Open.
+
+A query matches a path when its characters appear in order (``snp`` ->
+``secure_notepad.py``). Scoring one path is a few str.find() calls, but
+doing that for 100k paths per keystroke is far too slow in Python, so
+FuzzyIndex narrows the work down without a Python-level loop over paths:
+
+- for every character it keeps a bitset (a Python int, bit i = path i) of
+  the paths containing it; ANDing the bitsets of the query's characters
+  leaves the paths that contain all of them;
+- the set bits of a chunk are turned into path indexes with bin() and
+  itertools.compress(), and checked with a compiled ``a[^b]*b[^c]*c`` pattern
+  through map(), all in C;
+- file name matches are collected first, in the order the paths were given
+  (best first), and only the first MAX_SCORED matches are scored in Python;
+- when a query has few matches they are all found, and the next keystroke
+  (the same query plus a character) only checks those.
+
+This module does not import Qt; FuzzyIndex is built on a worker thread.
+"""
+
+import os
+import re
+from itertools import compress
+
+MAX_SCORED = 150  # matches scored per query; later (lower priority) ones are left out
+CHUNK_BITS = 256  # paths checked per step, so a common query stops early
+SEPARATORS = "/\\_-. "
+
+# Score weights
+NAME_MATCH = 100  # query matched inside the file name, not just the path
+PREFIX = 25  # file name starts with the query
+CONSECUTIVE = 6
+BOUNDARY = 8  # matched character starts a word
+FIRST_STARTS = 4  # occurrences of the first query character tried as the start of the match
+
+_SELECTORS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _char_bitsets(strings):
+    """character -> int with bit i set when strings[i] contains it."""
+    size = (len(strings) + 7) // 8
+    arrays = {}
+    for i, text in enumerate(strings):
+        byte, bit = i >> 3, 1 << (i & 7)
+        for char in set(text):
+            array = arrays.get(char)
+            if array is None:
+                array = arrays[char] = bytearray(size)
+            array[byte] |= bit
+    return {char: int.from_bytes(array, "little") for char, array in arrays.items()}
+
+
+def _subsequence_pattern(query):
+    """``a[^b]*b[^c]*c``: matches when ``query`` is a subsequence, without backtracking."""
+    parts = [re.escape(query[0])]
+    for char in query[1:]:
+        parts.append(f"[^{re.escape(char)}]*{re.escape(char)}")
+    return "".join(parts)
+
+
+def _score_from(query, text, position):
+    """Score of matching ``query`` in ``text`` greedily from ``position``, or None."""
+    score, previous = 0, -2
+    for char in query:
+        position = text.find(char, position)
+        if position < 0:
+            return None
+        if position == previous + 1:
+            score += CONSECUTIVE
+        elif previous >= 0:
+            score -= min(position - previous - 1, 3)
+        if position == 0 or text[position - 1] in SEPARATORS:
+            score += BOUNDARY
+        previous = position
+        position += 1
+    return score
+
+
+def fuzzy_score(query, text):
+    """
+    Score of lower-case ``query`` as a subsequence of lower-case ``text``,
+    or None if it is not one. Consecutive characters and word starts score
+    higher; the first few places the match can start are tried.
+    """
+    if not query:
+        return 0
+    best, start = None, text.find(query[0])
+    for _ in range(FIRST_STARTS):
+        if start < 0:
+            break
+        score = _score_from(query, text, start)
+        if score is None:
+            break  # no later start can match either
+        best = score if best is None else max(best, score)
+        start = text.find(query[0], start + 1)
+    return best
+
+
+class FuzzyIndex:
+    """Ranked fuzzy lookup over a fixed list of paths (given best first)."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._lower = [path.lower() for path in self.paths]
+        self._names = [os.path.basename(path) for path in self._lower]
+        self._path_bits = _char_bitsets(self._lower)
+        self._name_bits = _char_bitsets(self._names)
+        self._all = (1 << len(self.paths)) - 1
+        self._chunks = [(start, list(range(start, min(start + CHUNK_BITS, len(self.paths)))))
+                        for start in range(0, len(self.paths), CHUNK_BITS)]
+        self._last = ("", None, None)  # query, all its name / path matches as bits (None: not all known)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _bits(self, table, query):
+        bits = self._all
+        for char in set(query):
+            bits &= table.get(char, 0)
+            if not bits:
+                break
+        return bits
+
+    def _matches(self, bits, texts, pattern, wanted):
+        """
+        Indexes of the first ``wanted`` paths among ``bits`` whose text
+        matches ``pattern``, and the bits of all matches when there are
+        fewer (else None).
+        """
+        found = []
+        # One selector byte per path, lowest bit (best path) first; sliced per chunk.
+        flags = bin(bits)[:1:-1].encode("ascii").translate(_SELECTORS)
+        for start, ids in self._chunks:
+            selectors = flags[start:start + CHUNK_BITS]
+            if 1 not in selectors:
+                if len(selectors) < CHUNK_BITS:
+                    break  # past the highest set bit
+                continue
+            candidates = list(compress(ids, selectors))
+            found.extend(compress(candidates, map(pattern.search, map(texts.__getitem__, candidates))))
+            if len(found) >= wanted:
+                return found[:wanted], None
+        matched = 0
+        for i in found:
+            matched |= 1 << i
+        return found, matched
+
+    def search(self, query, limit=50):
+        """The best ``limit`` paths for ``query`` as (score, path), best first."""
+        query = "".join(query.lower().split())
+        if not query:
+            self._last = ("", None, None)
+            return [(0, path) for path in self.paths[:limit]]
+        pattern = re.compile(_subsequence_pattern(query), re.DOTALL)
+        names, lower = self._names, self._lower
+        last_query, last_names, last_paths = self._last
+        narrowed = query.startswith(last_query) and last_query
+
+        name_bits = self._bits(self._name_bits, query)
+        if narrowed and last_names is not None:
+            name_bits &= last_names
+        found, name_matches = self._matches(name_bits, names, pattern, MAX_SCORED)
+        results = []
+        for i in found:
+            score = fuzzy_score(query, names[i])
+            if names[i].startswith(query):
+                score += PREFIX
+            results.append((NAME_MATCH + score - len(names[i]) // 8, i))
+        path_matches = None
+        if name_matches is not None:
+            # Paths matching only across directories rank below every file name match.
+            path_bits = self._bits(self._path_bits, query) & ~name_matches
+            if narrowed and last_names is not None and last_paths is not None:
+                # A path that matched the shorter query by its file name may
+                # now match only across directories.
+                path_bits &= last_names | last_paths
+            found, path_matches = self._matches(path_bits, lower, pattern, MAX_SCORED - len(results))
+            for i in found:
+                results.append((fuzzy_score(query, lower[i]) - len(lower[i]) // 16, i))
+        self._last = (query, name_matches, path_matches)
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self.paths[i]) for score, i in results[:limit]]
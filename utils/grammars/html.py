@@ -0,0 +1,36 @@
+"""
+utils/grammars/html.py
+----------------------
+HTML / XML grammar (multi-line state for comments and open tags).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "html",
+    styles={
+        "tag": {"color": "#6366f1", "bold": True},
+        "attribute": {"color": "#0078D4"},
+        "string": {"color": "#22c55e"},
+        "comment": {"color": "#888888", "italic": True},
+        "entity": {"color": "#f59e0b"},
+    },
+    states={
+        "root": {"rules": [
+            (r"<!--", "comment", "comment"),
+            (r"<![^>]*>", "tag", None),
+            (r"<\?.*?\?>", "tag", None),
+            (r"</?[A-Za-z][\w:.-]*", "tag", "tag"),
+            (r"&(?:#\d+|#x[0-9a-fA-F]+|\w+);", "entity", None),
+        ]},
+        "tag": {"rules": [
+            (r"/?>", "tag", "root"),
+            (r'"[^"]*"?', "string", None),
+            (r"'[^']*'?", "string", None),
+            (r"[^\s\"'<>/=]+", "attribute", None),
+        ]},
+        "comment": {"style": "comment", "rules": [
+            (r"-->", "comment", "root"),
+        ]},
+    },
+)
@@ -0,0 +1,26 @@
+"""
+utils/grammars/ini.py
+---------------------
+INI / config-file grammar (sections, keys, values and ; or # comments).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "ini",
+    styles={
+        "section": {"color": "#6366f1", "bold": True},
+        "key": {"color": "#0078D4"},
+        "string": {"color": "#22c55e"},
+        "comment": {"color": "#888888", "italic": True},
+    },
+    states={
+        "root": {"rules": [
+            (r"^\s*[;#].*", "comment", None),
+            (r"^\s*\[[^\]]*\]?", "section", None),
+            (r"^\s*[^=:\s][^=:]*?(?=\s*[=:])", "key", None),
+            (r'"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"'[^']*'?", "string", None),
+        ]},
+    },
+)
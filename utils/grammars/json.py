@@ -0,0 +1,27 @@
+"""
+utils/grammars/json.py
+----------------------
+JSON grammar (object keys are styled apart from string values).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "json",
+    styles={
+        "key": {"color": "#0078D4"},
+        "string": {"color": "#22c55e"},
+        "number": {"color": "#f59e0b"},
+        "keyword": {"color": "#6366f1", "bold": True},
+        "error": {"color": "#ef4444"},
+    },
+    states={
+        "root": {"rules": [
+            (r'"(?:[^"\\]|\\.)*"(?=\s*:)', "key", None),
+            (r'"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?", "number", None),
+            (r"\b(?:true|false|null)\b", "keyword", None),
+            (r"[^\s{}\[\]:,\"]+", "error", None),
+        ]},
+    },
+)
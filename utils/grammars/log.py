@@ -0,0 +1,31 @@
+"""
+utils/grammars/log.py
+---------------------
+Log-file grammar (timestamps and log levels).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "log",
+    styles={
+        "timestamp": {"color": "#888888"},
+        "error": {"color": "#ef4444", "bold": True},
+        "warning": {"color": "#f59e0b", "bold": True},
+        "info": {"color": "#0078D4"},
+        "debug": {"color": "#888888"},
+        "string": {"color": "#22c55e"},
+    },
+    states={
+        "root": {"rules": [
+            (r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?", "timestamp", None),
+            (r"\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b", "timestamp", None),
+            (r"\b(?:FATAL|CRITICAL|ERROR|ERR|SEVERE|Traceback)\b", "error", None),
+            (r"\b(?:WARNING|WARN)\b", "warning", None),
+            (r"\b(?:INFO|NOTICE)\b", "info", None),
+            (r"\b(?:DEBUG|TRACE)\b", "debug", None),
+            (r'"(?:[^"\\]|\\.)*"', "string", None),
+            (r"[A-Za-z_]\w*", None, None),
+        ]},
+    },
+)
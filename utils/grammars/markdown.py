@@ -0,0 +1,36 @@
+"""
+utils/grammars/markdown.py
+--------------------------
+Markdown grammar (headings, emphasis, code spans, fenced code blocks, links).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "markdown",
+    styles={
+        "heading": {"color": "#6366f1", "bold": True},
+        "bold": {"bold": True},
+        "italic": {"italic": True},
+        "code": {"color": "#22c55e"},
+        "link": {"color": "#0078D4"},
+        "quote": {"color": "#888888", "italic": True},
+        "list": {"color": "#f59e0b"},
+    },
+    states={
+        "root": {"rules": [
+            (r"^\s*(?:```|~~~).*", "code", "fence"),
+            (r"^#{1,6}\s.*", "heading", None),
+            (r"^\s*>.*", "quote", None),
+            (r"^\s*(?:[-*+]|\d+[.)])(?=\s)", "list", None),
+            (r"`[^`]+`", "code", None),
+            (r"\*\*[^*]+\*\*|__[^_]+__", "bold", None),
+            (r"\*[^*\s][^*]*\*|\b_[^_\s][^_]*_\b", "italic", None),
+            (r"!?\[[^\]]*\]\([^)]*\)", "link", None),
+            (r"<https?://[^>]+>", "link", None),
+        ]},
+        "fence": {"style": "code", "rules": [
+            (r"^\s*(?:```|~~~)\s*$", "code", "root"),
+        ]},
+    },
+)
@@ -0,0 +1,46 @@
+"""
+utils/grammars/python.py
+------------------------
+Python grammar (multi-line state for triple-quoted strings).
+"""
+
+from utils.syntax_engine import Grammar
+
+PYTHON_KEYWORDS = (
+    "False", "None", "True", "and", "as", "assert", "async", "await", "break", "class",
+    "continue", "def", "del", "elif", "else", "except", "finally", "for", "from", "global",
+    "if", "import", "in", "is", "lambda", "nonlocal", "not", "or", "pass", "raise",
+    "return", "try", "while", "with", "yield",
+)
+
+GRAMMAR = Grammar(
+    "python",
+    styles={
+        "keyword": {"color": "#6366f1", "bold": True},
+        "string": {"color": "#22c55e"},
+        "comment": {"color": "#888888", "italic": True},
+        "number": {"color": "#f59e0b"},
+        "decorator": {"color": "#0078D4"},
+    },
+    states={
+        "root": {"rules": [
+            (r"#.*", "comment", None),
+            (r'[rRbBuUfF]{0,2}"""', "string", "triple_double"),
+            (r"[rRbBuUfF]{0,2}'''", "string", "triple_single"),
+            (r'[rRbBuUfF]{0,2}"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"[rRbBuUfF]{0,2}'(?:[^'\\]|\\.)*'?", "string", None),
+            (r"\b(?:%s)\b" % "|".join(PYTHON_KEYWORDS), "keyword", None),
+            (r"\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?[jJ]?)", "number", None),
+            (r"^\s*@[\w.]+", "decorator", None),
+            (r"[A-Za-z_]\w*", None, None),  # skip identifiers in one step
+        ]},
+        "triple_double": {"style": "string", "rules": [
+            (r"\\.", "string", None),
+            (r'"""', "string", "root"),
+        ]},
+        "triple_single": {"style": "string", "rules": [
+            (r"\\.", "string", None),
+            (r"\'\'\'", "string", "root"),
+        ]},
+    },
+)
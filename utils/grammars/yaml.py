@@ -0,0 +1,34 @@
+"""
+utils/grammars/yaml.py
+----------------------
+YAML grammar (keys, scalars, anchors/aliases, comments and document markers).
+"""
+
+from utils.syntax_engine import Grammar
+
+GRAMMAR = Grammar(
+    "yaml",
+    styles={
+        "key": {"color": "#0078D4"},
+        "string": {"color": "#22c55e"},
+        "number": {"color": "#f59e0b"},
+        "keyword": {"color": "#6366f1", "bold": True},
+        "comment": {"color": "#888888", "italic": True},
+        "anchor": {"color": "#d946ef"},
+        "marker": {"color": "#6366f1", "bold": True},
+    },
+    states={
+        "root": {"rules": [
+            (r"^(?:---|\.\.\.)(?=\s|$)", "marker", None),
+            (r"^%\w+.*", "marker", None),
+            (r"(?:^|(?<=\s))#.*", "comment", None),
+            (r"[^\s#'\"\-?:,\[\]{}][^#:]*?(?=:(?:\s|$))", "key", None),
+            (r'"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"'(?:[^']|'')*'?", "string", None),
+            (r"[&*][\w-]+", "anchor", None),
+            (r"\b(?:true|false|yes|no|on|off|null|True|False|Null|NULL|~)\b", "keyword", None),
+            (r"(?<![\w.])[-+]?(?:\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?|\.inf|\.nan)(?![\w.])", "number", None),
+            (r"[A-Za-z_][\w.-]*", None, None),
+        ]},
+    },
+)
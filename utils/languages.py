@@ -0,0 +1,110 @@
+"""
+utils/languages.py
+------------------
+Language registry for syntax highlighting.
+
+Languages are registered by name with their file extensions and optional
+first-line patterns (shebangs, ``<?xml``, a leading ``{``, ...). The grammar
+of a language lives in ``utils/grammars/<module>.py`` as a module-level
+``GRAMMAR`` (whose name is the module name, so workers can load it by
+name) and is only imported the first time a document of that language
+is opened; the Grammar object (and its compiled regexes) is then shared by
+every tab using it. Registering a language costs nothing at startup.
+"""
+
+import os
+import re
+import importlib
+
+# Encrypted files are named "<name>.<ext>.enc"; highlight by the inner name.
+ENCRYPTED_SUFFIX = ".enc"
+FIRST_LINE_LIMIT = 512
+
+
+class Language:
+    __slots__ = ("name", "label", "module", "extensions", "filenames")
+
+    def __init__(self, name, label, module, extensions=(), filenames=()):
+        self.name = name
+        self.label = label
+        self.module = module
+        self.extensions = tuple(extensions)
+        self.filenames = tuple(filenames)
+
+
+LANGUAGES = {}      # name -> Language
+_BY_EXTENSION = {}  # ".py" -> name
+_BY_FILENAME = {}   # "Pipfile" -> name
+_FIRST_LINE = []    # (compiled pattern, name), tried in order
+_GRAMMARS = {}      # grammar module -> Grammar
+
+
+def register(name, label, module, extensions=(), filenames=(), first_line=None):
+    """Register a language; ``first_line`` is a regex matched at the start of the text."""
+    language = Language(name, label, module, extensions, filenames)
+    LANGUAGES[name] = language
+    for ext in language.extensions:
+        _BY_EXTENSION[ext.lower()] = name
+    for filename in language.filenames:
+        _BY_FILENAME[filename] = name
+    if first_line:
+        _FIRST_LINE.append((re.compile(first_line), name))
+    return language
+
+
+# ---------------- Detection ----------------
+def language_for_path(path):
+    """Language name for a file name, or None."""
+    if not path:
+        return None
+    name = os.path.basename(path)
+    if name.lower().endswith(ENCRYPTED_SUFFIX):
+        name = name[:-len(ENCRYPTED_SUFFIX)]
+    if name in _BY_FILENAME:
+        return _BY_FILENAME[name]
+    return _BY_EXTENSION.get(os.path.splitext(name)[1].lower())
+
+
+def sniff_language(text):
+    """Language name from the first line of ``text``, or None."""
+    head = text[:FIRST_LINE_LIMIT].lstrip("\ufeff")
+    first_line = head.split("\n", 1)[0]
+    for pattern, name in _FIRST_LINE:
+        if pattern.match(first_line):
+            return name
+    return None
+
+
+def detect_language(path=None, text=""):
+    """The file name wins; content sniffing is the fallback (e.g. .txt, no extension)."""
+    return language_for_path(path) or sniff_language(text)
+
+
+# ---------------- Grammars ----------------
+def load_grammar(module):
+    """The shared Grammar defined in ``utils/grammars/<module>.py``, imported on first use."""
+    grammar = _GRAMMARS.get(module)
+    if grammar is None:
+        grammar = importlib.import_module(f"utils.grammars.{module}").GRAMMAR
+        grammar.compile()
+        _GRAMMARS[module] = grammar
+    return grammar
+
+
+def get_grammar(name):
+    """The shared Grammar of a registered language."""
+    return load_grammar(LANGUAGES[name].module)
+
+
+# ---------------- Built-in Languages ----------------
+register("python", "Python", "python", (".py", ".pyw", ".pyi"), ("SConstruct", "SConscript"),
+         first_line=r"#!.*\bpython")
+register("html", "HTML", "html", (".html", ".htm", ".xhtml"),
+         first_line=r"(?i)\s*<(?:!DOCTYPE\s+html|html)\b")
+register("xml", "XML", "html", (".xml", ".svg", ".xsd", ".xsl", ".plist", ".ui", ".qrc"),
+         first_line=r"\s*<\?xml\b")
+register("json", "JSON", "json", (".json", ".geojson", ".jsonl"), first_line=r"\s*[{\[]\s*(?:\"|$|[{\[])")
+register("yaml", "YAML", "yaml", (".yaml", ".yml"), first_line=r"(?:%YAML|---(?:\s|$))")
+register("ini", "INI", "ini", (".ini", ".cfg", ".conf", ".properties", ".toml"), (".editorconfig", ".gitconfig"))
+register("log", "Log", "log", (".log",), first_line=r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}")
+register("markdown", "Markdown", "markdown", (".md", ".markdown", ".mdown"))
@@ -0,0 +1,429 @@
+"""
+utils/lazy_highlighter.py
+-------------------------
+Viewport-first syntax highlighting for large documents.
+
+QSyntaxHighlighter formats the whole document synchronously when it is
+attached, which freezes the UI on a 100k-line file. LazyHighlighter instead:
+
+- formats the blocks in the viewport right away (and again whenever the
+  viewport moves), guessing the start state when the lines above have not
+  been tokenized yet;
+- fills in the rest of the document from a "frontier" in idle, time-sliced
+  batches with a hard per-tick budget;
+- on an edit, re-tokenizes from the edited block only until the block
+  states converge with what is already stored.
+
+Each block's user state packs a per-highlighter generation tag, the state
+the block was tokenized from and the state it ends in, so a block is known
+to be up to date when its tag matches and its stored start state equals the
+end state of the block above. Attaching or re-highlighting just takes a new
+tag instead of resetting every block.
+Formats go straight into the block layouts, like QSyntaxHighlighter does.
+QTextLayout.setFormats() records a pending document change that Qt would
+otherwise report with the *next* edit's contentsChange (making listeners
+such as DocumentStats rescan everything highlighted since), so every batch
+ends with one markContentsDirty() over the blocks it formatted.
+"""
+
+import time
+import itertools
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QTextLayout
+
+from utils.advanced_features import grammar_formats
+from utils.tokenize_worker import tokenize_chunk, process_pool
+
+STATE_BITS = 10  # grammars have fewer than 1024 states
+STATE_MASK = (1 << STATE_BITS) - 1
+FRAME_BUDGET_MS = 6
+CHECK_EVERY = 16  # blocks between deadline checks
+
+# ThreadedHighlighter: lines per worker snapshot, and the document sizes from
+# which EnhancedTextEditor offloads tokenizing to a thread / a process.
+CHUNK_LINES = 4000
+OFFLOAD_MIN_BLOCKS = 20_000
+PROCESS_MIN_BLOCKS = 300_000
+
+_generations = itertools.count()
+
+
+class LazyHighlighter(QObject):
+    """Highlights an editor's document with a Grammar, viewport first."""
+
+    def __init__(self, editor, grammar, frame_budget_ms=FRAME_BUDGET_MS):
+        super().__init__(editor)
+        self.editor = editor
+        self.document = editor.document()
+        self.grammar = grammar
+        self.formats = grammar_formats(grammar)
+        self.budget = frame_budget_ms / 1000.0
+        self.edit_budget = self.budget
+        self._frontier = 0  # every block before this one is up to date
+        self._block_count = self.document.blockCount()
+        self._tag = 0
+        self._dirty = None  # [start, end) character range with new formats
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._fill)
+
+        self.document.contentsChange.connect(self._on_contents_change)
+        editor.updateRequest.connect(self._on_update_request)
+        self.rehighlight()
+
+    # ---------------- Public API ----------------
+    def rehighlight(self):
+        """Forget all stored states and re-highlight, viewport first."""
+        self._tag = (next(_generations) % 255 + 1) << STATE_BITS
+        self._frontier = 0
+        self._block_count = self.document.blockCount()
+        self.highlight_viewport()
+        self._timer.start()
+
+    def detach(self, clear=False):
+        """Stop highlighting; with ``clear`` the applied formats are removed too."""
+        self._timer.stop()
+        try:
+            self.document.contentsChange.disconnect(self._on_contents_change)
+            self.editor.updateRequest.disconnect(self._on_update_request)
+        except (TypeError, RuntimeError):
+            pass
+        if clear:
+            block = self.document.firstBlock()
+            while block.isValid():
+                layout = block.layout()
+                if layout.formats():
+                    layout.setFormats([])
+                block.setUserState(-1)
+                block = block.next()
+            self.document.markContentsDirty(0, self.document.characterCount())
+
+    def is_complete(self):
+        return self._frontier >= self.document.blockCount()
+
+    # ---------------- Block States ----------------
+    def _end_state(self, block, default=0):
+        """End state stored on ``block`` by this highlighter, else ``default``."""
+        state = block.userState()
+        if state >= 0 and (state >> (2 * STATE_BITS)) == (self._tag >> STATE_BITS):
+            return state & STATE_MASK
+        return default
+
+    def _is_current(self, state, start):
+        """Whether a stored block state was tokenized from ``start`` by this highlighter."""
+        return state >= 0 and (state >> STATE_BITS) == (self._tag | start)
+
+    def _start_state(self, block):
+        """End state of the block above (0 for the first block or if unknown)."""
+        previous = block.previous()
+        return self._end_state(previous) if previous.isValid() else 0
+
+    # ---------------- Tokenizing ----------------
+
+    def _highlight(self, block, start):
+        """Tokenize and format one block; returns its end state."""
+        spans, end = self.grammar.tokenize(block.text(), start)
+        formats = self.formats
+        ranges = []
+        for begin, length, style in spans:
+            r = QTextLayout.FormatRange()
+            r.start = begin
+            r.length = length
+            r.format = formats[style]
+            ranges.append(r)
+        self._set_formats(block, ranges)
+        block.setUserState(((self._tag | start) << STATE_BITS) | end)
+        return end
+
+    def _set_formats(self, block, ranges):
+        layout = block.layout()
+        if ranges or layout.formats():
+            layout.setFormats(ranges)
+            position = block.position()
+            end_position = position + block.length()
+            if self._dirty is None:
+                self._dirty = [position, end_position]
+            else:
+                self._dirty[0] = min(self._dirty[0], position)
+                self._dirty[1] = max(self._dirty[1], end_position)
+
+    def _walk(self, block, start, deadline, stop_when_converged, force=0):
+        """
+        Bring blocks up to date from ``block`` on until the deadline.
+
+        The first ``force`` blocks are re-tokenized even if their stored
+        state looks current (their text changed).
+
+        Returns ``(block, converged)``: the first block that was not
+        processed (invalid at the end of the document) and whether the walk
+        stopped because, with ``stop_when_converged``, that block was
+        already up to date.
+        """
+        count = 0
+        while block.isValid():
+            state = block.userState()
+            if count >= force and self._is_current(state, start):
+                if stop_when_converged:
+                    return block, True
+                start = state & STATE_MASK
+            else:
+                start = self._highlight(block, start)
+            block = block.next()
+            count += 1
+            if count % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+        return block, False
+
+    # ---------------- Viewport ----------------
+    def highlight_viewport(self):
+        """Format the visible blocks that are missing or stale."""
+        editor = self.editor
+        block = editor.firstVisibleBlock()
+        if not block.isValid():
+            return
+        previous = block.previous()
+        start = self._end_state(previous, None) if previous.isValid() else 0
+        if start is None:
+            state = block.userState()
+            # Lines above not tokenized yet: keep an earlier guess, else root.
+            start = (state >> STATE_BITS) & STATE_MASK if self._end_state(block, None) is not None else 0
+
+        offset = editor.contentOffset()
+        top = editor.blockBoundingGeometry(block).translated(offset).top()
+        bottom_limit = editor.viewport().height()
+        while block.isValid() and top <= bottom_limit:
+            state = block.userState()
+            if self._is_current(state, start):
+                start = state & STATE_MASK
+            else:
+                start = self._highlight(block, start)
+            top += editor.blockBoundingRect(block).height()
+            block = block.next()
+
+        self._flush_formats()
+
+    def _flush_formats(self):
+        """Hand the formatted range to the layout (outside of an edit)."""
+        if self._dirty is not None:
+            start, end = self._dirty
+            self._dirty = None
+            self.document.markContentsDirty(start, end - start)
+
+    def _on_update_request(self, rect, dy):
+        self.highlight_viewport()
+
+    # ---------------- Background fill ----------------
+    def _fill(self):
+        """One idle tick: advance the frontier within the frame budget."""
+        deadline = time.perf_counter() + self.budget
+        block = self.document.findBlockByNumber(self._frontier)
+        if not block.isValid():
+            return
+        block, _ = self._walk(block, self._start_state(block), deadline, stop_when_converged=False)
+        self._frontier = block.blockNumber() if block.isValid() else self.document.blockCount()
+        self._flush_formats()
+        if block.isValid():
+            self._timer.start()
+
+    # ---------------- Edits ----------------
+    def _on_contents_change(self, position, removed, added):
+        doc = self.document
+        first = doc.findBlock(position)
+        last = doc.findBlock(position + added)
+        if not last.isValid():
+            last = doc.lastBlock()
+        delta = doc.blockCount() - self._block_count
+        self._block_count = doc.blockCount()
+
+        # Re-tokenize synchronously until the states converge, within budget;
+        # whatever is left is picked up by the background fill.
+        number = first.blockNumber()
+        touched = last.blockNumber() - number + 1
+        deadline = time.perf_counter() + self.edit_budget
+        block, converged = self._walk(first, self._start_state(first), deadline, True, force=touched)
+        if block.isValid() and block.blockNumber() <= last.blockNumber():
+            # Out of budget inside the touched range: none of the rest of it
+            # may look current to the background fill or the viewport.
+            stale = block
+            while stale.isValid():
+                stale.setUserState(-1)
+                if stale == last:
+                    break
+                stale = stale.next()
+        if number < self._frontier:
+            if converged or not block.isValid():
+                # Everything below the convergence point is still up to date.
+                stop = block.blockNumber() if block.isValid() else doc.blockCount()
+                self._frontier = max(stop, self._frontier + delta)
+            else:
+                self._frontier = block.blockNumber()
+        # Inside contentsChange Qt merges the formatted range into this
+        # edit's layout update itself.
+        self._dirty = None
+        if not self.is_complete():
+            self._timer.start()
+
+
+# ===================== OFF-THREAD TOKENIZING =====================
+class _TokenizeSignals(QObject):
+    finished = pyqtSignal(object, object)  # job, (spans, counts, end_states) or None
+
+
+class _TokenizeTask(QRunnable):
+    """Tokenize one snapshot of lines on the thread pool."""
+
+    def __init__(self, job, grammar_name, lines, state, signals):
+        super().__init__()
+        self.job = job
+        self.grammar_name = grammar_name
+        self.lines = lines
+        self.state = state
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = tokenize_chunk(self.grammar_name, self.lines, self.state)
+        except Exception as e:
+            print(f"Error tokenizing: {e}")
+            result = None
+        try:
+            self.signals.finished.emit(self.job, result)
+        except RuntimeError:
+            pass  # highlighter already deleted
+
+
+class ThreadedHighlighter(LazyHighlighter):
+    """
+    LazyHighlighter whose background fill tokenizes on a worker.
+
+    Snapshots of CHUNK_LINES lines are tokenized on the Qt thread pool (or,
+    with ``use_processes``, in a spawned process, since ``re`` holds the
+    GIL). The GUI thread only applies the returned (start, length, style)
+    arrays in budgeted batches. Every job is tagged with the document
+    revision it was taken at; lines edited since, or a frontier that moved,
+    make the rest of a result stale and it is dropped. The viewport and the
+    edited lines themselves are still tokenized synchronously, so typing
+    never waits for a worker and never pays for a long re-tokenize.
+    """
+
+    def __init__(self, editor, grammar, frame_budget_ms=FRAME_BUDGET_MS, use_processes=None):
+        super().__init__(editor, grammar, frame_budget_ms)
+        self.edit_budget = 0  # only the touched blocks (+ a few) on the GUI thread
+        if use_processes is None:
+            use_processes = self.document.blockCount() >= PROCESS_MIN_BLOCKS
+        self.use_processes = use_processes
+        self._in_flight = None
+        self._results = deque()  # [job, result, line index, span offset]
+        self._signals = _TokenizeSignals(self)
+        self._signals.finished.connect(self._on_result)
+
+    def detach(self, clear=False):
+        self._in_flight = None
+        self._results.clear()
+        super().detach(clear)
+
+    # ---------------- Dispatch ----------------
+    def _dispatch(self, first_number, start):
+        doc = self.document
+        block = doc.findBlockByNumber(first_number)
+        if not block.isValid():
+            return
+        lines = []
+        while block.isValid() and len(lines) < CHUNK_LINES:
+            lines.append(block.text())
+            block = block.next()
+        job = (self._tag, doc.revision(), first_number, start, len(lines))
+        self._in_flight = job
+        if self.use_processes:
+            future = process_pool().submit(tokenize_chunk, self.grammar.name, lines, start)
+            future.add_done_callback(lambda f, job=job: self._emit_future(job, f))
+        else:
+            task = _TokenizeTask(job, self.grammar.name, lines, start, self._signals)
+            QThreadPool.globalInstance().start(task)
+
+    def _emit_future(self, job, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error tokenizing: {e}")
+            result = None
+        try:
+            self._signals.finished.emit(job, result)
+        except RuntimeError:
+            pass
+
+    def _on_result(self, job, result):
+        if job is not self._in_flight:
+            return
+        self._in_flight = None
+        if result is None or job[0] != self._tag:
+            return
+        self._results.append([job, result, 0, 0])
+        # Pipeline: tokenize the next chunk while this one is applied.
+        tag, revision, first, start, count = job
+        if revision == self.document.revision() and first + count < self.document.blockCount():
+            self._dispatch(first + count, result[2][-1])
+        self._timer.start()
+
+    # ---------------- Apply ----------------
+    def _fill(self):
+        """One idle tick: apply worker results within the budget, keep a job in flight."""
+        deadline = time.perf_counter() + self.budget
+        while self._results and time.perf_counter() < deadline:
+            if not self._apply(self._results[0], deadline):
+                self._results.popleft()
+        self._flush_formats()
+        if self.is_complete():
+            self._results.clear()
+            return
+        if not self._results and self._in_flight is None:
+            block = self.document.findBlockByNumber(self._frontier)
+            self._dispatch(self._frontier, self._start_state(block))
+        if self._results:
+            self._timer.start()
+
+    def _apply(self, entry, deadline):
+        """Apply part of one result; returns True while lines are left to apply."""
+        job, (spans, counts, end_states), index, offset = entry
+        tag, revision, first, start, count = job
+        doc = self.document
+        if tag != self._tag or first + index != self._frontier:
+            return False
+        block = doc.findBlockByNumber(self._frontier)
+        if index:
+            start = end_states[index - 1]
+        if self._start_state(block) != start:
+            return False
+        check_revisions = doc.revision() != revision
+        formats = self.formats
+        applied = 0
+        while index < count and block.isValid():
+            if check_revisions and block.revision() > revision:
+                return False  # edited since the snapshot
+            n = counts[index]
+            end = end_states[index]
+            if not self._is_current(block.userState(), start):
+                ranges = []
+                for i in range(offset, offset + 3 * n, 3):
+                    r = QTextLayout.FormatRange()
+                    r.start = spans[i]
+                    r.length = spans[i + 1]
+                    r.format = formats[spans[i + 2]]
+                    ranges.append(r)
+                self._set_formats(block, ranges)
+                block.setUserState(((self._tag | start) << STATE_BITS) | end)
+            offset += 3 * n
+            start = end
+            index += 1
+            self._frontier += 1
+            block = block.next()
+            applied += 1
+            if applied % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+        entry[2], entry[3] = index, offset
+        return index < count and block.isValid()
+
@@ -0,0 +1,539 @@
+"""
+utils/notes_index.py
+--------------------
+Persistent full-text index of a notes folder for Find in Files.
+
+The index is an inverted word index (lower-cased ``\\w+`` words -> ids of
+the files containing them) plus a trigram index over the *vocabulary*
+(trigram -> ids of the words containing it). A query is reduced to the
+words it must contain -- for a regex, the literal runs every match must
+include -- and each word is looked up as a substring of the vocabulary, so
+``ello`` finds files containing "hello" or "Yellow". The result is a
+superset of the files that can match; the caller still searches those
+files (utils.file_search), but only those.
+
+Files the index cannot read as text (binary, too large, encrypted) are
+kept as "unindexed" and always returned as candidates, so a lookup never
+hides a match.
+
+update() walks the folder and re-reads only files whose size or mtime
+changed, and re-tokenizes only those whose content hash changed. The index
+is saved atomically to ``~/.secure_notepad/index/`` as one binary file of
+length-prefixed sections, loaded with array.frombytes().
+
+EncryptedNotesIndex does the same for encrypted notes and keeps its index
+encrypted on disk.
+
+This module does not import Qt; update() is meant to run on a worker
+thread, and a lock keeps queries consistent meanwhile.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+
+try:
+    from re import _parser as _sre_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parser
+
+from utils.encryption import encrypt_bytes, decrypt_bytes, decrypt_with_key
+from utils.file_search import iter_files, is_encrypted, KEY_CACHE, SALT_SIZE, BINARY_SAMPLE
+from utils.text_format import SAMPLE_SIZE, sniff_bytes
+
+INDEX_DIR = Path.home() / ".secure_notepad" / "index"
+MAGIC = b"SNIDX\x01"
+MAX_FILE_SIZE = 16 * 1024 * 1024  # larger files are searched directly
+MAX_TRIGRAM_WORD = 64  # longer words are matched by a linear scan
+COMPACT_RATIO = 0.25  # dropped records, relative to live ones, before save() compacts
+
+_WORD = re.compile(r"\w+")
+
+
+def index_path(root, suffix=".idx"):
+    """Where the index of ``root`` is stored."""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return INDEX_DIR / f"{digest}{suffix}"
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+# ---------------- Query Analysis ----------------
+def _regex_literals(pattern, flags=0):
+    """Literal strings every match of ``pattern`` must contain."""
+    literals = []
+
+    def walk(items):
+        run = []
+        for op, value in items:
+            if op is _sre_parser.LITERAL:
+                run.append(chr(value))
+                continue
+            if run:
+                literals.append("".join(run))
+                run = []
+            if op is _sre_parser.SUBPATTERN:
+                walk(value[-1])
+            elif op in (_sre_parser.MAX_REPEAT, _sre_parser.MIN_REPEAT) and value[0] >= 1:
+                walk(value[2])
+        if run:
+            literals.append("".join(run))
+
+    try:
+        walk(_sre_parser.parse(pattern, flags))
+    except Exception:
+        return []
+    return literals
+
+
+def query_terms(query, whole_words=False, regex=False):
+    """
+    Lower-cased ``(word, exact)`` terms a file must contain to match.
+    ``exact`` words must appear as whole words; the others as substrings
+    of a word (the first and last word of a literal may be cut off).
+    """
+    literals = _regex_literals(query) if regex else [query]
+    terms = []
+    for literal in literals:
+        words = _WORD.findall(literal.lower())
+        for i, word in enumerate(words):
+            bounded_left = i > 0 or not _WORD.match(literal)
+            bounded_right = i < len(words) - 1 or not re.search(r"\w$", literal)
+            exact = (whole_words and not regex) or (bounded_left and bounded_right and not regex)
+            terms.append((word, exact))
+    return terms
+
+
+class _IndexedFile:
+    __slots__ = ("path", "mtime", "size", "digest", "words")
+
+    def __init__(self, path, mtime, size, digest, words):
+        self.path = path  # relative to the index root
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+        self.words = words  # array of word ids, or None when not indexed
+
+
+class NotesIndex:
+    """Word + vocabulary-trigram index of every text file under ``root``."""
+
+    def __init__(self, root, path=None):
+        self.root = os.path.abspath(root)
+        self.path = Path(path) if path else index_path(self.root)
+        self._lock = threading.RLock()
+        self._update_lock = threading.Lock()  # one update() at a time
+        self._load_tried = False  # update() and refresh() load the saved index first
+        self._reset()
+
+    def _reset(self):
+        self._files = []  # file id -> _IndexedFile or None (removed)
+        self._file_ids = {}  # relative path -> file id
+        self._words = []  # word id -> word
+        self._word_ids = {}
+        self._postings = []  # word id -> array of file ids
+        self._trigram_words = {}  # trigram -> array of word ids
+        self._long_words = array("I")  # word ids too long for the trigram index
+        self._dropped = 0  # records replaced or removed since the last _compact()
+        self._dirty = False
+
+    # ---------------- Persistence ----------------
+    @staticmethod
+    def _pack_lists(lists):
+        lengths, values = array("I"), array("I")
+        for values_list in lists:
+            lengths.append(len(values_list))
+            values.extend(values_list)
+        return lengths.tobytes(), values.tobytes()
+
+    def save(self):
+        """Write the index atomically if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            if self._dropped > COMPACT_RATIO * len(self._file_ids):
+                self._compact()
+            header = {
+                "root": self.root,
+                "byteorder": sys.byteorder,
+                "files": [
+                    None if record is None else
+                    [record.path, record.mtime, record.size, record.digest, record.words is not None]
+                    for record in self._files
+                ],
+            }
+            trigrams = list(self._trigram_words)
+            sections = [
+                json.dumps(header).encode("utf-8"),
+                "\0".join(self._words).encode("utf-8"),
+                *self._pack_lists(self._postings),
+                *self._pack_lists((r.words if r is not None and r.words is not None else ()) for r in self._files),
+                "\0".join(trigrams).encode("utf-8"),
+                *self._pack_lists(self._trigram_words[t] for t in trigrams),
+                self._long_words.tobytes(),
+            ]
+            data = [MAGIC]
+            for section in sections:
+                data += [len(section).to_bytes(8, "little"), section]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_suffix(".tmp")
+            with open(temp, "wb") as f:
+                f.write(self._encode(b"".join(data)))
+            os.replace(temp, self.path)
+            self._dirty = False
+
+    def _encode(self, data):
+        """Bytes written to disk for the serialized index (see EncryptedNotesIndex)."""
+        return data
+
+    def _decode(self, data):
+        return data
+
+    def load(self):
+        """Load the saved index; returns False (and stays empty) if there is none or it is unusable."""
+        self._load_tried = True
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        try:
+            self._load(memoryview(self._decode(data)))
+            return True
+        except Exception as e:
+            print(f"Error loading notes index {self.path}: {str(e) or type(e).__name__}")
+            with self._lock:
+                self._reset()
+            return False
+
+    def _load(self, data):
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise ValueError("not a notes index")
+        sections, offset = [], len(MAGIC)
+        while offset < len(data):
+            size = int.from_bytes(data[offset:offset + 8], "little")
+            sections.append(data[offset + 8:offset + 8 + size])
+            offset += 8 + size
+        header = json.loads(bytes(sections[0]).decode("utf-8"))
+        if header["root"] != self.root:
+            raise ValueError("index of another folder")
+        swap = header["byteorder"] != sys.byteorder
+
+        def unpack(lengths_bytes, values_bytes):
+            lengths, values = array("I"), array("I")
+            lengths.frombytes(lengths_bytes)
+            values.frombytes(values_bytes)
+            if swap:
+                lengths.byteswap()
+                values.byteswap()
+            lists, start = [], 0
+            for length in lengths:
+                lists.append(values[start:start + length])
+                start += length
+            return lists
+
+        words_blob = bytes(sections[1]).decode("utf-8")
+        trigram_blob = bytes(sections[6]).decode("utf-8")
+        with self._lock:
+            self._words = words_blob.split("\0") if words_blob else []
+            self._word_ids = {word: i for i, word in enumerate(self._words)}
+            self._postings = unpack(sections[2], sections[3])
+            forward = unpack(sections[4], sections[5])
+            self._files, self._file_ids = [], {}
+            for file_id, entry in enumerate(header["files"]):
+                if entry is None:
+                    self._files.append(None)
+                    continue
+                rel, mtime, size, digest, indexed = entry
+                self._files.append(_IndexedFile(rel, mtime, size, digest, forward[file_id] if indexed else None))
+                self._file_ids[rel] = file_id
+            self._dropped = len(self._files) - len(self._file_ids)
+            trigrams = trigram_blob.split("\0") if trigram_blob else []
+            self._trigram_words = dict(zip(trigrams, unpack(sections[7], sections[8])))
+            self._long_words = array("I")
+            self._long_words.frombytes(sections[9])
+            if swap:
+                self._long_words.byteswap()
+            self._dirty = False
+
+    # ---------------- Updating ----------------
+    def _word_id(self, word):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._words.append(word)
+            self._word_ids[word] = word_id
+            self._postings.append(array("I"))
+            if len(word) > MAX_TRIGRAM_WORD:
+                self._long_words.append(word_id)
+            else:
+                for trigram in _trigrams(word):
+                    ids = self._trigram_words.get(trigram)
+                    if ids is None:
+                        self._trigram_words[trigram] = array("I", (word_id,))
+                    else:
+                        ids.append(word_id)
+        return word_id
+
+    def _drop(self, rel):
+        """Forget a file's record; its postings stay until _compact() (queries skip them)."""
+        file_id = self._file_ids.pop(rel, None)
+        if file_id is not None:
+            self._files[file_id] = None
+            self._dropped += 1
+            self._dirty = True
+
+    def _compact(self):
+        """Renumber the live files and rebuild the postings without dropped ones."""
+        self._files = [record for record in self._files if record is not None]
+        self._file_ids = {record.path: i for i, record in enumerate(self._files)}
+        self._postings = [array("I") for _ in self._words]
+        postings = self._postings
+        for file_id, record in enumerate(self._files):
+            for word_id in record.words or ():
+                postings[word_id].append(file_id)
+        self._dropped = 0
+
+    def _set_file(self, rel, mtime, size, digest, words):
+        """
+        Store a file's record and its words (None: keep it unindexed). A
+        changed file gets a new id, so nothing has to be removed from the
+        postings of its old words.
+        """
+        with self._lock:
+            self._drop(rel)
+            file_id = len(self._files)
+            word_ids = None
+            if words is not None:
+                words = list(words)
+                known = list(map(self._word_ids.get, words))  # one C-level pass for the common case
+                for i, word_id in enumerate(known):
+                    if word_id is None:
+                        known[i] = self._word_id(words[i])
+                word_ids = array("I", sorted(known))
+                postings = self._postings
+                for word_id in word_ids:
+                    postings[word_id].append(file_id)
+            self._files.append(_IndexedFile(rel, mtime, size, digest, word_ids))
+            self._file_ids[rel] = file_id
+            self._dirty = True
+
+    def remove(self, rel):
+        with self._lock:
+            self._drop(rel)
+
+    def _indexable(self, path, stat):
+        return not is_encrypted(path) and stat.st_size <= MAX_FILE_SIZE
+
+    def _read_words(self, path, data):
+        """The set of lower-cased words of a file's bytes, or None if it is not text."""
+        sample = data[:SAMPLE_SIZE]
+        text_format = sniff_bytes(sample, at_eof=len(data) <= SAMPLE_SIZE)
+        if b"\0" in sample[:BINARY_SAMPLE] and not text_format.encoding.startswith(("utf-16", "utf-32")):
+            return None
+        return set(_WORD.findall(data.decode(text_format.encoding, errors="replace").lower()))
+
+    def index_file(self, path, stat=None):
+        """(Re)index one file if its size, mtime or content changed; returns whether it did."""
+        rel = os.path.relpath(path, self.root)
+        stat = stat or os.stat(path)
+        with self._lock:
+            file_id = self._file_ids.get(rel)
+            record = self._files[file_id] if file_id is not None else None
+        if record is not None and record.mtime == stat.st_mtime_ns and record.size == stat.st_size:
+            return False
+        if not self._indexable(path, stat):
+            self._set_file(rel, stat.st_mtime_ns, stat.st_size, None, None)
+            return True
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if record is not None and record.digest == digest:
+            with self._lock:
+                record.mtime, record.size = stat.st_mtime_ns, stat.st_size
+                self._dirty = True
+            return False
+        self._set_file(rel, stat.st_mtime_ns, stat.st_size, digest, self._read_words(path, data))
+        return True
+
+    def _iter_paths(self, cancelled):
+        return iter_files(self.root, cancelled=cancelled)
+
+    def update(self, cancelled=None, progress=None):
+        """
+        Bring the index up to date with the folder and save it; returns
+        the number of files (re)indexed or removed. ``progress(done)`` is
+        called every few hundred files. The saved index is loaded first if
+        load() has not been called yet, so only changed files are read.
+        """
+        with self._update_lock:
+            if not self._load_tried:
+                self.load()
+            seen, changed = set(), 0
+            for done, path in enumerate(self._iter_paths(cancelled), 1):
+                if cancelled is not None and cancelled.is_set():
+                    return changed
+                seen.add(os.path.relpath(path, self.root))
+                try:
+                    changed += self.index_file(path)
+                except OSError as e:
+                    print(f"Error indexing {path}: {e}")
+                if progress is not None and done % 500 == 0:
+                    progress(done)
+            if cancelled is not None and cancelled.is_set():
+                # iter_files() stops quietly when cancelled: the folder was
+                # not fully listed, so nothing may be pruned or saved.
+                return changed
+            with self._lock:
+                gone = [rel for rel in self._file_ids if rel not in seen]
+            for rel in gone:
+                self.remove(rel)
+            changed += len(gone)
+            self.save()
+            return changed
+
+    # ---------------- Queries ----------------
+    def _matching_words(self, word, exact):
+        """
+        Ids of vocabulary words equal to (``exact``) or containing ``word``,
+        or None when ``word`` is too short to look up.
+        """
+        if exact:
+            word_id = self._word_ids.get(word)
+            return () if word_id is None else (word_id,)
+        if len(word) < 3:
+            return None  # part of too many words to narrow anything down
+        words = self._words
+        candidates = None
+        for trigram in _trigrams(word):
+            ids = self._trigram_words.get(trigram)
+            if ids is None:
+                candidates = set()
+                break
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                break
+        found = [i for i in candidates if word in words[i]] if candidates else []
+        found.extend(i for i in self._long_words if word in words[i])
+        return found
+
+    def candidates(self, query, whole_words=False, regex=False):
+        """
+        Absolute paths of the files that may match, or None when the query
+        has no word the index can use (search every file then).
+        """
+        terms = query_terms(query, whole_words, regex)
+        if not terms:
+            return None
+        with self._lock:
+            file_ids = None
+            for word, exact in terms:
+                word_ids = self._matching_words(word, exact)
+                if word_ids is None:
+                    continue
+                found = set()
+                for word_id in word_ids:
+                    found.update(self._postings[word_id])
+                file_ids = found if file_ids is None else file_ids & found
+                if not file_ids:
+                    break
+            if file_ids is None:
+                return None
+            files = self._files
+            paths = [files[i].path for i in file_ids if files[i] is not None]
+            paths.extend(r.path for r in self._files if r is not None and r.words is None)
+        return sorted(os.path.join(self.root, rel) for rel in set(paths))
+
+    def refresh(self, paths):
+        """Re-index just ``paths`` (e.g. files just saved) and save."""
+        with self._update_lock:
+            if not self._load_tried:
+                self.load()
+            for path in paths:
+                try:
+                    self.index_file(path)
+                except FileNotFoundError:
+                    self.remove(os.path.relpath(path, self.root))
+                except OSError as e:
+                    print(f"Error indexing {path}: {e}")
+            self.save()
+
+    def covers(self, path):
+        """Whether ``path`` is the indexed folder or inside it."""
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(os.path.join(self.root, ""))
+
+    def file_count(self):
+        with self._lock:
+            return len(self._file_ids)
+
+
+class EncryptedNotesIndex(NotesIndex):
+    """
+    Index of the ``.enc`` notes under ``root`` that open with ``password``
+    (the vault password). The whole index -- paths, words and all -- is
+    Fernet-encrypted on disk under a key derived from the password and a
+    salt of its own, so nothing of the notes is stored in plain text. It is
+    decrypted once when loaded and then queried in memory; each file is
+    decrypted only when it is new or changed (keys come from KEY_CACHE).
+    Notes that do not open with the password stay unindexed and are always
+    candidates, as encrypted notes are in NotesIndex.
+
+    Each password has an index file of its own (see ``path``), so two vault
+    passwords used on one folder do not rebuild over each other's index.
+    """
+
+    def __init__(self, root, password, path=None):
+        super().__init__(root, path)
+        self._path = Path(path) if path else None  # None: named from the password on first use
+        self.password = password
+        self._salt = None
+
+    @property
+    def path(self):
+        """
+        The index file. By default its name carries a tag derived from the
+        password the way note keys are (slow, salted by the folder), so it
+        says no more about the password than the index itself does. Worked
+        out on first use, which is on the indexing thread.
+        """
+        if self._path is None:
+            salt = hashlib.sha256(b"notes index:" + self.root.encode("utf-8")).digest()[:SALT_SIZE]
+            tag = hashlib.sha256(KEY_CACHE.key(self.password, salt)).hexdigest()[:16]
+            self._path = index_path(self.root, f".{tag}.eidx")
+        return self._path
+
+    @path.setter
+    def path(self, path):
+        self._path = path
+
+    def _encode(self, data):
+        if self._salt is None:
+            self._salt = os.urandom(SALT_SIZE)
+        return self._salt + encrypt_bytes(data, KEY_CACHE.key(self.password, self._salt))
+
+    def _decode(self, data):
+        salt = data[:SALT_SIZE]
+        decoded = decrypt_bytes(data[SALT_SIZE:], KEY_CACHE.key(self.password, salt))
+        self._salt = salt
+        return decoded
+
+    def _iter_paths(self, cancelled):
+        return (path for path in iter_files(self.root, cancelled=cancelled) if is_encrypted(path))
+
+    def _indexable(self, path, stat):
+        return is_encrypted(path) and stat.st_size <= MAX_FILE_SIZE
+
+    def _read_words(self, path, data):
+        try:
+            text = decrypt_with_key(data[SALT_SIZE:], KEY_CACHE.key(self.password, data[:SALT_SIZE]))
+        except Exception:
+            return None  # another password (or not a note): searched directly
+        return set(_WORD.findall(text.lower()))
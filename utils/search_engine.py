@@ -0,0 +1,455 @@
+"""
+utils/search_engine.py
+----------------------
+Find / replace engine for EnhancedTextEditor.
+
+Searching never copies the whole document: text is read in chunks of about
+CHUNK_CHARS characters that end on line boundaries and matched with Python
+regexes (compiled once per query and cached). Positions are converted to the
+UTF-16 offsets QTextDocument uses, which differ from Python string indices
+only after characters outside the BMP.
+
+- Only the visible blocks are searched to highlight matches, so typing a
+  query stays fast whatever the document size.
+- The full match index (start/end arrays) is built in idle, time-sliced
+  batches and reported through ``count_changed``; once it is complete for
+  the current document revision, find-next is a bisect.
+- Until then find-next scans forward (or backward) from the cursor and
+  stops at the first match.
+
+In regular-expression mode a chunk is searched together with up to
+OVERLAP_CHARS of the text after it, so matches spanning lines are found
+across chunk boundaries (up to that length).
+"""
+
+import re
+import time
+import bisect
+import functools
+from array import array
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor, QColor
+from PyQt5.QtWidgets import QTextEdit
+
+CHUNK_CHARS = 64 * 1024
+OVERLAP_CHARS = 64 * 1024
+FRAME_BUDGET_MS = 6
+RESCAN_DELAY_MS = 300  # wait for typing to pause before recounting
+MAX_VISIBLE_MATCHES = 2000
+MERGE_GAP_CHARS = 4096  # Replace All: closer matches share one edit
+MATCH_BACKGROUND = QColor("#5c4b14")
+
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+class SearchError(ValueError):
+    """Raised for an empty query or an invalid regular expression."""
+
+
+@functools.lru_cache(maxsize=64)
+def compile_pattern(query, case_sensitive=False, whole_words=False, regex=False):
+    """Compile a search query; results are cached per (query, options)."""
+    if not query:
+        raise SearchError("Nothing to search for")
+    pattern = query if regex else re.escape(query)
+    if whole_words:
+        pattern = rf"\b(?:{pattern})\b"
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    try:
+        return re.compile(pattern, flags)
+    except re.error as e:
+        raise SearchError(f"Invalid regular expression: {e}") from None
+
+
+class _Utf16Map:
+    """Converts between string indices and UTF-16 offsets of one text."""
+
+    __slots__ = ("astral", "units")
+
+    def __init__(self, text):
+        self.astral = None if text.isascii() else [m.start() for m in _ASTRAL.finditer(text)] or None
+        self.units = [index + k for k, index in enumerate(self.astral)] if self.astral else None
+
+    def to_utf16(self, index):
+        return index + bisect.bisect_left(self.astral, index) if self.astral else index
+
+    def from_utf16(self, offset):
+        return offset - bisect.bisect_left(self.units, offset) if self.units else offset
+
+
+class SearchEngine(QObject):
+    """Searches one editor's document and highlights the visible matches."""
+
+    count_changed = pyqtSignal(int, bool)  # matches found so far, whether counting is done
+
+    def __init__(self, editor, frame_budget_ms=FRAME_BUDGET_MS):
+        super().__init__(editor)
+        self.editor = editor
+        self.document = editor.document()
+        self.budget = frame_budget_ms / 1000.0
+        self.pattern = None
+        self.regex = False
+
+        # Match index of the current pattern for one document revision.
+        self._revision = -1
+        self._starts = array("q")
+        self._ends = array("q")
+        self._complete = False
+        self._scan = None
+        self._viewport_key = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._count_tick)
+
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self._start_count)
+
+        self.document.contentsChange.connect(self._on_contents_change)
+        editor.updateRequest.connect(self._on_update_request)
+
+    # ---------------- Public API ----------------
+    def set_query(self, query, case_sensitive=False, whole_words=False, regex=False):
+        """Search for ``query`` (raises SearchError); highlights and counting start right away."""
+        pattern = compile_pattern(query, case_sensitive, whole_words, regex)
+        if pattern is self.pattern:
+            return
+        self.pattern = pattern
+        self.regex = regex
+        self._viewport_key = None
+        self.update_viewport()
+        self._start_count()
+
+    def clear(self):
+        """Forget the query and remove the highlights."""
+        self.pattern = None
+        self._timer.stop()
+        self._rescan_timer.stop()
+        self._scan = None
+        self._reset_index()
+        self._viewport_key = None
+        self.editor.set_search_selections([])
+
+    def is_complete(self):
+        """Whether the match index is complete for the current text."""
+        return self._complete and self._revision == self.document.revision()
+
+    def count(self):
+        """Matches counted so far."""
+        return len(self._starts)
+
+    def match_number(self, position):
+        """1-based number of the match starting at ``position``, or 0 if unknown."""
+        if not self.is_complete():
+            return 0
+        index = bisect.bisect_left(self._starts, position)
+        return index + 1 if index < len(self._starts) and self._starts[index] == position else 0
+
+    def find_next(self, backward=False, position=None):
+        """
+        Select the next (or previous) match after the cursor, wrapping
+        around; ``position`` overrides where the search starts. Returns
+        whether a match was found.
+        """
+        if self.pattern is None:
+            return False
+        cursor = self.editor.textCursor()
+        end = self.document.characterCount() - 1
+        if backward:
+            position = cursor.selectionStart() if position is None else position
+            match = self._find_backward(position, end)
+        else:
+            position = cursor.selectionEnd() if position is None else position
+            match = self._find_forward(position, end)
+        if match is None:
+            return False
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(match[0])
+        cursor.setPosition(match[1], QTextCursor.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        return True
+
+    def replace_current(self, replacement):
+        """
+        Replace the selection if it is a match (expanding group references
+        in regex mode), then select the next match. Returns whether a next
+        match was found.
+        """
+        cursor = self.editor.textCursor()
+        start, end = cursor.selectionStart(), cursor.selectionEnd()
+        if self.pattern is not None and end > start:
+            for match_start, match_end, match in self._matches(start, start + 1):
+                if (match_start, match_end) == (start, end):
+                    cursor.insertText(self.expand(match, replacement))
+                    self.editor.setTextCursor(cursor)
+        return self.find_next()
+
+    def replace_all(self, replacement):
+        """
+        Replace every match as ONE undo step; returns the number replaced.
+
+        Replacements are computed chunk by chunk in a single pass (like
+        re.subn over the text, zero-width matches such as ^ or $ included,
+        also at the very end of the text). Matches less than MERGE_GAP_CHARS apart are
+        merged into one edit that rewrites the span between them, so the
+        document sees a handful of large edits instead of one per match,
+        all inside a single edit block (one relayout, one contentsChange).
+        """
+        if self.pattern is None:
+            return 0
+        finditer = self.pattern.finditer
+        regex = self.regex
+        edits, count = [], 0
+        end = self.document.characterCount() - 1
+        position, last = 0, False
+        try:
+            while not last:
+                base, limit, text, mapping = self._read_chunk(position, end)
+                last = limit >= end  # only the last chunk owns a (zero-width) match at ``end``
+                local_limit = mapping.from_utf16(limit - base)
+                pieces, group_start, group_end = None, 0, 0  # current edit, in chunk indices
+                for match in finditer(text, mapping.from_utf16(position - base)):
+                    start, stop = match.span()
+                    if start > local_limit or (start == local_limit and not last):
+                        break
+                    if pieces is not None and start - group_end < MERGE_GAP_CHARS:
+                        pieces.append(text[group_end:start])
+                    else:
+                        if pieces is not None:
+                            edits.append((base + mapping.to_utf16(group_start),
+                                          base + mapping.to_utf16(group_end), "".join(pieces)))
+                        pieces, group_start = [], start
+                    pieces.append(match.expand(replacement) if regex else replacement)
+                    group_end = stop
+                    count += 1
+                position = limit
+                if pieces is not None:
+                    edits.append((base + mapping.to_utf16(group_start),
+                                  base + mapping.to_utf16(group_end), "".join(pieces)))
+                    position = max(position, edits[-1][1])
+        except (re.error, IndexError) as e:
+            raise SearchError(f"Invalid replacement: {e}") from None
+        if not edits:
+            return 0
+
+        cursor = QTextCursor(self.document)
+        cursor.beginEditBlock()
+        for start, stop, new_text in reversed(edits):  # back to front: positions stay valid
+            cursor.setPosition(start)
+            cursor.setPosition(stop, QTextCursor.KeepAnchor)
+            cursor.insertText(new_text)
+        cursor.endEditBlock()
+        return count
+
+    def expand(self, match, replacement):
+        """The text replacing ``match``: group references are expanded in regex mode only."""
+        if not self.regex:
+            return replacement
+        try:
+            return match.expand(replacement)
+        except (re.error, IndexError) as e:
+            raise SearchError(f"Invalid replacement: {e}") from None
+
+    def iter_matches(self, start=0, end=None):
+        """Yield ``(start, end)`` UTF-16 positions of the matches starting in [start, end)."""
+        for match_start, match_end, _ in self._matches(start, end):
+            yield match_start, match_end
+
+    def _matches(self, start=0, end=None, progress=False):
+        """
+        Like iter_matches(), with the re.Match object as a third item; with
+        ``progress`` None is yielded after every chunk as well.
+        """
+        if self.pattern is None:
+            return
+        text_end = self.document.characterCount() - 1
+        end = text_end if end is None else min(end, text_end)
+        finditer = self.pattern.finditer
+        position = start  # matching resumes here; matches never overlap
+        while position < end:
+            base, limit, text, mapping = self._read_chunk(position, end)
+            to_utf16 = mapping.to_utf16
+            for match in finditer(text, mapping.from_utf16(position - base)):
+                match_start, match_end = match.span()
+                if match_end == match_start:
+                    continue
+                match_start = base + to_utf16(match_start)
+                if match_start >= limit:
+                    break
+                position = base + to_utf16(match_end)
+                yield match_start, position, match
+            position = max(position, limit)
+            if progress:
+                yield None
+
+    def _read_chunk(self, position, end):
+        """
+        Text of the chunk holding ``position``: returns ``(base, limit,
+        text, mapping)``, where matches starting in [base, limit) belong to
+        this chunk and ``text`` starts at ``base``.
+        """
+        document = self.document
+        text_end = document.characterCount() - 1
+        base = document.findBlock(position).position()
+        # Chunks end on a block boundary (or at ``end``) ...
+        if base + CHUNK_CHARS >= end:
+            limit = end
+        else:
+            block = document.findBlock(base + CHUNK_CHARS)
+            limit = block.position() if block.position() > base else block.position() + block.length()
+            limit = min(limit, end)
+        # ... but the text always runs to the end of its last line, so
+        # \b and $ see the same context as in the full text.
+        block = document.findBlock(max(base, limit - 1))
+        fetch_end = min(block.position() + block.length(), text_end)
+        if self.regex:
+            fetch_end = max(fetch_end, min(limit + OVERLAP_CHARS, text_end))
+
+        cursor = QTextCursor(document)
+        cursor.setPosition(base)
+        cursor.setPosition(fetch_end, QTextCursor.KeepAnchor)
+        text = cursor.selectedText().replace("\u2029", "\n")
+        return base, limit, text, _Utf16Map(text)
+
+    # ---------------- Find Next ----------------
+    def _find_forward(self, position, end):
+        if self.is_complete():
+            if not self._starts:
+                return None
+            index = bisect.bisect_left(self._starts, position)
+            index = index if index < len(self._starts) else 0
+            return self._starts[index], self._ends[index]
+        for match in self.iter_matches(position, end):
+            return match
+        for match in self.iter_matches(0, min(position, end)):
+            return match
+        return None
+
+    def _find_backward(self, position, end):
+        if self.is_complete():
+            if not self._starts:
+                return None
+            index = bisect.bisect_left(self._starts, position) - 1
+            return self._starts[index], self._ends[index]
+        match = self._last_match(0, position)
+        return match if match is not None else self._last_match(position, end)
+
+    def _last_match(self, start, end):
+        """Last match starting in [start, end), scanning back one chunk at a time."""
+        document = self.document
+        window_end = end
+        while window_end > start:
+            block = document.findBlock(max(start, window_end - 1))
+            size = 0
+            while block.previous().isValid() and block.position() > start and size < CHUNK_CHARS:
+                block = block.previous()
+                size += block.length()
+            window_start = max(start, block.position())
+            last = None
+            for last in self.iter_matches(window_start, window_end):
+                pass
+            if last is not None:
+                return last
+            window_end = window_start
+        return None
+
+    # ---------------- Viewport ----------------
+    def update_viewport(self):
+        """Highlight the matches in the visible blocks."""
+        editor = self.editor
+        if self.pattern is None:
+            return
+        block = editor.firstVisibleBlock()
+        if not block.isValid():
+            return
+        first = last = block
+        offset = editor.contentOffset()
+        top = editor.blockBoundingGeometry(block).translated(offset).top()
+        height = editor.viewport().height()
+        while block.isValid() and top <= height:
+            top += editor.blockBoundingRect(block).height()
+            last = block
+            block = block.next()
+        start = first.position()
+        end = last.position() + last.length() - 1
+
+        key = (self.pattern, self.document.revision(), start, end)
+        if key == self._viewport_key:
+            return  # setExtraSelections() repaints, which would land here again
+        self._viewport_key = key
+
+        if self.is_complete():
+            low = bisect.bisect_left(self._starts, start)
+            high = min(bisect.bisect_left(self._starts, end), low + MAX_VISIBLE_MATCHES)
+            matches = zip(self._starts[low:high], self._ends[low:high])
+        else:
+            matches = []
+            for match in self.iter_matches(start, end):
+                matches.append(match)
+                if len(matches) >= MAX_VISIBLE_MATCHES:
+                    break
+
+        selections = []
+        for match_start, match_end in matches:
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(MATCH_BACKGROUND)
+            selection.cursor = QTextCursor(self.document)
+            selection.cursor.setPosition(match_start)
+            selection.cursor.setPosition(match_end, QTextCursor.KeepAnchor)
+            selections.append(selection)
+        editor.set_search_selections(selections)
+
+    def _on_update_request(self, rect, dy):
+        self.update_viewport()
+
+    # ---------------- Background count ----------------
+    def _reset_index(self):
+        self._revision = self.document.revision()
+        self._starts = array("q")
+        self._ends = array("q")
+        self._complete = False
+
+    def _start_count(self):
+        """(Re)build the match index from the top of the document."""
+        self._rescan_timer.stop()
+        self._reset_index()
+        if self.pattern is None:
+            self._scan = None
+            return
+        self._scan = self._matches(progress=True)
+        self.count_changed.emit(0, False)
+        self._timer.start()
+
+    def _count_tick(self):
+        """One idle tick: extend the match index within the frame budget."""
+        if self._scan is None or self._revision != self.document.revision():
+            return
+        deadline = time.perf_counter() + self.budget
+        starts, ends = self._starts, self._ends
+        for match in self._scan:
+            if match is not None:
+                starts.append(match[0])
+                ends.append(match[1])
+                if len(starts) % 256:
+                    continue
+            if time.perf_counter() > deadline:
+                self.count_changed.emit(len(starts), False)
+                self._timer.start()
+                return
+        self._scan = None
+        self._complete = True
+        self.count_changed.emit(len(starts), True)
+
+    def _on_contents_change(self, position, removed, added):
+        if self.pattern is None or self._revision == self.document.revision():
+            return  # no query, or only formats changed
+        # The index is stale; recount once typing pauses.
+        self._timer.stop()
+        self._scan = None
+        self._complete = False
+        self._rescan_timer.start()
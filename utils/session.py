@@ -0,0 +1,251 @@
+"""
+utils/session.py
+----------------
+Reopen the previous session's tabs without loading them all.
+
+The session (each file tab's path, encryption flag, selection, scroll
+position and zoom, plus the current tab) is kept in the state store under
+the "session" namespace. On startup every tab is restored as a PendingTab
+placeholder, so startup costs the same whether the session had 2 tabs or
+200. A tab's file is read when the tab is first activated, on a
+QThreadPool worker; the current tab starts loading right away. Encrypted
+files ask for their password when activated, because passwords are never
+stored.
+
+Untitled tabs are not part of the session.
+"""
+
+from PyQt5.QtWidgets import QLabel, QInputDialog, QLineEdit
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from utils.editor import EnhancedTextEditor
+from utils.encryption import decrypt_with_key
+from utils.file_search import KEY_CACHE
+from utils.state_store import state_store
+from utils.tab_hibernation import ViewState, replace_tab_widget
+from utils.text_format import TextFormat, read_text, detect_eol, SAMPLE_SIZE
+
+NAMESPACE = "session"
+RESTORE_BATCH = 10  # tabs added per event loop turn after the first
+
+
+class PendingTab(QLabel):
+    """Stands in for a restored tab until its file is loaded; a click retries."""
+
+    clicked = pyqtSignal()
+
+    def __init__(self, text="Loading…"):
+        super().__init__(text)
+        self.setAlignment(Qt.AlignCenter)
+        self.setWordWrap(True)
+
+    def mousePressEvent(self, event):
+        self.clicked.emit()
+        super().mousePressEvent(event)
+
+
+class _LoadSignals(QObject):
+    loaded = pyqtSignal(int, str, object)  # document id, text, TextFormat
+    failed = pyqtSignal(int, str)
+
+
+class _LoadTask(QRunnable):
+    """Read (and decrypt) one session file off the GUI thread."""
+
+    def __init__(self, doc_id, path, password, signals):
+        super().__init__()
+        self.doc_id = doc_id
+        self.path = path
+        self.password = password
+        self.signals = signals
+
+    def run(self):
+        try:
+            if self.password is None:
+                text, text_format = read_text(self.path)
+            else:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                salt, token = data[:16], data[16:]
+                try:
+                    text = decrypt_with_key(token, KEY_CACHE.key(self.password, salt))
+                except Exception:
+                    raise ValueError("Incorrect password or corrupted file")
+                text_format = TextFormat("utf-8", detect_eol(text[:SAMPLE_SIZE]))
+            self.signals.loaded.emit(self.doc_id, text, text_format)
+        except Exception as e:
+            self.signals.failed.emit(self.doc_id, str(e) or type(e).__name__)
+
+
+class _Pending:
+    """A restored tab that has not been loaded yet."""
+
+    __slots__ = ("view", "password", "loading")
+
+    def __init__(self, view):
+        self.view = view
+        self.password = None
+        self.loading = False
+
+
+class SessionManager(QObject):
+    """Saves the window's file tabs and restores them as lazily loaded placeholders."""
+
+    def __init__(self, window, create_editor, store=None):
+        super().__init__(window)
+        self.window = window
+        self.tabs = window.tabs
+        self.documents = window.documents
+        self.create_editor = create_editor  # (path, text, text_format) -> EnhancedTextEditor
+        self.store = store or state_store()
+        self._pending = {}  # document id -> _Pending
+        self._restoring = False
+        self._anchor = self._last = None  # first restored document, last one added after it
+        self._before, self._after = [], []  # saved tabs still to be added
+        self._before_added = 0
+
+        self.signals = _LoadSignals(self)
+        self.signals.loaded.connect(self._on_loaded)
+        self.signals.failed.connect(self._on_failed)
+        self.tabs.currentChanged.connect(self._on_current_changed)
+
+    def is_pending(self, document):
+        return document.id in self._pending
+
+    def forget(self, document):
+        self._pending.pop(document.id, None)
+
+    # ---------------- Save ----------------
+    def _view_state(self, document):
+        if isinstance(document.editor, EnhancedTextEditor):
+            return ViewState.of(document.editor)
+        pending = self._pending.get(document.id)
+        if pending is not None:
+            return pending.view
+        return self.window.hibernator.view_state(document) or ViewState()
+
+    def save(self):
+        self.finish_restore()
+        tabs, current = [], None
+        for index in range(self.tabs.count()):
+            document = self.documents.for_editor(self.tabs.widget(index))
+            if document is None or not document.path:
+                continue
+            if index == self.tabs.currentIndex():
+                current = len(tabs)
+            tabs.append({"path": document.path, "encrypted": document.encrypted,
+                         "view": self._view_state(document).to_dict()})
+        self.store.set(NAMESPACE, "tabs", tabs)
+        self.store.set(NAMESPACE, "current", current)
+
+    # ---------------- Restore ----------------
+    def restore(self):
+        """
+        Restore the saved tabs; returns how many there are. Only the current
+        tab is added right away: every insert into a tab bar with close
+        buttons relayouts all its tabs, so the others are added in batches
+        once the event loop runs.
+        """
+        entries = [entry for entry in self.store.get(NAMESPACE, "tabs") or []
+                   if isinstance(entry, dict) and entry.get("path")]
+        if not entries:
+            return 0
+        current = self.store.get(NAMESPACE, "current")
+        if not isinstance(current, int) or not 0 <= current < len(entries):
+            current = 0
+        self._anchor = self._add_pending(entries[current], self.tabs.count())
+        self._before, self._after = entries[:current], entries[current + 1:]
+        self._before_added, self._last = 0, self._anchor
+        if self._anchor is not None:
+            self._restoring = True
+            self.tabs.setCurrentWidget(self._anchor.editor)
+            self.tabs.currentChanged.emit(self.tabs.currentIndex())
+            self._restoring = False
+            # Load it once the event loop runs (a password prompt needs the window up).
+            QTimer.singleShot(0, lambda: self._on_current_changed(self.tabs.currentIndex()))
+        QTimer.singleShot(0, self._restore_batch)
+        return len(entries)
+
+    def _add_pending(self, entry, index):
+        path = entry["path"]
+        if self.documents.for_path(path) is not None:
+            return None
+        placeholder = PendingTab()
+        document = self.documents.add(placeholder, path, bool(entry.get("encrypted")))
+        self._pending[document.id] = _Pending(ViewState.from_dict(entry.get("view") or {}))
+        placeholder.clicked.connect(lambda document=document: self.load(document))
+        self.tabs.blockSignals(True)
+        try:
+            index = self.tabs.insertTab(index, placeholder, document.name)
+            self.tabs.setTabToolTip(index, path)
+        finally:
+            self.tabs.blockSignals(False)
+        return document
+
+    def _restore_batch(self, size=RESTORE_BATCH):
+        """Add up to ``size`` more of the saved tabs, in their saved order around the first one."""
+        for _ in range(size):
+            if self._before:
+                self._add_pending(self._before.pop(0), self._before_added)
+                self._before_added += 1
+            elif self._after:
+                previous = self.tabs.indexOf(self._last.editor) if self._last is not None else -1
+                document = self._add_pending(self._after.pop(0), previous + 1 if previous >= 0 else self.tabs.count())
+                self._last = document or self._last
+            else:
+                return
+        QTimer.singleShot(0, self._restore_batch)
+
+    def finish_restore(self):
+        """Add the saved tabs not restored yet (before the session is saved again)."""
+        self._restore_batch(len(self._before) + len(self._after))
+
+    def _on_current_changed(self, index):
+        if self._restoring:
+            return
+        document = self.documents.for_editor(self.tabs.widget(index))
+        if document is not None and self.is_pending(document):
+            self.load(document)
+
+    def load(self, document):
+        """Start loading a pending tab in the background (asking for its password first)."""
+        pending = self._pending.get(document.id)
+        if pending is None or pending.loading:
+            return
+        if document.encrypted and pending.password is None:
+            password, ok = QInputDialog.getText(
+                self.window, "Decrypt File", f"Enter password for '{document.name}':", QLineEdit.Password)
+            if not ok or not password:
+                document.editor.setText("Encrypted file — click to enter the password")
+                return
+            pending.password = password
+        pending.loading = True
+        document.editor.setText("Loading…")
+        QThreadPool.globalInstance().start(_LoadTask(document.id, document.path, pending.password, self.signals))
+
+    def _on_loaded(self, doc_id, text, text_format):
+        document = self.documents.get(doc_id)
+        pending = self._pending.pop(doc_id, None)
+        if document is None or pending is None:
+            return  # closed meanwhile
+        editor = self.create_editor(document.path, text, text_format)
+        document.format, document.password = text_format, pending.password
+        self.documents.mark_saved(document, text)
+        placeholder = document.editor
+        replace_tab_widget(self.tabs, placeholder, editor)
+        self.documents.set_editor(document, editor)
+        placeholder.deleteLater()
+        pending.view.apply(editor)
+        if self.tabs.currentWidget() is editor:
+            # Tab signals were blocked during the swap; let the window follow the new editor.
+            self.tabs.currentChanged.emit(self.tabs.currentIndex())
+            editor.setFocus()
+
+    def _on_failed(self, doc_id, error):
+        document = self.documents.get(doc_id)
+        pending = self._pending.get(doc_id)
+        if document is None or pending is None:
+            return
+        pending.loading = False
+        pending.password = None
+        document.editor.setText(f"Could not open {document.path}:\n{error}\n\nClick to try again.")
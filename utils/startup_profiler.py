@@ -0,0 +1,193 @@
+"""
+utils/startup_profiler.py
+-------------------------
+Wall-clock timeline of application startup.
+
+Enabled by ``main.py --profile-startup[=TRACE.json]`` or by setting
+SECURE_NOTEPAD_PROFILE_STARTUP (to 1, or to the trace path). Startup code
+wraps its phases in ``span(name)``; spans nest, so the main window's
+construction stages show up inside it. When the window has painted for the
+first time a report of the spans, slowest self time first, is printed and
+a Chrome trace (open it in chrome://tracing or https://ui.perfetto.dev) is
+written, by default to ``~/.secure_notepad/startup_trace.json``.
+
+While profiling is off ``span()`` returns a shared no-op context manager,
+so the instrumented code costs next to nothing. This module imports no Qt
+at load time, so it can time the PyQt5 import itself. For a per-module
+breakdown of an import span use ``python -X importtime main.py``.
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+
+ENV_VAR = "SECURE_NOTEPAD_PROFILE_STARTUP"
+FLAG = "--profile-startup"
+DEFAULT_TRACE = Path.home() / ".secure_notepad" / "startup_trace.json"
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """One timed phase; times are perf_counter() seconds."""
+
+    __slots__ = ("name", "category", "start", "end", "parent", "child_time")
+
+    def __init__(self, name, category, start, parent):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = None
+        self.parent = parent
+        self.child_time = 0.0
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def path(self):
+        names, span = [], self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return " / ".join(reversed(names))
+
+
+class StartupProfiler:
+    """Collects nested spans and reports them once startup is over."""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = Path(trace_path) if trace_path else DEFAULT_TRACE
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._stack = []
+        self.finished = False
+
+    @contextmanager
+    def span(self, name, category="startup"):
+        parent = self._stack[-1] if self._stack else None
+        record = _Span(name, category, time.perf_counter(), parent)
+        self.spans.append(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            record.end = time.perf_counter()
+            self._stack.pop()
+            if parent is not None:
+                parent.child_time += record.duration
+
+    def add(self, name, start, end, category="startup"):
+        """Record a span measured elsewhere (e.g. across event loop turns)."""
+        record = _Span(name, category, start, None)
+        record.end = end
+        self.spans.append(record)
+
+    # ---------------- Output ----------------
+    def report(self):
+        done = [span for span in self.spans if span.end is not None]
+        total = max((span.end for span in done), default=self.origin) - self.origin
+        lines = [f"Startup profile: {total * 1000:.1f} ms to first paint",
+                 f"{'self ms':>9} {'total ms':>9} {'self %':>7}  phase"]
+        for span in sorted(done, key=lambda span: span.duration - span.child_time, reverse=True):
+            own = span.duration - span.child_time
+            lines.append(f"{own * 1000:9.2f} {span.duration * 1000:9.2f} "
+                         f"{100 * own / total if total else 0:6.1f}%  {span.path}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """The spans as Chrome trace-event JSON ("X" complete events, microseconds)."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                   "args": {"name": "Secure Notepad Pro startup"}}]
+        for span in self.spans:
+            if span.end is None:
+                continue
+            events.append({"name": span.name, "cat": span.category, "ph": "X", "pid": pid, "tid": 0,
+                           "ts": round((span.start - self.origin) * 1e6, 1),
+                           "dur": round(span.duration * 1e6, 1)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self):
+        try:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+            return True
+        except OSError as e:
+            print(f"Error writing startup trace: {e}")
+            return False
+
+    def finish(self):
+        """Print the report and write the trace (once)."""
+        if self.finished:
+            return
+        self.finished = True
+        print(self.report(), flush=True)
+        if self.write_trace():
+            print(f"Chrome trace written to {self.trace_path}", flush=True)
+
+    # ---------------- First Paint ----------------
+    def finish_after_first_paint(self, window, shown_at):
+        """Record "first paint" from ``shown_at`` (after show()) to the end of the window's first paint, then finish."""
+        from PyQt5.QtCore import QObject, QEvent, QTimer
+
+        profiler = self
+
+        class _FirstPaint(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint:
+                    watched.removeEventFilter(self)
+                    # Runs once this paint (and its children's) has been delivered.
+                    QTimer.singleShot(0, self.done)
+                return False
+
+            def done(self):
+                profiler.add("first paint", shown_at, time.perf_counter(), "paint")
+                profiler.finish()
+                self.deleteLater()
+
+        window.installEventFilter(_FirstPaint(window))
+
+
+_PROFILER = None
+
+
+def enable(trace_path=None):
+    global _PROFILER
+    if _PROFILER is None:
+        _PROFILER = StartupProfiler(trace_path)
+    return _PROFILER
+
+
+def profiler():
+    """The active StartupProfiler, or None while profiling is off."""
+    return _PROFILER
+
+
+def span(name, category="startup"):
+    return _PROFILER.span(name, category) if _PROFILER is not None else _NULL_SPAN
+
+
+def enable_from_argv(argv=None):
+    """
+    Enable profiling if ``--profile-startup[=PATH]`` is in ``argv`` (the flag
+    is removed, so Qt never sees it) or the environment variable is set.
+    """
+    argv = sys.argv if argv is None else argv
+    trace_path, requested = None, False
+    for arg in list(argv[1:]):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            argv.remove(arg)
+            requested = True
+            trace_path = arg.partition("=")[2] or trace_path
+    value = os.environ.get(ENV_VAR, "")
+    if value and value.lower() not in ("0", "false", "no"):
+        requested = True
+        if value.lower() not in ("1", "true", "yes"):
+            trace_path = trace_path or value
+    return enable(trace_path) if requested else None
@@ -0,0 +1,223 @@
+"""
+utils/state_store.py
+--------------------
+One SQLite database (``~/.secure_notepad/state.db``, WAL mode) for the
+application's small state: recent files, settings, shortcuts, the backup
+index and the session.
+
+Everything is a JSON value under a (namespace, key) pair. The whole table
+is read once when the store is opened and served from memory afterwards,
+so startup reads a single file and lookups never touch the disk. Writes
+update memory at once and are queued for a writer thread, which coalesces
+them (the last value of a key wins) and commits each batch in one
+transaction; flush() waits for everything queued so far.
+
+The schema is versioned with ``PRAGMA user_version`` and upgraded by
+MIGRATIONS. On first run the JSON files earlier versions wrote are imported
+and renamed to ``*.json.migrated``.
+"""
+
+import json
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+
+STATE_DIR = Path.home() / ".secure_notepad"
+STATE_FILE = STATE_DIR / "state.db"
+FLUSH_DELAY = 0.5  # seconds the writer waits for more writes before committing
+
+# Schema upgrades: MIGRATIONS[n] brings the database from version n to n + 1.
+MIGRATIONS = [
+    [
+        "CREATE TABLE state (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+        "PRIMARY KEY (namespace, key))",
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_DELETED = object()
+
+
+def _legacy_settings(name, setting):
+    """Import helper for the one-value JSON settings files."""
+    def convert(data):
+        return {setting: data.get(name)} if isinstance(data, dict) and data.get(name) else {}
+    return convert
+
+
+def _legacy_recent_files(data):
+    # Newest first in the file; stored as path -> rank so the order survives.
+    return {path: -rank for rank, path in enumerate(data)} if isinstance(data, list) else {}
+
+
+# Legacy JSON file -> (namespace, function turning its content into key/values)
+LEGACY_FILES = {
+    "recent_files.json": ("recent_files", _legacy_recent_files),
+    "shortcuts.json": ("shortcuts", lambda data: data if isinstance(data, dict) else {}),
+    "find_in_files.json": ("settings", _legacy_settings("indexed_folder", "find_in_files.indexed_folder")),
+    "quick_open.json": ("settings", _legacy_settings("workspace", "quick_open.workspace")),
+}
+
+
+class StateStore:
+    """In-memory view of the state database with batched background writes."""
+
+    def __init__(self, path=STATE_FILE, legacy_dir=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._data = {}  # namespace -> {key: value}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending = {}  # (namespace, key) -> JSON text or _DELETED
+        self._queued = 0  # writes queued so far
+        self._written = 0  # writes committed so far
+        self._flush_requested = False
+        self._closed = False
+
+        connection = self._connect()
+        try:
+            self._migrate(connection)
+            for namespace, key, value in connection.execute("SELECT namespace, key, value FROM state ORDER BY rowid"):
+                self._data.setdefault(namespace, {})[key] = json.loads(value)
+        finally:
+            connection.close()
+        if not self.get("meta", "legacy_imported"):
+            self._import_legacy(Path(legacy_dir) if legacy_dir else self.path.parent)
+
+        self._writer = threading.Thread(target=self._run, name="StateStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _migrate(self, connection):
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"state database version {version} is newer than this application")
+        for target in range(version, SCHEMA_VERSION):
+            with connection:
+                for statement in MIGRATIONS[target]:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {target + 1}")
+
+    def _import_legacy(self, directory):
+        for name, (namespace, convert) in LEGACY_FILES.items():
+            path = directory / name
+            if not path.exists():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    values = convert(json.load(f))
+                for key, value in values.items():
+                    self.set(namespace, key, value)
+                path.replace(path.with_name(name + ".migrated"))
+            except Exception as e:
+                print(f"Error importing {path}: {e}")
+        self.set("meta", "legacy_imported", True)
+
+    # ---------------- Reading ----------------
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            return self._data.get(namespace, {}).get(key, default)
+
+    def items(self, namespace):
+        """A copy of every key/value of ``namespace``, in insertion order."""
+        with self._lock:
+            return dict(self._data.get(namespace, {}))
+
+    # ---------------- Writing ----------------
+    def _queue(self, namespace, key, value):
+        self._pending[(namespace, key)] = _DELETED if value is _DELETED else json.dumps(value)
+        self._queued += 1
+        self._cond.notify_all()
+
+    def set(self, namespace, key, value):
+        """Store a JSON-serializable value; it is written to disk shortly."""
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = value
+            self._queue(namespace, key, value)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            if self._data.get(namespace, {}).pop(key, _DELETED) is not _DELETED:
+                self._queue(namespace, key, _DELETED)
+
+    def replace(self, namespace, values):
+        """Make ``namespace`` hold exactly ``values``."""
+        with self._lock:
+            current = self._data.setdefault(namespace, {})
+            for key in [key for key in current if key not in values]:
+                del current[key]
+                self._queue(namespace, key, _DELETED)
+            for key, value in values.items():
+                current[key] = value
+                self._queue(namespace, key, value)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is on disk; returns False on timeout."""
+        with self._cond:
+            target = self._queued
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target or not self._writer.is_alive(), timeout)
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+
+    def _run(self):
+        connection = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._closed)
+                    if not (self._flush_requested or self._closed):
+                        # Let more writes arrive so they share one transaction.
+                        self._cond.wait_for(lambda: self._flush_requested or self._closed, FLUSH_DELAY)
+                    batch, self._pending = self._pending, {}
+                    target = self._queued
+                    self._flush_requested = False
+                    closed = self._closed
+                if batch:
+                    self._write(connection, batch)
+                with self._cond:
+                    self._written = target
+                    self._cond.notify_all()
+                    if closed and not self._pending:
+                        return
+        finally:
+            connection.close()
+
+    def _write(self, connection, batch):
+        try:
+            with connection:
+                connection.executemany(
+                    "DELETE FROM state WHERE namespace = ? AND key = ?",
+                    [key for key, value in batch.items() if value is _DELETED])
+                connection.executemany(
+                    "INSERT INTO state (namespace, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+                    [(*key, value) for key, value in batch.items() if value is not _DELETED])
+        except Exception as e:
+            print(f"Error writing state: {e}")
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def state_store():
+    """The application's shared StateStore, opened on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = StateStore()
+            atexit.register(_STORE.close)  # write what is still queued
+        return _STORE
@@ -1,23 +1,43 @@
 """
-modules/status_manager.py
+utils/status_manager.py
 Manages the status bar updates for the text editor application.
+
+Updates are coalesced: signals only set dirty flags and arm a single-shot
+frame timer, and the labels whose fields are dirty are refreshed at most
+once per frame no matter how many cursor/text signals a keystroke or paste
+produces.
 """
 
-from PyQt5.QtWidgets import QLabel
+from PyQt5.QtWidgets import QLabel, QMainWindow
+from PyQt5.QtCore import QObject, QTimer
+
+from utils.text_format import DEFAULT_EOL
+
+
+class StatusManager(QObject):
+    """Single status model for the main window, refreshed once per frame."""
 
-class StatusManager:
-    """Manages status bar updates per tab."""
+    CURSOR = 0x01
+    LENGTH = 0x02
+    ZOOM = 0x04
+    CRYPTO = 0x08
+    ENCODING = 0x10
+    EOL = 0x20
+    ALL = 0x3F
+
+    FRAME_INTERVAL_MS = 16
 
     def __init__(self, parent, tab_manager):
+        super().__init__(parent)
         self.parent = parent
         self.tab_manager = tab_manager
-        self.statusBar = parent.statusBar() or parent.setStatusBar(parent.statusBar())
+        self.statusBar = QMainWindow.statusBar(parent)
 
         self.line_col_label = QLabel("Ln 1, Col 1")
         self.char_count_label = QLabel("Length: 0")
         self.encoding_label = QLabel("UTF-8")
         self.crypto_status_label = QLabel("Plaintext")
-        self.crlf_label = QLabel("CRLF")
+        self.crlf_label = QLabel(DEFAULT_EOL)
         self.zoom_label = QLabel("Zoom: 100%")
 
         for widget in [
@@ -33,25 +53,85 @@ class StatusManager:
             else:
                 self.statusBar.addPermanentWidget(widget)
 
+        self._dirty = 0
+        self._editor = None
+        self._texts = {}  # label -> last text set, to skip redundant setText calls
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+
+    # ---------------- Editor Binding ----------------
+    def bind_editor(self, editor):
+        """Follow signals of ``editor`` only (call on tab change)."""
+        if editor is self._editor:
+            return
+        if self._editor is not None:
+            try:
+                self._editor.cursorPositionChanged.disconnect(self._on_cursor_changed)
+                self._editor.stats.changed.disconnect(self._on_text_changed)
+            except (TypeError, RuntimeError):
+                pass
+        self._editor = editor
+        if editor is not None:
+            editor.cursorPositionChanged.connect(self._on_cursor_changed)
+            editor.stats.changed.connect(self._on_text_changed)
+        self.mark_dirty(self.ALL)
+
+    def _on_cursor_changed(self):
+        self.mark_dirty(self.CURSOR)
+
+    def _on_text_changed(self):
+        self.mark_dirty(self.LENGTH | self.EOL)
+
+    # ---------------- Coalescing ----------------
+    def mark_dirty(self, fields=ALL):
+        """Flag fields for refresh and schedule one update for this frame."""
+        self._dirty |= fields
+        if not self._timer.isActive():
+            self._timer.start()
+
     def update_status_bar(self):
+        """Request a full refresh (coalesced with any pending update)."""
+        self.mark_dirty(self.ALL)
+
+    def _set_text(self, label, text):
+        if self._texts.get(label) != text:
+            self._texts[label] = text
+            label.setText(text)
+
+    def flush(self):
+        """Apply pending updates now."""
+        dirty, self._dirty = self._dirty, 0
         editor = self.tab_manager.current_editor()
-        if not editor:
+        if self._editor is not editor:
+            self.bind_editor(editor)
+            dirty, self._dirty = self.ALL, 0
+            self._timer.stop()
+        if not editor or not dirty:
             return
 
-        cursor = editor.textCursor()
-        line = cursor.blockNumber() + 1
-        col = cursor.columnNumber()
-        self.line_col_label.setText(f"Ln {line}, Col {col}")
+        if dirty & self.CURSOR:
+            cursor = editor.textCursor()
+            self._set_text(self.line_col_label, f"Ln {cursor.blockNumber() + 1}, Col {cursor.columnNumber()}")
+
+        if dirty & self.LENGTH:
+            stats = editor.stats
+            self._set_text(self.char_count_label, f"Length: {stats.chars}")
+            self.char_count_label.setToolTip(f"{stats.words} words, {stats.lines} lines")
 
-        char_count = len(editor.toPlainText())
-        self.char_count_label.setText(f"Length: {char_count}")
+        if dirty & self.ZOOM:
+            font_size = editor.font().pointSize()
+            zoom_percent = round((font_size / self.tab_manager.default_font_size) * 100)
+            self._set_text(self.zoom_label, f"Zoom: {zoom_percent}%")
 
-        font_size = editor.font().pointSize()
-        zoom_percent = round((font_size / self.tab_manager.default_font_size) * 100)
-        self.zoom_label.setText(f"Zoom: {zoom_percent}%")
+        if dirty & (self.CRYPTO | self.ENCODING):
+            document = self.tab_manager.current_document()
+            encrypted = document.encrypted if document else False
+            self._set_text(self.crypto_status_label, "Encrypted (AES-256)" if encrypted else "Plaintext")
+            text_format = document.format if document else None
+            self._set_text(self.encoding_label, text_format.label if text_format else "UTF-8")
 
-        tab_data = self.tab_manager.current_tab_data()
-        encrypted = tab_data.get("encrypted", False)
-        self.crypto_status_label.setText(
-            "Encrypted (AES-256)" if encrypted else "Plaintext"
-        )
+        if dirty & self.EOL:
+            self._set_text(self.crlf_label, editor.stats.line_ending)
@@ -0,0 +1,144 @@
+"""
+utils/syntax_engine.py
+----------------------
+Single-pass tokenizer for syntax highlighting.
+
+A Grammar is a small state machine. Every state lists its rules as
+(pattern, style, next_state) and is compiled into ONE alternation regex of
+named groups, so a line is scanned left to right exactly once and the rule
+that matched is read from ``match.lastgroup``. Constructs that span lines
+(triple-quoted strings, HTML comments, ...) are states of their own; the
+state a line ends in is what QSyntaxHighlighter stores with
+``setCurrentBlockState`` and feeds into the next line.
+
+This module does not import Qt: tokenizing is a pure function of
+(text, state), which keeps it usable from worker threads and processes.
+"""
+
+import re
+
+ROOT = "root"
+
+
+class GrammarError(ValueError):
+    """Raised for an invalid grammar definition."""
+
+
+class _State:
+    __slots__ = ("name", "style", "regex", "actions")
+
+    def __init__(self, name, style, regex, actions):
+        self.name = name
+        self.style = style      # style id for text no rule matched, or None
+        self.regex = regex      # combined alternation of all rules
+        self.actions = actions  # group name -> (style id or None, next state id or None)
+
+
+class Grammar:
+    """
+    A language definition.
+
+    ``styles`` maps style names to format specs (``{"color": "#rrggbb",
+    "bold": True, "italic": True}``). ``states`` maps state names to
+    ``{"style": name or None, "rules": [(pattern, style or None, next or None)]}``;
+    there must be a ``"root"`` state. Rule patterns are tried in order at
+    each position and must not match the empty string. The regexes are only
+    compiled on first use.
+    """
+
+    def __init__(self, name, styles, states, flags=0):
+        if ROOT not in states:
+            raise GrammarError(f"Grammar {name!r} has no {ROOT!r} state")
+        self.name = name
+        self.style_names = list(styles)
+        self.style_specs = [styles[n] for n in self.style_names]
+        self.state_names = [ROOT] + [n for n in states if n != ROOT]
+        self.definition = states
+        self.flags = flags
+        self._states = None
+
+    # ---------------- Compilation ----------------
+    def _style_id(self, name):
+        if name is None:
+            return None
+        try:
+            return self.style_names.index(name)
+        except ValueError:
+            raise GrammarError(f"Grammar {self.name!r}: unknown style {name!r}") from None
+
+    def _state_id(self, name):
+        if name is None:
+            return None
+        try:
+            return self.state_names.index(name)
+        except ValueError:
+            raise GrammarError(f"Grammar {self.name!r}: unknown state {name!r}") from None
+
+    def compile(self):
+        """Build the per-state combined regexes (idempotent)."""
+        if self._states is not None:
+            return self._states
+        states = []
+        for state_name in self.state_names:
+            spec = self.definition[state_name]
+            parts, actions = [], {}
+            for index, (pattern, style, next_state) in enumerate(spec.get("rules", ())):
+                group = f"r{index}"
+                parts.append(f"(?P<{group}>{pattern})")
+                actions[group] = (self._style_id(style), self._state_id(next_state))
+            regex = re.compile("|".join(parts), self.flags) if parts else None
+            states.append(_State(state_name, self._style_id(spec.get("style")), regex, actions))
+        self._states = states
+        return states
+
+    # ---------------- Tokenizing ----------------
+    def tokenize(self, text, state=0):
+        """
+        Tokenize one line.
+
+        Returns ``(spans, end_state)`` where ``spans`` is a list of
+        ``(start, length, style_id)`` in ascending order and ``end_state``
+        is the state id the next line starts in.
+        """
+        states = self._states or self.compile()
+        if not 0 <= state < len(states):
+            state = 0
+        spans = []
+        append = spans.append
+        pos = 0
+        end_of_text = len(text)
+
+        while pos < end_of_text:
+            current = states[state]
+            match = current.regex.search(text, pos) if current.regex is not None else None
+            if match is None:
+                if current.style is not None:
+                    append((pos, end_of_text - pos, current.style))
+                break
+            start, end = match.span()
+            if start > pos and current.style is not None:
+                append((pos, start - pos, current.style))
+            style, next_state = current.actions[match.lastgroup]
+            if style is not None and end > start:
+                if spans and spans[-1][2] == style and spans[-1][0] + spans[-1][1] == start:
+                    first = spans.pop()
+                    append((first[0], end - first[0], style))
+                else:
+                    append((start, end - start, style))
+            if next_state is not None:
+                state = next_state
+            if end == start and next_state is None:
+                end += 1  # a rule matched nothing; step over one character
+            pos = end
+
+        return spans, state
+
+    def tokenize_lines(self, lines, state=0):
+        """Tokenize consecutive lines; returns a list of (spans, end_state)."""
+        results = []
+        tokenize = self.tokenize
+        for line in lines:
+            spans, state = tokenize(line, state)
+            results.append((spans, state))
+        return results
+
@@ -0,0 +1,227 @@
+"""
+utils/tab_hibernation.py
+------------------------
+Unload tabs that have not been looked at for a while.
+
+Every open editor keeps its whole QTextDocument: the text, a layout and
+highlighting formats per block and the undo stack. TabHibernator estimates
+what each editor holds and, when the total is over the memory budget,
+hibernates the least recently activated inactive tabs: the text is
+compressed (and, for encrypted files, encrypted with a key that only lives
+for the session) into an in-memory snapshot, the editor is destroyed and a
+placeholder widget takes its place in the tab. Activating the tab builds a
+new editor from the snapshot and restores the cursor, scroll position and
+zoom.
+
+Tabs with unsaved changes are never hibernated, because the new editor
+starts with an empty undo history. Each tab's tooltip shows its estimated
+memory use, or the size of its snapshot while it is hibernated.
+"""
+
+import zlib
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt, QObject, QTimer
+
+from utils.editor import EnhancedTextEditor
+from utils.encryption import encrypt_bytes, decrypt_bytes, new_session_key
+
+MEMORY_BUDGET = 256 * 1024 * 1024  # estimated bytes all live editors may hold
+MIN_HIBERNATE_SIZE = 256 * 1024  # smaller editors are not worth a rebuild
+BYTES_PER_CHAR = 2  # QTextDocument stores UTF-16
+BYTES_PER_BLOCK = 200  # QTextBlock data, its layout and highlighting formats, roughly
+
+
+def estimate_bytes(editor):
+    """Rough memory held by an editor's document."""
+    document = editor.document()
+    return document.characterCount() * BYTES_PER_CHAR + document.blockCount() * BYTES_PER_BLOCK
+
+
+def format_size(size):
+    for unit in ("bytes", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:,.0f} {unit}" if unit == "bytes" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def replace_tab_widget(tabs, old, new):
+    """Put widget ``new`` in the tab of ``old`` without emitting tab signals."""
+    index = tabs.indexOf(old)
+    current = tabs.currentIndex()
+    text, tooltip = tabs.tabText(index), tabs.tabToolTip(index)
+    tabs.blockSignals(True)
+    try:
+        tabs.insertTab(index, new, text)
+        tabs.removeTab(index + 1)
+        tabs.setTabToolTip(index, tooltip)
+        tabs.setCurrentIndex(current)
+    finally:
+        tabs.blockSignals(False)
+
+
+class ViewState:
+    """Selection, scroll position and zoom of an editor, to put back on a new one."""
+
+    __slots__ = ("position", "anchor", "vscroll", "hscroll", "font_size")
+
+    def __init__(self, position=0, anchor=0, vscroll=0, hscroll=0, font_size=None):
+        self.position = position
+        self.anchor = anchor
+        self.vscroll = vscroll
+        self.hscroll = hscroll
+        self.font_size = font_size
+
+    @classmethod
+    def of(cls, editor):
+        cursor = editor.textCursor()
+        return cls(cursor.position(), cursor.anchor(), editor.verticalScrollBar().value(),
+                   editor.horizontalScrollBar().value(), editor.font().pointSize())
+
+    def apply(self, editor):
+        if self.font_size:
+            font = editor.font()
+            font.setPointSize(self.font_size)
+            editor.setFont(font)
+        end = editor.document().characterCount() - 1
+        cursor = editor.textCursor()
+        cursor.setPosition(min(self.anchor, end))
+        cursor.setPosition(min(self.position, end), cursor.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.verticalScrollBar().setValue(self.vscroll)
+        editor.horizontalScrollBar().setValue(self.hscroll)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if isinstance(data.get(name), int)})
+
+
+class _Snapshot:
+    """A hibernated editor: its text (compressed, maybe encrypted) and view state."""
+
+    __slots__ = ("data", "encrypted", "view")
+
+    def __init__(self, data, encrypted, view):
+        self.data = data
+        self.encrypted = encrypted
+        self.view = view
+
+
+class HibernatedTab(QLabel):
+    """What a hibernated tab shows until it is activated and restored."""
+
+    def __init__(self):
+        super().__init__("Restoring…")
+        self.setAlignment(Qt.AlignCenter)
+
+
+class TabHibernator(QObject):
+    """Keeps the editors of ``window.tabs`` within a memory budget."""
+
+    CHECK_DELAY_MS = 2000  # after a tab switch
+    CHECK_INTERVAL_MS = 60000
+
+    def __init__(self, window, create_editor, budget=MEMORY_BUDGET):
+        super().__init__(window)
+        self.window = window
+        self.tabs = window.tabs
+        self.documents = window.documents
+        self.create_editor = create_editor  # (path, text, text_format) -> EnhancedTextEditor
+        self.budget = budget
+        self._recent = OrderedDict()  # document id -> None, least recently active first
+        self._snapshots = {}  # document id -> _Snapshot
+        self._key = None
+
+        self.tabs.currentChanged.connect(self._on_current_changed)
+        self.check_timer = QTimer(self)
+        self.check_timer.setSingleShot(True)
+        self.check_timer.timeout.connect(self.check)
+        self.interval_timer = QTimer(self)
+        self.interval_timer.timeout.connect(self.check)
+        self.interval_timer.start(self.CHECK_INTERVAL_MS)
+
+    def is_hibernated(self, document):
+        return document.id in self._snapshots
+
+    def view_state(self, document):
+        """The ViewState of a hibernated document, or None."""
+        snapshot = self._snapshots.get(document.id)
+        return snapshot.view if snapshot else None
+
+    def forget(self, document):
+        """Drop what is kept about a closed document."""
+        self._snapshots.pop(document.id, None)
+        self._recent.pop(document.id, None)
+
+    def _on_current_changed(self, index):
+        document = self.documents.for_editor(self.tabs.widget(index))
+        if document is None:
+            return
+        if self.is_hibernated(document):
+            self.restore(document)
+        self._recent.pop(document.id, None)
+        self._recent[document.id] = None
+        self.check_timer.start(self.CHECK_DELAY_MS)
+
+    # ---------------- Budget ----------------
+    def check(self):
+        """Update the memory tooltips and hibernate tabs while over budget."""
+        current = self.tabs.currentWidget()
+        live, total = [], 0
+        for document in self.documents:
+            if not isinstance(document.editor, EnhancedTextEditor):
+                continue  # hibernated, or not loaded yet
+            size = estimate_bytes(document.editor)
+            total += size
+            self._set_tooltip(document, f"Memory: ~{format_size(size)}")
+            if document.editor is not current and not document.editor.document().isModified() \
+                    and size >= MIN_HIBERNATE_SIZE:
+                live.append((size, document))
+        if total <= self.budget:
+            return
+        order = {doc_id: rank for rank, doc_id in enumerate(self._recent)}
+        live.sort(key=lambda item: order.get(item[1].id, -1))
+        for size, document in live:
+            if total <= self.budget:
+                break
+            self.hibernate(document)
+            total -= size
+
+    def _set_tooltip(self, document, text):
+        index = self.tabs.indexOf(document.editor)
+        if index >= 0:
+            self.tabs.setTabToolTip(index, f"{document.path or document.name}\n{text}")
+
+    # ---------------- Hibernate / Restore ----------------
+    def hibernate(self, document):
+        editor = document.editor
+        data = zlib.compress(editor.toPlainText().encode("utf-8", "surrogatepass"), 1)
+        if document.encrypted:
+            if self._key is None:
+                self._key = new_session_key()
+            data = encrypt_bytes(data, self._key)
+        self._snapshots[document.id] = _Snapshot(data, document.encrypted, ViewState.of(editor))
+
+        placeholder = HibernatedTab()
+        replace_tab_widget(self.tabs, editor, placeholder)
+        self.documents.set_editor(document, placeholder)
+        editor.deleteLater()
+        self._set_tooltip(document, f"Hibernated ({format_size(len(data))} snapshot)")
+
+    def restore(self, document):
+        snapshot = self._snapshots.pop(document.id)
+        data = decrypt_bytes(snapshot.data, self._key) if snapshot.encrypted else snapshot.data
+        editor = self.create_editor(document.path, zlib.decompress(data).decode("utf-8", "surrogatepass"),
+                                    document.format)
+        placeholder = document.editor
+        replace_tab_widget(self.tabs, placeholder, editor)
+        self.documents.set_editor(document, editor)
+        placeholder.deleteLater()
+        snapshot.view.apply(editor)
+        self._set_tooltip(document, f"Memory: ~{format_size(estimate_bytes(editor))}")
+        # Tab signals were blocked during the swap; let the window follow the new editor.
+        self.tabs.currentChanged.emit(self.tabs.currentIndex())
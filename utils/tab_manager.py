@@ -6,6 +6,9 @@ Manages multiple text editor tabs with metadata tracking.
 from PyQt5.QtWidgets import QTabWidget, QMessageBox
 from PyQt5.QtCore import QObject
 from utils.editor import EnhancedTextEditor
+from utils.languages import detect_language
+from utils.text_format import TextFormat
+from utils.document_registry import DocumentRegistry
 
 class TabManager(QObject):
     """Handles multi-tab operations and metadata tracking."""
@@ -20,14 +23,15 @@ class TabManager(QObject):
         # --- Do NOT connect to status_manager here ---
         # self.tabs.currentChanged.connect(self.parent.status_manager.update_status_bar)
 
-        # Metadata per tab: {index: {"path": ..., "encrypted": ..., "password": ...}}
-        self.tab_files = {}
+        # Metadata per tab, found from the tab's editor (tab indexes shift)
+        self.documents = DocumentRegistry()
 
         # Default font size for zoom
         self.default_font_size = 12
 
     # --- Allow external connection to status_manager later ---
     def connect_status_manager(self, status_manager):
+        # The status manager follows the current editor's signals itself.
         self.tabs.currentChanged.connect(status_manager.update_status_bar)
 
     def current_editor(self):
@@ -36,25 +40,20 @@ class TabManager(QObject):
             return editor
         return None
 
-    def current_tab_index(self):
-        return self.tabs.currentIndex()
+    def current_document(self):
+        return self.documents.for_editor(self.tabs.currentWidget())
 
-    def current_tab_data(self):
-        return self.tab_files.get(self.current_tab_index(), {})
-
-    def new_tab(self, path=None, content="", encrypted=False, password=None):
+    def new_tab(self, path=None, content="", encrypted=False, password=None, text_format=None):
+        text_format = text_format or TextFormat()
         editor = EnhancedTextEditor()
         editor.setPlainText(content)
         editor.document().setModified(False)
+        editor.stats.set_line_ending(text_format.eol)
+        editor.set_language(detect_language(path, content))
 
-        # Connect editor signals to status_manager if available
-        if hasattr(self.parent, "status_manager"):
-            editor.cursorPositionChanged.connect(self.parent.status_manager.update_status_bar)
-            editor.textChanged.connect(self.parent.status_manager.update_status_bar)
-
+        document = self.documents.add(editor, path, encrypted, password, text_format)
         index = self.tabs.addTab(editor, path if path else "Untitled")
         self.tabs.setCurrentIndex(index)
-        self.tab_files[index] = {"path": path, "encrypted": encrypted, "password": password}
 
         # Set default font size if not already
         if not self.default_font_size:
@@ -75,5 +74,8 @@ class TabManager(QObject):
                         return
             elif reply == QMessageBox.Cancel:
                 return
-        self.tabs.removeTab(index)
-        self.tab_files.pop(index, None)
+        self.tabs.removeTab(index)  # does not delete the widget
+        document = self.documents.for_editor(editor)
+        if document is not None:
+            self.documents.remove(document)
+        editor.deleteLater()
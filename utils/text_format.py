@@ -0,0 +1,174 @@
+"""
+utils/text_format.py
+--------------------
+Encoding and line-ending detection for files opened in the editor.
+
+Detection only looks at the BOM and the first SAMPLE_SIZE bytes of a file;
+the rest is decoded in a streaming fashion with the detected codec. Saving
+writes the text back with the same encoding (including its BOM) and the
+same line endings it was opened with.
+"""
+
+import os
+import codecs
+
+SAMPLE_SIZE = 256 * 1024
+READ_CHUNK = 1024 * 1024
+
+EOL_CHARS = {"CRLF": "\r\n", "LF": "\n", "CR": "\r"}
+DEFAULT_EOL = "CRLF" if os.name == "nt" else "LF"
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+_LABELS = {
+    "utf-8": "UTF-8",
+    "utf-16-le": "UTF-16 LE",
+    "utf-16-be": "UTF-16 BE",
+    "utf-32-le": "UTF-32 LE",
+    "utf-32-be": "UTF-32 BE",
+    "cp1252": "Windows-1252",
+    "latin-1": "ISO-8859-1",
+}
+
+
+class TextFormat:
+    """Encoding (a BOM-less codec name plus a BOM flag) and line-ending style."""
+
+    __slots__ = ("encoding", "eol", "bom")
+
+    def __init__(self, encoding="utf-8", eol=DEFAULT_EOL, bom=False):
+        self.encoding = encoding
+        self.eol = eol
+        self.bom = bom
+
+    @property
+    def label(self):
+        label = _LABELS.get(self.encoding, self.encoding.upper())
+        return f"{label} BOM" if self.bom else label
+
+    def __repr__(self):
+        return f"TextFormat({self.encoding!r}, {self.eol!r}, bom={self.bom})"
+
+
+# ---------------- Detection ----------------
+def detect_eol(sample, default=DEFAULT_EOL):
+    """Return the dominant line ending ("CRLF", "LF" or "CR") in a str/bytes sample."""
+    if isinstance(sample, bytes):
+        crlf, cr, lf = b"\r\n", b"\r", b"\n"
+    else:
+        crlf, cr, lf = "\r\n", "\r", "\n"
+    n_crlf = sample.count(crlf)
+    n_cr = sample.count(cr) - n_crlf
+    n_lf = sample.count(lf) - n_crlf
+    if not (n_crlf or n_cr or n_lf):
+        return default
+    best = max((n_crlf, "CRLF"), (n_lf, "LF"), (n_cr, "CR"))
+    return best[1]
+
+
+def _looks_utf16(sample):
+    """Guess BOM-less UTF-16 from the distribution of NUL bytes."""
+    if len(sample) < 4:
+        return None
+    even = sample[0::2].count(0)
+    odd = sample[1::2].count(0)
+    half = len(sample) // 2
+    if odd > half * 0.4 and even < half * 0.05:
+        return "utf-16-le"
+    if even > half * 0.4 and odd < half * 0.05:
+        return "utf-16-be"
+    return None
+
+
+def _decodes(sample, encoding, final):
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_bytes(sample, at_eof=True):
+    """Detect the TextFormat of a leading byte sample of a file."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            text = sample[len(bom):].decode(encoding, errors="ignore")
+            return TextFormat(encoding, detect_eol(text), bom=True)
+
+    encoding = _looks_utf16(sample)
+    if encoding:
+        return TextFormat(encoding, detect_eol(sample.decode(encoding, errors="ignore")))
+
+    eol = detect_eol(sample)
+    for encoding in ("utf-8", "cp1252"):
+        if _decodes(sample, encoding, at_eof):
+            return TextFormat(encoding, eol)
+    return TextFormat("latin-1", eol)
+
+
+def sniff_file(path, sample_size=SAMPLE_SIZE):
+    """Detect encoding and line endings from the first ``sample_size`` bytes."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+        at_eof = not f.read(1)
+    return sniff_bytes(sample, at_eof)
+
+
+# ---------------- Reading / Writing ----------------
+def _read_stream(path, encoding, bom=False):
+    parts = []
+    with open(path, "r", encoding=encoding, newline=None) as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            parts.append(chunk)
+    if bom and parts and parts[0].startswith("\ufeff"):
+        parts[0] = parts[0][1:]
+    return "".join(parts)
+
+
+def read_text(path, text_format=None):
+    """
+    Read a text file, returning (text, TextFormat).
+
+    The file is decoded chunk by chunk with universal newlines. If the sample
+    looked like UTF-8 but later bytes are not, the file is re-read as
+    Windows-1252 (and finally ISO-8859-1, which accepts any byte).
+    """
+    text_format = text_format or sniff_file(path)
+    try:
+        return _read_stream(path, text_format.encoding, text_format.bom), text_format
+    except UnicodeDecodeError:
+        for fallback in ("cp1252", "latin-1"):
+            if fallback == text_format.encoding:
+                continue
+            try:
+                text = _read_stream(path, fallback)
+                return text, TextFormat(fallback, text_format.eol)
+            except UnicodeDecodeError:
+                continue
+        raise
+
+
+def encode_eol(text, text_format):
+    """Convert the editor's "\\n" line breaks to the document's line endings."""
+    eol = EOL_CHARS.get(text_format.eol, "\n") if text_format else "\n"
+    return text if eol == "\n" else text.replace("\n", eol)
+
+
+def write_text(path, text, text_format=None):
+    """Write text with the document's encoding (and BOM) and line endings."""
+    text_format = text_format or TextFormat()
+    # Encoded before the file is opened, so text the encoding cannot hold
+    # (UnicodeEncodeError) leaves the file as it was.
+    data = (("\ufeff" if text_format.bom else "") + encode_eol(text, text_format)).encode(text_format.encoding)
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,46 @@
+"""
+utils/tokenize_worker.py
+------------------------
+Worker side of ThreadedHighlighter.
+
+Tokenizes a snapshot of consecutive lines and returns compact int arrays
+instead of Python tuples, so results are cheap to pass back from a thread
+and cheap to pickle from a process. This module does not import Qt: it is
+what a spawned worker process imports.
+"""
+
+import itertools
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.languages import load_grammar
+
+_process_pool = None
+
+
+def tokenize_chunk(grammar_name, lines, state):
+    """
+    Tokenize ``lines`` starting in tokenizer ``state``.
+
+    Returns ``(spans, counts, end_states)``: ``spans`` holds flattened
+    (start, length, style_id) triples, ``counts[i]`` is the number of spans
+    of line i and ``end_states[i]`` the state line i ends in.
+    """
+    tokenize = load_grammar(grammar_name).tokenize
+    spans, counts, end_states = array("i"), array("i"), array("i")
+    chain = itertools.chain.from_iterable
+    for line in lines:
+        line_spans, state = tokenize(line, state)
+        counts.append(len(line_spans))
+        spans.extend(chain(line_spans))
+        end_states.append(state)
+    return spans, counts, end_states
+
+
+def process_pool():
+    """Shared single-process pool, started on first use (spawn: Qt is not fork-safe)."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool